@@ -1,23 +1,35 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, ValidationError
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
+import asyncio
 import base64
 import io
 import os
 import json
-import requests
 import re
 from PIL import Image
 from datetime import datetime
+import time
 import uuid
 
 # Enhanced imports
-from ecoscore import calculate_ecoscore, calculate_ecoscore_from_quiz_responses, score_item, PLANETARY_BOUNDARIES
+from ecoscore import calculate_ecoscore, calculate_ecoscores, calculate_ecoscore_from_quiz_responses, calculate_ecoscores_from_quiz_cohort, score_item, PLANETARY_BOUNDARIES, SCORE_CACHE, resolve_sections, score_what_if, score_weight_scenarios, score_uncertainty, DEFAULT_UNCERTAINTY_SAMPLES
 from product_database import get_product_info, get_sustainability_alternatives, product_db
-from recommender import get_recommendations, get_action_info, get_campus_resources
+from recommender import get_recommendations, get_action_info, get_campus_resources, recommender
 from barcode_scanner import create_scanner  # Add barcode scanner import
+from factor_registry import create_factor_registry
+from factor_binary import open_binary_factor_index
+from ecoscore import activate_factor_index, get_scoring_model
+from session_scoring import SESSION_SCORES
+from score_history import score_history
+from request_timing import REQUEST_TIMING, TimedRoute, TimingMiddleware, route_label, span
+from metrics import METRICS, MetricsMiddleware, cache_ratio_samples
+from upstream_http import UPSTREAM_HTTP
+from response_cache import RESPONSE_CACHE
+from vision_model import PIXTRAL, PIXTRAL_WAIT_SECONDS
+import httpx
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -27,15 +39,7 @@ load_dotenv()
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 MISTRAL_API_URL = os.getenv("MISTRAL_API_URL", "https://api.mistral.ai/v1/chat/completions")
 
-# Vision model imports
-try:
-    import torch
-    from transformers import AutoProcessor, AutoModelForVision2Text
-    PIXTRAL_AVAILABLE = True
-except Exception:
-    PIXTRAL_AVAILABLE = False
-
-def call_mistral_api(message: str, context: str = "sustainability") -> str:
+async def call_mistral_api(message: str, context: str = "sustainability") -> str:
     """Call Mistral AI API for sustainability-focused responses"""
     if not MISTRAL_API_KEY:
         raise ValueError("MISTRAL_API_KEY is not configured. Please add your Mistral API key to the .env file.")
@@ -69,7 +73,7 @@ Focus on topics like: sustainable food choices, reducing environmental impact, p
     }
     
     try:
-        response = requests.post(MISTRAL_API_URL, headers=headers, json=payload, timeout=30)
+        response = await UPSTREAM_HTTP.post("mistral", MISTRAL_API_URL, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -78,12 +82,17 @@ Focus on topics like: sustainable food choices, reducing environmental impact, p
         else:
             raise ValueError("Unexpected response format from Mistral API")
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise RuntimeError(f"Failed to connect to Mistral API: {str(e)}")
     except Exception as e:
         raise RuntimeError(f"Error calling Mistral API: {str(e)}")
 
 app = FastAPI(title="EcoBee Intake & Perception API", version="2.0.0")
+# Per-request stage timing (Server-Timing headers, /api/timings); ECOBEE_TIMING=0 turns it off
+app.router.route_class = TimedRoute
+app.add_middleware(TimingMiddleware, timing=REQUEST_TIMING)
+# Per-route latency histograms, error counts and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware, route_label=route_label)
 
 # Enhanced CORS for development
 app.add_middleware(
@@ -107,6 +116,25 @@ class Item(BaseModel):
     materials: List[str] = Field(default=[], description="Materials or composition")
     barcode: Optional[str] = Field(None, description="Product barcode if available")
 
+class Substitution(BaseModel):
+    item_index: int = Field(..., description="Index of the basket item to swap out")
+    alternatives: List[Item] = Field(..., description="Candidate items to try in its place")
+
+class WhatIfRequest(BaseModel):
+    items: List[Item] = Field(..., description="Current basket")
+    substitutions: List[Substitution] = Field(..., description="Candidate swaps per basket item")
+
+class WeightScheme(BaseModel):
+    name: Optional[str] = Field(None, description="Label for the scheme")
+    weights: Dict[str, float] = Field(..., description="Per-boundary weights; omitted boundaries keep the default")
+
+class ScenarioRequest(BaseModel):
+    items: List[Item] = Field(..., description="Items to score")
+    schemes: List[WeightScheme] = Field(default=[], description="Named weighting schemes")
+    weight_matrix: Optional[List[List[float]]] = Field(
+        None, description="Additional schemes as weight rows in /api/boundaries order, for sensitivity studies"
+    )
+
 class ChatMessage(BaseModel):
     message: str = Field(..., description="User message to the chatbot")
     context: str = Field(default="sustainability", description="Context for the conversation")
@@ -152,20 +180,36 @@ class BarcodeRequest(BaseModel):
     barcode: str = Field(..., description="Product barcode")
     product_type: Optional[str] = Field(None, description="Expected product type")
 
-# Load vision models
-PIXTRAL_MODEL = None
-PIXTRAL_PROCESSOR = None
-if PIXTRAL_AVAILABLE and os.getenv("ENABLE_PIXTRAL", "1") == "1":
+# Compiled, memory-mapped factor tables shared across workers (enabled by FACTOR_TABLES_BINARY)
+if os.getenv("FACTOR_TABLES_BINARY"):
     try:
-        MODEL_NAME = os.getenv("PIXTRAL_MODEL_NAME", "mistralai/Pixtral-8B-v0.1")
-        print(f"Loading Pixtral model: {MODEL_NAME}")
-        PIXTRAL_PROCESSOR = AutoProcessor.from_pretrained(MODEL_NAME)
-        PIXTRAL_MODEL = AutoModelForVision2Text.from_pretrained(MODEL_NAME)
-        print("Pixtral model loaded successfully")
+        activate_factor_index(open_binary_factor_index(os.getenv("FACTOR_TABLES_BINARY")))
+        print(f"✅ Using binary factor tables from {os.getenv('FACTOR_TABLES_BINARY')}")
     except Exception as e:
-        print(f"Failed to load Pixtral model: {e}")
-        PIXTRAL_MODEL = None
-        PIXTRAL_PROCESSOR = None
+        print(f"⚠️  Failed to open binary factor tables: {e}")
+
+# Hot-reloadable factor tables (enabled by FACTOR_TABLES_DIR)
+FACTOR_REGISTRY = create_factor_registry()
+
+@app.on_event("startup")
+async def start_factor_registry():
+    if FACTOR_REGISTRY:
+        FACTOR_REGISTRY.start()
+        print(f"✅ Watching factor tables in {FACTOR_REGISTRY.directory}")
+
+@app.on_event("shutdown")
+async def stop_factor_registry():
+    if FACTOR_REGISTRY:
+        FACTOR_REGISTRY.stop()
+
+@app.on_event("startup")
+async def start_vision_model_loading():
+    # The local vision model loads in the background; nothing else waits for it
+    PIXTRAL.start()
+
+@app.on_event("shutdown")
+async def close_upstream_http():
+    await UPSTREAM_HTTP.aclose()
 
 # Initialize barcode scanner
 try:
@@ -177,8 +221,10 @@ except Exception as e:
 
 def enhanced_classify_with_pixtral(image_bytes: bytes, item_type: str, context: str = "") -> Dict:
     """Enhanced classification using Pixtral with better prompting"""
-    if PIXTRAL_MODEL is None or PIXTRAL_PROCESSOR is None:
+    loaded = PIXTRAL.get()
+    if loaded is None:
         return fallback_classification(item_type)
+    model, processor = loaded
 
     try:
         image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
@@ -193,9 +239,9 @@ def enhanced_classify_with_pixtral(image_bytes: bytes, item_type: str, context:
         
         prompt = prompts.get(item_type, prompts["food"])
         
-        inputs = PIXTRAL_PROCESSOR(images=image, text=prompt, return_tensors="pt")
-        outputs = PIXTRAL_MODEL.generate(**inputs, max_length=256, do_sample=True, temperature=0.3)
-        description = PIXTRAL_PROCESSOR.decode(outputs[0], skip_special_tokens=True)
+        inputs = processor(images=image, text=prompt, return_tensors="pt")
+        outputs = model.generate(**inputs, max_length=256, do_sample=True, temperature=0.3)
+        description = processor.decode(outputs[0], skip_special_tokens=True)
         
         return parse_classification_response(description, item_type)
     
@@ -287,16 +333,18 @@ def fallback_classification(item_type: str) -> Dict:
 
 def read_barcode_with_pixtral(image_bytes: bytes) -> Optional[str]:
     """Enhanced barcode reading with Pixtral"""
-    if PIXTRAL_MODEL is None or PIXTRAL_PROCESSOR is None:
+    loaded = PIXTRAL.get()
+    if loaded is None:
         return None
+    model, processor = loaded
     
     try:
         image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
         prompt = "Look for any barcodes, QR codes, or product codes in this image. Extract the exact numeric sequence. If you see a barcode, provide only the numbers. If no barcode is visible, respond with 'none'."
         
-        inputs = PIXTRAL_PROCESSOR(images=image, text=prompt, return_tensors="pt")
-        outputs = PIXTRAL_MODEL.generate(**inputs, max_length=64, temperature=0.1)
-        description = PIXTRAL_PROCESSOR.decode(outputs[0], skip_special_tokens=True)
+        inputs = processor(images=image, text=prompt, return_tensors="pt")
+        outputs = model.generate(**inputs, max_length=64, temperature=0.1)
+        description = processor.decode(outputs[0], skip_special_tokens=True)
         
         # Extract barcode-like sequences
         import re
@@ -313,6 +361,46 @@ def read_barcode_with_pixtral(image_bytes: bytes) -> Optional[str]:
         print(f"Barcode reading error: {e}")
         return None
 
+def build_intake_response(request_obj: IntakeRequest, session_id: str, score_data: Dict) -> IntakeResponse:
+    """Record a scored intake in the user's history and assemble the intake response"""
+    if request_obj.user_id:
+        try:
+            with span("history"):
+                score_history.record_score(
+                    request_obj.user_id, score_data["composite"], score_data["per_boundary_averages"],
+                    grade=score_data["grade"], source="intake"
+                )
+        except (OSError, ValueError) as e:
+            print(f"Failed to record score history: {e}")
+    
+    with span("scoring_result"):
+        scoring_result = ScoringResult(
+            items=score_data["items"],
+            per_boundary_averages=BoundaryScore(**score_data["per_boundary_averages"]),
+            composite=score_data["composite"],
+            grade=score_data["grade"],
+            recommendations=score_data["recommendations"],
+            boundary_details=score_data["boundary_details"]
+        )
+    
+    # Get alternatives for barcoded items
+    alternatives = []
+    with span("alternatives"):
+        for item in request_obj.items:
+            if item.barcode:
+                item_alternatives = get_sustainability_alternatives(item.barcode)
+                if item_alternatives:
+                    alternatives.extend(item_alternatives)
+    
+    return IntakeResponse(
+        items=request_obj.items,
+        quiz_responses=request_obj.quiz_responses,
+        scoring_result=scoring_result,
+        session_id=session_id,
+        timestamp=datetime.now(),
+        alternatives=alternatives if alternatives else None
+    )
+
 @app.post("/api/intake", response_model=IntakeResponse)
 async def enhanced_intake(
     request: Request
@@ -320,14 +408,17 @@ async def enhanced_intake(
     """Enhanced intake endpoint with comprehensive scoring"""
     try:
         # Get raw request body for debugging
-        body = await request.body()
-        body_str = body.decode('utf-8')
+        with span("read_body"):
+            body = await request.body()
+            body_str = body.decode('utf-8')
         print(f"🐛 DEBUG: Raw request body: {body_str}")
         
         # Parse and validate the request
         import json
-        body_data = json.loads(body_str)
-        request_obj = IntakeRequest(**body_data)
+        with span("json_decode"):
+            body_data = json.loads(body_str)
+        with span("validate"):
+            request_obj = IntakeRequest(**body_data)
         
         print(f"🐛 DEBUG: Parsed request: {request_obj}")
         print(f"🐛 DEBUG: Quiz responses count: {len(request_obj.quiz_responses)}")
@@ -350,38 +441,20 @@ async def enhanced_intake(
         
         # Calculate EcoScore
         # Always calculate a score, either from items or from quiz responses
-        if items_for_scoring:
-            # Score based on actual items (food/clothing scanned)
-            score_data = calculate_ecoscore(items_for_scoring)
-        else:
-            # Score based on quiz responses when no items are available
-            score_data = calculate_ecoscore_from_quiz_responses(request_obj.quiz_responses)
+        with span("score"):
+            if items_for_scoring and request_obj.session_id:
+                # Returning session: only the items that changed since its last intake are scored
+                session_score = SESSION_SCORES.get(session_id)
+                session_score.sync_items(items_for_scoring)
+                score_data = session_score.result()
+            elif items_for_scoring:
+                # Score based on actual items (food/clothing scanned)
+                score_data = calculate_ecoscore(items_for_scoring)
+            else:
+                # Score based on quiz responses when no items are available
+                score_data = calculate_ecoscore_from_quiz_responses(request_obj.quiz_responses)
         
-        scoring_result = ScoringResult(
-            items=score_data["items"],
-            per_boundary_averages=BoundaryScore(**score_data["per_boundary_averages"]),
-            composite=score_data["composite"],
-            grade=score_data["grade"],
-            recommendations=score_data["recommendations"],
-            boundary_details=score_data["boundary_details"]
-        )
-        
-        # Get alternatives for barcoded items
-        alternatives = []
-        for item in request_obj.items:
-            if item.barcode:
-                item_alternatives = get_sustainability_alternatives(item.barcode)
-                if item_alternatives:
-                    alternatives.extend(item_alternatives)
-        
-        return IntakeResponse(
-            items=request_obj.items,
-            quiz_responses=request_obj.quiz_responses,
-            scoring_result=scoring_result,
-            session_id=session_id,
-            timestamp=datetime.now(),
-            alternatives=alternatives if alternatives else None
-        )
+        return build_intake_response(request_obj, session_id, score_data)
     
     except ValidationError as e:
         print(f"🐛 DEBUG: Validation error: {e}")
@@ -390,6 +463,160 @@ async def enhanced_intake(
         print(f"🐛 DEBUG: General error: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+# Limits for one /api/intake/batch request
+BATCH_MAX_INTAKES = int(os.getenv("ECOBEE_BATCH_MAX_INTAKES", "500"))
+BATCH_MAX_ITEMS = int(os.getenv("ECOBEE_BATCH_MAX_ITEMS", "10000"))
+BATCH_MAX_BYTES = int(os.getenv("ECOBEE_BATCH_MAX_BYTES", str(8 * 1024 * 1024)))
+# Intakes scored together per engine call; their lines are streamed before the next chunk starts
+BATCH_CHUNK_SIZE = 32
+
+def batch_error_line(index: int, error: str, detail, session_id: Optional[str] = None) -> Dict:
+    return {"index": index, "status": "error", "session_id": session_id, "error": error, "detail": str(detail)}
+
+def score_intakes(intakes: List[Tuple[int, IntakeRequest]]) -> Dict[int, Dict]:
+    """
+    Score a chunk of validated intakes, batching them through the engine
+
+    Returning sessions go through their incremental session scores, new
+    baskets through one calculate_ecoscores call and quiz-only intakes
+    through one quiz cohort pass. If a combined call fails, its intakes are
+    rescored one by one so the failure is pinned to the intake causing it.
+    Returns index -> score data, or the exception raised for that intake.
+    """
+    scored = {}
+    baskets = []
+    quizzes = []
+    for index, request_obj in intakes:
+        items = [item.model_dump() for item in request_obj.items]
+        if items and request_obj.session_id:
+            try:
+                session_score = SESSION_SCORES.get(request_obj.session_id)
+                session_score.sync_items(items)
+                scored[index] = session_score.result()
+            except Exception as e:
+                scored[index] = e
+        elif items:
+            baskets.append((index, items))
+        else:
+            quizzes.append((index, request_obj.quiz_responses))
+    
+    for group, score_all, score_one in (
+        (baskets, calculate_ecoscores, calculate_ecoscore),
+        (quizzes, calculate_ecoscores_from_quiz_cohort, calculate_ecoscore_from_quiz_responses)
+    ):
+        if not group:
+            continue
+        try:
+            scored.update(zip((index for index, _ in group), score_all([entry for _, entry in group])))
+        except Exception as e:
+            print(f"Batch scoring failed, rescoring intakes one by one: {e}")
+            for index, entry in group:
+                try:
+                    scored[index] = score_one(entry)
+                except Exception as item_error:
+                    scored[index] = item_error
+    return scored
+
+async def stream_intake_batch(entries: List):
+    """NDJSON lines: one per intake in request order, then a summary line"""
+    started = time.perf_counter()
+    succeeded = 0
+    for chunk_start in range(0, len(entries), BATCH_CHUNK_SIZE):
+        lines = {}
+        valid = []
+        for index, entry in enumerate(entries[chunk_start:chunk_start + BATCH_CHUNK_SIZE], chunk_start):
+            if not isinstance(entry, dict):
+                lines[index] = batch_error_line(index, "validation_error", "Intake must be a JSON object")
+                continue
+            try:
+                valid.append((index, IntakeRequest(**entry)))
+            except ValidationError as e:
+                lines[index] = batch_error_line(index, "validation_error", e, entry.get("session_id"))
+        
+        scored = score_intakes(valid)
+        for index, request_obj in valid:
+            session_id = request_obj.session_id or str(uuid.uuid4())
+            score_data = scored[index]
+            if isinstance(score_data, Exception):
+                lines[index] = batch_error_line(index, "scoring_error", score_data, session_id)
+                continue
+            try:
+                response = build_intake_response(request_obj, session_id, score_data)
+                lines[index] = {"index": index, "status": "ok", "session_id": session_id,
+                                "response": response.model_dump(mode="json")}
+                succeeded += 1
+            except Exception as e:
+                lines[index] = batch_error_line(index, "scoring_error", e, session_id)
+        
+        yield "".join(json.dumps(lines[index]) + "\n" for index in sorted(lines))
+        # Let other requests run between chunks
+        await asyncio.sleep(0)
+    
+    yield json.dumps({"summary": {
+        "total": len(entries),
+        "succeeded": succeeded,
+        "failed": len(entries) - succeeded,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+    }}) + "\n"
+
+@app.post("/api/intake/batch")
+async def intake_batch(request: Request):
+    """
+    Score many intakes in one request, streamed back as NDJSON
+
+    The body is a JSON array of /api/intake payloads, or {"intakes": [...]}.
+    Each intake produces one line, {"index", "status": "ok", "session_id",
+    "response"} or {"index", "status": "error", "error", "detail"}, in
+    request order, as soon as its chunk is scored; a final {"summary"} line
+    counts successes and failures. An invalid intake only fails its own line.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Batch body exceeds {BATCH_MAX_BYTES} bytes")
+    body = await request.body()
+    if len(body) > BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Batch body exceeds {BATCH_MAX_BYTES} bytes")
+    
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    entries = payload.get("intakes") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of intakes or {\"intakes\": [...]}")
+    
+    if len(entries) > BATCH_MAX_INTAKES:
+        raise HTTPException(status_code=413, detail=f"Batch has {len(entries)} intakes, the limit is {BATCH_MAX_INTAKES}")
+    item_count = sum(
+        len(entry["items"]) for entry in entries
+        if isinstance(entry, dict) and isinstance(entry.get("items"), list)
+    )
+    if item_count > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch has {item_count} items, the limit is {BATCH_MAX_ITEMS}")
+    
+    return StreamingResponse(
+        stream_intake_batch(entries),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Size": str(len(entries))}
+    )
+
+async def require_vision_model():
+    """
+    Bounded wait for the local vision model
+
+    Returns once the model is ready, or right away if it is disabled or
+    failed to load (callers fall back as before). While it is still loading
+    after PIXTRAL_WAIT_SECONDS, answers 503 with the load status and a Retry-After.
+    """
+    if await PIXTRAL.wait_ready(PIXTRAL_WAIT_SECONDS) or not PIXTRAL.warming:
+        return
+    raise HTTPException(
+        status_code=503,
+        detail={"status": "warming", "message": "The vision model is still loading, please retry shortly",
+                "vision_model": PIXTRAL.status()},
+        headers={"Retry-After": "10"}
+    )
+
 @app.post("/api/classify-image")
 async def classify_image(
     image: UploadFile = File(...),
@@ -397,6 +624,7 @@ async def classify_image(
     context: str = Form("")
 ):
     """Classify uploaded image using vision AI"""
+    await require_vision_model()
     try:
         contents = await image.read()
         classification = enhanced_classify_with_pixtral(contents, item_type, context)
@@ -418,7 +646,7 @@ async def classify_image(
             "classification": classification,
             "barcode": barcode,
             "product_info": product_info,
-            "source": "pixtral" if PIXTRAL_MODEL else "fallback"
+            "source": "pixtral" if PIXTRAL.get() else "fallback"
         }
     
     except Exception as e:
@@ -451,7 +679,7 @@ async def scan_barcode(image: UploadFile = File(...), product_type: str = Form("
         if BARCODE_SCANNER:
             try:
                 print(f"🔍 Attempting to scan with dedicated barcode scanner...")
-                scan_result = BARCODE_SCANNER.scan_barcode_from_image(image_data, product_type)
+                scan_result = await BARCODE_SCANNER.scan_barcode_from_image(image_data, product_type)
                 print(f"📊 Scan result: {scan_result}")
                 
                 # If successful and barcode found, return the result
@@ -473,7 +701,8 @@ async def scan_barcode(image: UploadFile = File(...), product_type: str = Form("
                 import traceback
                 traceback.print_exc()
         
-        # Fallback to integrated Pixtral model
+        # Fallback to integrated Pixtral model, which may still be loading
+        await require_vision_model()
         barcode = read_barcode_with_pixtral(image_data)
         
         if barcode:
@@ -498,6 +727,8 @@ async def scan_barcode(image: UploadFile = File(...), product_type: str = Form("
                 "scanner": "pixtral_local"
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Barcode scanning failed: {str(e)}")
 
@@ -524,7 +755,7 @@ async def scan_barcode_base64(request: Dict):
         # Try to scan with dedicated barcode scanner first
         if BARCODE_SCANNER:
             try:
-                scan_result = BARCODE_SCANNER.scan_barcode_from_image(image_bytes, product_type)
+                scan_result = await BARCODE_SCANNER.scan_barcode_from_image(image_bytes, product_type)
                 
                 if scan_result.get("success") and scan_result.get("barcode"):
                     return {
@@ -539,7 +770,8 @@ async def scan_barcode_base64(request: Dict):
             except Exception as e:
                 print(f"Dedicated scanner failed: {e}")
         
-        # Fallback to integrated Pixtral model
+        # Fallback to integrated Pixtral model, which may still be loading
+        await require_vision_model()
         barcode = read_barcode_with_pixtral(image_bytes)
         
         if barcode:
@@ -564,25 +796,148 @@ async def scan_barcode_base64(request: Dict):
                 "scanner": "pixtral_local"
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Barcode scanning failed: {str(e)}")
 
+def resolve_result_sections(sections):
+    """Validate a sections/fields selection from a request, 400 on unknown names"""
+    try:
+        return resolve_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def resolve_uncertainty_options(option) -> Optional[Dict]:
+    """Monte Carlo settings from a request's `uncertainty` value, None when not requested"""
+    if option is None or option is False:
+        return None
+    if option is True:
+        return {"samples": DEFAULT_UNCERTAINTY_SAMPLES, "seed": None}
+    if isinstance(option, int):
+        return {"samples": option, "seed": None}
+    if isinstance(option, dict):
+        samples, seed = option.get("samples", DEFAULT_UNCERTAINTY_SAMPLES), option.get("seed")
+        if isinstance(samples, int) and (seed is None or isinstance(seed, int)):
+            return {"samples": samples, "seed": seed}
+    raise HTTPException(status_code=400, detail="uncertainty must be true, a sample count or {\"samples\", \"seed\"}")
+
 @app.post("/api/score")
-async def score_endpoint(payload: Dict):
-    """Enhanced scoring endpoint using new calculate_ecoscore function"""
+async def score_endpoint(payload: Dict, fields: Optional[str] = None, uncertainty: Optional[int] = None):
+    """
+    Enhanced scoring endpoint using new calculate_ecoscore function
+
+    Pass `fields` (query, comma-separated) or `sections` (body) to limit the
+    response to the listed sections; only those are computed. Pass
+    `uncertainty` (query sample count, or body true / {"samples", "seed"})
+    to add Monte Carlo p5/p50/p95 bands for each boundary and the composite.
+    """
     items = payload.get('items', [])
     if not items:
         raise HTTPException(status_code=400, detail="No items provided for scoring")
     
-    return calculate_ecoscore(items)
+    sections = resolve_result_sections(fields if fields is not None else payload.get('sections'))
+    monte_carlo = resolve_uncertainty_options(uncertainty if uncertainty is not None else payload.get('uncertainty'))
+    result = calculate_ecoscore(items, sections=sections)
+    if monte_carlo:
+        try:
+            result["uncertainty"] = score_uncertainty(items, monte_carlo["samples"], monte_carlo["seed"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return result
+
+@app.post("/api/score/what-if")
+async def what_if_endpoint(request: WhatIfRequest):
+    """Score every candidate substitution against the basket in one batched pass"""
+    substitutions = {}
+    for substitution in request.substitutions:
+        substitutions.setdefault(substitution.item_index, []).extend(item.dict() for item in substitution.alternatives)
+    
+    try:
+        return score_what_if([item.dict() for item in request.items], substitutions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/score/scenarios")
+async def scenarios_endpoint(request: ScenarioRequest):
+    """Composite and grade of one basket under many boundary weighting schemes"""
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items provided for scoring")
+    
+    schemes = [scheme.weights for scheme in request.schemes] + (request.weight_matrix or [])
+    names = [scheme.name or f"scheme_{index}" for index, scheme in enumerate(request.schemes)]
+    names += [f"matrix_{row}" for row in range(len(request.weight_matrix or []))]
+    if not schemes:
+        raise HTTPException(status_code=400, detail="No weighting schemes provided")
+    
+    try:
+        evaluation = score_weight_scenarios([item.dict() for item in request.items], schemes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    composites = evaluation["composites"]
+    grade_counts = {}
+    for grade in evaluation["grades"]:
+        grade_counts[grade] = grade_counts.get(grade, 0) + 1
+    
+    return {
+        "per_boundary_averages": evaluation["per_boundary_averages"],
+        "baseline": evaluation["baseline"],
+        "scenarios": [
+            {"name": name, "composite": round(composite, 1), "grade": grade}
+            for name, composite, grade in zip(names, composites.tolist(), evaluation["grades"])
+        ],
+        "summary": {
+            "schemes": len(composites),
+            "composite_min": round(float(composites.min()), 1),
+            "composite_max": round(float(composites.max()), 1),
+            "composite_mean": round(float(composites.mean()), 1),
+            "grade_counts": grade_counts
+        }
+    }
+
+@app.post("/api/session/{session_id}/items")
+async def add_session_item(session_id: str, item: Item, fields: Optional[str] = None):
+    """Add one item to a session's basket and return the updated score"""
+    sections = resolve_result_sections(fields)
+    session_score = SESSION_SCORES.get(session_id)
+    item_id = session_score.add_item(item.dict())
+    return {"item_id": item_id, **session_score.result(sections)}
+
+@app.put("/api/session/{session_id}/items/{item_id}")
+async def update_session_item(session_id: str, item_id: str, item: Item, fields: Optional[str] = None):
+    """Replace one item in a session's basket and return the updated score"""
+    sections = resolve_result_sections(fields)
+    session_score = SESSION_SCORES.get(session_id)
+    session_score.update_item(item_id, item.dict())
+    return {"item_id": item_id, **session_score.result(sections)}
+
+@app.delete("/api/session/{session_id}/items/{item_id}")
+async def remove_session_item(session_id: str, item_id: str, fields: Optional[str] = None):
+    """Remove one item from a session's basket and return the updated score"""
+    sections = resolve_result_sections(fields)
+    session_score = SESSION_SCORES.get(session_id, create=False)
+    if session_score is None or not session_score.remove_item(item_id):
+        raise HTTPException(status_code=404, detail=f"Item {item_id} not found in session {session_id}")
+    return session_score.result(sections)
+
+@app.get("/api/session/{session_id}/score")
+async def get_session_score(session_id: str, fields: Optional[str] = None):
+    """Current score of a session's basket"""
+    sections = resolve_result_sections(fields)
+    session_score = SESSION_SCORES.get(session_id, create=False)
+    if session_score is None:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    return session_score.result(sections)
 
 @app.get("/api/boundaries")
-async def get_boundaries():
+async def get_boundaries(request: Request):
     """Get planetary boundaries information"""
-    return {
+    # The scoring model is rebuilt (new version) whenever boundaries or factor tables change
+    return RESPONSE_CACHE.respond(request, "boundaries", get_scoring_model().version, (), lambda: {
         "boundaries": PLANETARY_BOUNDARIES,
         "description": "Planetary boundaries represent Earth's safe operating space"
-    }
+    }, max_age=300)
 
 @app.get("/api/products/search")
 async def search_products(q: str, product_type: Optional[str] = None, limit: int = 10):
@@ -600,8 +955,9 @@ async def health():
         "status": "ok",
         "version": "2.0.0",
         "features": {
-            "pixtral_loaded": PIXTRAL_MODEL is not None,
-            "pixtral_model": os.getenv("PIXTRAL_MODEL_NAME", "mistralai/Pixtral-8B-v0.1") if PIXTRAL_MODEL else None,
+            "pixtral_loaded": PIXTRAL.get() is not None,
+            "pixtral_model": PIXTRAL.model_name if PIXTRAL.get() else None,
+            "pixtral_state": PIXTRAL.state,
             "product_database": len(product_db.products),
             "planetary_boundaries": len(PLANETARY_BOUNDARIES)
         },
@@ -686,6 +1042,42 @@ async def get_leaderboard_endpoint(limit: int = 50, boundary: Optional[str] = No
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving leaderboard: {str(e)}")
 
+def _cache_metric_samples():
+    """Scrape-time hit ratios for caches that keep their own counters"""
+    stats = SCORE_CACHE.stats()
+    return cache_ratio_samples("score", stats["hits"], stats["misses"])
+
+METRICS.register_collector(_cache_metric_samples)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Request, upstream and cache metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/timings")
+async def get_timings_endpoint():
+    """Per-route, per-stage request durations aggregated since startup (or the last reset)"""
+    return REQUEST_TIMING.snapshot()
+
+@app.delete("/api/timings")
+async def reset_timings_endpoint():
+    """Clear the aggregated request timings"""
+    REQUEST_TIMING.reset()
+    return {"status": "reset"}
+
+@app.get("/api/history/{user_id}")
+async def get_history_endpoint(user_id: str, since: Optional[datetime] = None, limit: Optional[int] = None):
+    """A user's stored EcoScores, oldest first"""
+    return {"user_id": user_id, "records": score_history.history(user_id, since=since, limit=limit)}
+
+@app.get("/api/history/{user_id}/progress")
+async def get_progress_endpoint(user_id: str):
+    """Rolling 7/30/90-day means, trend slopes and streaks from the user's score history"""
+    progress = score_history.aggregates(user_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="No score history for this user")
+    return progress
+
 @app.post("/api/submit-score")
 async def submit_score_endpoint(payload: Dict):
     """Submit EcoScore to leaderboard"""
@@ -697,6 +1089,16 @@ async def submit_score_endpoint(payload: Dict):
         
         if not user_id or composite_score is None:
             raise HTTPException(status_code=400, detail="user_id and composite_score are required")
+        try:
+            composite_score = float(composite_score)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="composite_score must be a number")
+        if not isinstance(boundary_scores, dict):
+            raise HTTPException(status_code=400, detail="boundary_scores must be an object")
+        try:
+            boundary_scores = {key: None if value is None else float(value) for key, value in boundary_scores.items()}
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="boundary_scores values must be numbers")
         
         result = product_db.submit_score(
             user_id=user_id,
@@ -704,13 +1106,20 @@ async def submit_score_endpoint(payload: Dict):
             boundary_scores=boundary_scores,
             campus_affiliation=campus_affiliation
         )
+        try:
+            score_history.record_score(user_id, composite_score, boundary_scores, source="leaderboard")
+        except (OSError, ValueError) as e:
+            print(f"Failed to record score history: {e}")
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting score: {str(e)}")
 
 @app.get("/api/recommendations")
 async def get_recommendations_endpoint(
+    request: Request,
     climate: float = 50,
     biosphere: float = 50,
     biogeochemical: float = 50,
@@ -723,45 +1132,53 @@ async def get_recommendations_endpoint(
     is_student: bool = True
 ):
     """Get personalized action recommendations based on boundary scores"""
+    boundary_scores = {
+        "climate": climate,
+        "biosphere": biosphere,
+        "biogeochemical": biogeochemical,
+        "freshwater": freshwater,
+        "aerosols": aerosols
+    }
+    
+    user_context = {
+        "difficulty_preference": difficulty,
+        "time_availability": time_availability,
+        "budget_preference": budget,
+        "social_preference": social,
+        "is_student": is_student
+    }
+    
+    # Keyed on the parsed values, so equivalent query strings (order, 50 vs 50.0) share an entry
+    params = tuple(boundary_scores.values()) + tuple(user_context.values())
     try:
-        boundary_scores = {
-            "climate": climate,
-            "biosphere": biosphere,
-            "biogeochemical": biogeochemical,
-            "freshwater": freshwater,
-            "aerosols": aerosols
-        }
-        
-        user_context = {
-            "difficulty_preference": difficulty,
-            "time_availability": time_availability,
-            "budget_preference": budget,
-            "social_preference": social,
-            "is_student": is_student
-        }
-        
-        recommendations = get_recommendations(boundary_scores, user_context)
-        return {"recommendations": recommendations}
+        return RESPONSE_CACHE.respond(
+            request, "recommendations", recommender.version, params,
+            lambda: {"recommendations": get_recommendations(boundary_scores, user_context)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
 @app.get("/api/actions/{action_id}")
-async def get_action_endpoint(action_id: str):
+async def get_action_endpoint(action_id: str, request: Request):
     """Get detailed information about a specific action"""
     try:
-        action_details = get_action_info(action_id)
-        if not action_details:
+        if action_id not in recommender.actions:
             raise HTTPException(status_code=404, detail="Action not found")
-        return action_details
+        return RESPONSE_CACHE.respond(
+            request, "actions", recommender.version, (action_id,), lambda: get_action_info(action_id), max_age=300
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving action: {str(e)}")
 
 @app.get("/api/resources")
-async def get_resources_endpoint():
+async def get_resources_endpoint(request: Request):
     """Get all campus and local sustainability resources"""
     try:
-        resources = get_campus_resources()
-        return {"resources": resources}
+        return RESPONSE_CACHE.respond(
+            request, "resources", recommender.version, (), lambda: {"resources": get_campus_resources()}, max_age=300
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving resources: {str(e)}")
 
@@ -770,7 +1187,7 @@ async def chat_with_sustainability_bot(chat_message: ChatMessage):
     """Chat endpoint for sustainability questions using Mistral AI"""
     try:
         # Call Mistral AI API with the user's message
-        response_text = call_mistral_api(chat_message.message, chat_message.context)
+        response_text = await call_mistral_api(chat_message.message, chat_message.context)
         return {"response": response_text}
         
     except ValueError as e:
@@ -816,17 +1233,24 @@ async def health_check():
             "campus_resources"
         ],
         "components": {
-            "pixtral_model_loaded": PIXTRAL_MODEL is not None,
+            "pixtral_model_loaded": PIXTRAL.get() is not None,
+            "vision_model": PIXTRAL.status(),
             "barcode_scanner_available": BARCODE_SCANNER is not None,
             "product_database_loaded": product_db is not None,
             "recommender_engine": True,
-            "ecoscore_calculator": True
+            "ecoscore_calculator": True,
+            "score_cache": SCORE_CACHE.stats(),
+            "session_scores": SESSION_SCORES.stats(),
+            "score_history": score_history.stats(),
+            "upstream_http": UPSTREAM_HTTP.stats(),
+            "response_cache": RESPONSE_CACHE.stats(),
+            "factor_tables": FACTOR_REGISTRY.status() if FACTOR_REGISTRY else None
         },
-        "pixtral_model": os.getenv("PIXTRAL_MODEL_NAME", "mistralai/Pixtral-8B-v0.1") if PIXTRAL_MODEL else None,
+        "pixtral_model": PIXTRAL.model_name if PIXTRAL.get() else None,
         "endpoints": [
-            "/api/intake", "/api/score", "/api/scan-barcode", "/api/scan-barcode-base64",
+            "/api/intake", "/api/intake/batch", "/api/score", "/api/score/what-if", "/api/score/scenarios", "/api/session/{session_id}/items", "/api/scan-barcode", "/api/scan-barcode-base64",
             "/api/barcode-lookup", "/api/classify-image", "/api/leaderboard", 
-            "/api/submit-score", "/api/recommendations", "/api/resources", "/api/chat"
+            "/api/submit-score", "/api/history/{user_id}", "/api/history/{user_id}/progress", "/api/timings", "/metrics", "/api/recommendations", "/api/resources", "/api/chat"
         ]
     }
 
@@ -5,15 +5,18 @@ This module provides barcode scanning capabilities for both camera capture and i
 with comprehensive product sustainability analysis
 """
 
+import asyncio
 import base64
 import io
 import json
 import os
 from typing import Optional, Dict, Any, Tuple, List
 from PIL import Image
-import requests
+import httpx
 from dotenv import load_dotenv
 
+from upstream_http import UPSTREAM_HTTP
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -50,7 +53,7 @@ class PixtralBarcodeScanner:
             except Exception as e:
                 print(f"⚠️  Failed to initialize sustainability analyzer: {e}")
         
-    def scan_barcode_from_image(self, image_data: bytes, product_type: str = "food") -> Dict[str, Any]:
+    async def scan_barcode_from_image(self, image_data: bytes, product_type: str = "food") -> Dict[str, Any]:
         """Scan barcode from image bytes
         
         Args:
@@ -61,19 +64,16 @@ class PixtralBarcodeScanner:
             Dictionary containing barcode data and product information
         """
         try:
-            # Convert image bytes to PIL Image
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Convert to base64 for API
-            base64_image = self._image_to_base64(image)
+            # Decode, resize and re-encode off the event loop
+            base64_image = await asyncio.to_thread(self._image_bytes_to_base64, image_data)
             
             # Call Pixtral API for barcode detection
-            barcode_result = self._call_pixtral_api(base64_image)
+            barcode_result = await self._call_pixtral_api(base64_image)
             
             # If barcode was successfully detected, get sustainability info
             if barcode_result.get("success") and barcode_result.get("barcode"):
                 barcode_number = barcode_result["barcode"]
-                sustainability_info = self._get_product_sustainability(barcode_number, product_type)
+                sustainability_info = await self._get_product_sustainability(barcode_number, product_type)
                 
                 # Merge sustainability info into the result
                 if sustainability_info:
@@ -106,7 +106,7 @@ class PixtralBarcodeScanner:
                 "product_info": None
             }
     
-    def scan_barcode_from_base64(self, base64_image: str, product_type: str = "food") -> Dict[str, Any]:
+    async def scan_barcode_from_base64(self, base64_image: str, product_type: str = "food") -> Dict[str, Any]:
         """Scan barcode from base64 encoded image
         
         Args:
@@ -117,12 +117,12 @@ class PixtralBarcodeScanner:
             Dictionary containing barcode data and product information
         """
         try:
-            barcode_result = self._call_pixtral_api(base64_image)
+            barcode_result = await self._call_pixtral_api(base64_image)
             
             # If barcode was successfully detected, get sustainability info
             if barcode_result.get("success") and barcode_result.get("barcode"):
                 barcode_number = barcode_result["barcode"]
-                sustainability_info = self._get_product_sustainability(barcode_number, product_type)
+                sustainability_info = await self._get_product_sustainability(barcode_number, product_type)
                 
                 # Merge sustainability info into the result
                 if sustainability_info:
@@ -144,6 +144,10 @@ class PixtralBarcodeScanner:
                 "product_info": None
             }
     
+    def _image_bytes_to_base64(self, image_data: bytes) -> str:
+        """Open raw image bytes and convert them with _image_to_base64"""
+        return self._image_to_base64(Image.open(io.BytesIO(image_data)))
+    
     def _image_to_base64(self, image: Image.Image) -> str:
         """Convert PIL Image to base64 string
         
@@ -170,7 +174,7 @@ class PixtralBarcodeScanner:
         img_bytes = buffer.getvalue()
         return base64.b64encode(img_bytes).decode('utf-8')
     
-    def _call_pixtral_api(self, base64_image: str) -> Dict[str, Any]:
+    async def _call_pixtral_api(self, base64_image: str) -> Dict[str, Any]:
         """Call Mistral Pixtral API for barcode detection
         
         Args:
@@ -239,7 +243,7 @@ class PixtralBarcodeScanner:
                 "temperature": 0.1
             }
             
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
+            response = await UPSTREAM_HTTP.post("mistral_pixtral", self.api_url, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -287,14 +291,14 @@ class PixtralBarcodeScanner:
                     "product_info": None
                 }
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return {
                 "success": False,
                 "error": "Request timeout - Pixtral API took too long to respond",
                 "barcode": None,
                 "product_info": None
             }
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "error": f"Network error: {str(e)}",
@@ -309,7 +313,7 @@ class PixtralBarcodeScanner:
                 "product_info": None
             }
     
-    def _get_product_sustainability(self, barcode: str, product_type: str = "food") -> Optional[Dict[str, Any]]:
+    async def _get_product_sustainability(self, barcode: str, product_type: str = "food") -> Optional[Dict[str, Any]]:
         """Get comprehensive product sustainability information
         
         Args:
@@ -323,7 +327,7 @@ class PixtralBarcodeScanner:
             return None
         
         try:
-            product_info = self.sustainability_analyzer.get_product_info(barcode, product_type)
+            product_info = await self.sustainability_analyzer.get_product_info(barcode, product_type)
             
             if product_info:
                 return {
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the EcoScore engine
+Times the scoring stages on seeded synthetic workloads (exact hits, partial
+category matches and misses) at several sizes and writes throughput, per-call
+timing and peak memory as JSON, so runs from two commits can be compared.
+
+Usage:
+    python benchmark.py                          # 1, 100, 10k items, JSON to stdout
+    python benchmark.py --full -o bench.json     # adds 1M items
+    python benchmark.py --stages score_items_matrix,quiz_cohort --sizes 1000000
+    python benchmark.py --compare baseline.json -o current.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import ecoscore
+from ecoscore import (
+    FACTOR_TABLES, SCORE_CACHE, TYPE_MAPPING, calculate_ecoscore,
+    calculate_ecoscore_from_quiz_responses, create_boundary_details, generate_recommendations,
+    get_scoring_model, score_item, score_items_matrix, score_quiz_cohort, score_uncertainty
+)
+
+DEFAULT_SIZES = (1, 100, 10000)
+FULL_SIZES = (1, 100, 10000, 1000000)
+DISTRIBUTIONS = ("hit", "partial", "miss")
+DEFAULT_SEED = 42
+
+# Keep repeating small workloads until this much time has been measured
+MIN_MEASURE_SECONDS = 0.2
+MAX_REPEATS = 1000
+
+STAGES = (
+    "score_item", "score_items_matrix", "calculate_ecoscore", "calculate_ecoscore_core",
+    "generate_recommendations", "create_boundary_details", "quiz_single", "quiz_cohort", "score_uncertainty"
+)
+
+# Quiz stages take no items, so the distribution does not apply to them
+QUIZ_STAGES = ("quiz_single", "quiz_cohort")
+
+MATERIALS = ["cotton", "polyester", "plastic", "glass", "aluminium", "paper", "wool", "leather"]
+PARTIAL_WORDS = ["fresh", "daily", "campus", "weekend", "mini", "large", "home", "shared"]
+
+def _item_types_by_table() -> Dict[str, List[str]]:
+    types = {}
+    for item_type, table in TYPE_MAPPING.items():
+        types.setdefault(table, []).append(item_type)
+    return types
+
+def generate_items(count: int, distribution: str = "hit", seed: int = DEFAULT_SEED,
+                   tables: Optional[Dict] = None) -> List[Dict]:
+    """
+    Seeded synthetic intake items
+
+    Args:
+        count: Number of items
+        distribution: "hit" (exact category keys), "partial" (categories that
+            contain or are contained in a key) or "miss" (nothing matches, so
+            every item falls back to table averages and is a distinct signature)
+        seed: Random seed; the same arguments always give the same items
+        tables: Factor tables to draw categories from, defaults to FACTOR_TABLES
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{distribution}' (available: {', '.join(DISTRIBUTIONS)})")
+    rng = random.Random(f"{seed}:{distribution}")
+    tables = tables or FACTOR_TABLES
+    types_by_table = _item_types_by_table()
+    table_names = [name for name in tables if name in types_by_table]
+
+    items = []
+    for _ in range(count):
+        table = rng.choice(table_names)
+        item_type = rng.choice(types_by_table[table])
+        category = rng.choice(list(tables[table]))
+        materials = rng.sample(MATERIALS, rng.randint(0, 2))
+
+        if distribution == "partial":
+            if rng.random() < 0.5 or len(category) < 5:
+                category = f"{rng.choice(PARTIAL_WORDS)} {category}"
+            else:
+                category = category[:len(category) - rng.randint(1, 3)]
+        elif distribution == "miss":
+            category = f"zz-{rng.randrange(10 ** 9)}"
+            materials = [f"qq-{rng.randrange(10 ** 9)}"]
+
+        items.append({"type": item_type, "category": category, "materials": materials})
+    return items
+
+def generate_quiz_cohort(count: int, seed: int = DEFAULT_SEED) -> List[List[Dict]]:
+    """Seeded synthetic quiz responses drawn from the active quiz rule table"""
+    rng = random.Random(f"{seed}:quiz")
+    cohort = []
+    for _ in range(count):
+        responses = []
+        for question in ecoscore.QUIZ_RULES.questions:
+            if rng.random() < 0.1:
+                continue  # unanswered
+            kind = question.get("kind", "choice")
+            if kind == "choice":
+                answer = rng.choice(list(question.get("answers", {})) + ["other"])
+            elif kind == "rating":
+                answer = str(rng.randint(1, 5))
+            else:
+                answer = [f"action-{n}" for n in range(rng.randint(0, 4))]
+            responses.append({"question_id": question["question_id"], "answer": answer})
+        cohort.append(responses)
+    return cohort
+
+def _prepare_stage(stage: str, items: List[Dict], quiz: List[List[Dict]]) -> Callable[[], object]:
+    """Callable running one stage over a workload; inputs it needs are built here, untimed"""
+    model = get_scoring_model()
+    if stage == "score_item":
+        return lambda: [score_item(item, model) for item in items]
+    if stage == "score_items_matrix":
+        return lambda: score_items_matrix(items, model)
+    if stage == "calculate_ecoscore":
+        return lambda: calculate_ecoscore(items, model=model)
+    if stage == "calculate_ecoscore_core":
+        return lambda: calculate_ecoscore(items, model=model, sections=())
+    if stage == "generate_recommendations":
+        batch = score_items_matrix(items, model)
+        averages = batch.boundary_averages()
+        return lambda: generate_recommendations(averages, items, model)
+    if stage == "create_boundary_details":
+        batch = score_items_matrix(items, model)
+        averages = batch.boundary_averages()
+        scored = batch.scored_items(items)
+        return lambda: create_boundary_details(averages, scored, model)
+    if stage == "quiz_single":
+        return lambda: [calculate_ecoscore_from_quiz_responses(responses, model, sections=()) for responses in quiz]
+    if stage == "quiz_cohort":
+        return lambda: score_quiz_cohort(quiz, model)
+    if stage == "score_uncertainty":
+        return lambda: score_uncertainty(items, model=model, seed=DEFAULT_SEED)
+    raise ValueError(f"Unknown stage '{stage}' (available: {', '.join(STAGES)})")
+
+def measure(run: Callable[[], object], cold_cache: bool = True) -> Dict:
+    """
+    Time a stage and measure its peak traced memory
+
+    Timing repeats the call until MIN_MEASURE_SECONDS have elapsed (at least
+    once); memory is taken from one separate traced call, since tracing slows
+    the code down. With cold_cache the item score cache is cleared before
+    every call.
+    """
+    timings = []
+    started = time.perf_counter()
+    while not timings or (time.perf_counter() - started < MIN_MEASURE_SECONDS and len(timings) < MAX_REPEATS):
+        if cold_cache:
+            SCORE_CACHE.clear()
+        gc.collect()
+        call_started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - call_started)
+
+    if cold_cache:
+        SCORE_CACHE.clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeats": len(timings),
+        "seconds_best": min(timings),
+        "seconds_mean": sum(timings) / len(timings),
+        "peak_memory_bytes": peak
+    }
+
+def run_benchmarks(sizes=DEFAULT_SIZES, distributions=DISTRIBUTIONS, stages=STAGES,
+                   seed: int = DEFAULT_SEED, cold_cache: bool = True, progress: bool = True) -> List[Dict]:
+    """Run every stage for every size and distribution, returning one record per combination"""
+    results = []
+    for size in sizes:
+        quiz = generate_quiz_cohort(size, seed) if any(stage in QUIZ_STAGES for stage in stages) else []
+        for distribution in distributions:
+            items = generate_items(size, distribution, seed)
+            for stage in stages:
+                if stage in QUIZ_STAGES and distribution != distributions[0]:
+                    continue
+                run = _prepare_stage(stage, items, quiz)
+                measured = measure(run, cold_cache)
+                record = {
+                    "stage": stage,
+                    "distribution": None if stage in QUIZ_STAGES else distribution,
+                    "size": size,
+                    **measured,
+                    "items_per_second": size / measured["seconds_best"] if measured["seconds_best"] else None
+                }
+                results.append(record)
+                if progress:
+                    print(f"{stage:<26} {record['distribution'] or '-':<8} {size:>8} "
+                          f"{record['items_per_second']:>14,.0f} items/s "
+                          f"{measured['peak_memory_bytes'] / 1e6:>9.1f} MB peak", file=sys.stderr)
+            del items
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+def benchmark_metadata(seed: int, cold_cache: bool) -> Dict:
+    model = get_scoring_model()
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "cold_cache": cold_cache,
+        "model_version": model.version,
+        "factor_tables_version": model.source_index.version
+    }
+
+def _result_key(record: Dict):
+    return record["stage"], record["distribution"], record["size"]
+
+def compare_results(baseline: Dict, current: Dict) -> List[Dict]:
+    """Per-combination throughput and peak memory ratios (current / baseline)"""
+    previous = {_result_key(record): record for record in baseline.get("results", [])}
+    comparison = []
+    for record in current.get("results", []):
+        before = previous.get(_result_key(record))
+        if not before:
+            continue
+        comparison.append({
+            "stage": record["stage"],
+            "distribution": record["distribution"],
+            "size": record["size"],
+            "throughput_ratio": record["items_per_second"] / before["items_per_second"]
+            if before["items_per_second"] else None,
+            "memory_ratio": record["peak_memory_bytes"] / before["peak_memory_bytes"]
+            if before["peak_memory_bytes"] else None
+        })
+    return comparison
+
+def _parse_list(value: str, cast=str) -> List:
+    return [cast(part.strip()) for part in value.split(",") if part.strip()]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the EcoScore engine on synthetic workloads")
+    parser.add_argument("--sizes", help="Comma-separated workload sizes (default: 1,100,10000)")
+    parser.add_argument("--full", action="store_true", help="Include 1M-item workloads")
+    parser.add_argument("--distributions", help=f"Comma-separated subset of {','.join(DISTRIBUTIONS)}")
+    parser.add_argument("--stages", help=f"Comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Workload generator seed")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the item score cache between calls")
+    parser.add_argument("-o", "--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    sizes = _parse_list(args.sizes, int) if args.sizes else (FULL_SIZES if args.full else DEFAULT_SIZES)
+    distributions = _parse_list(args.distributions) if args.distributions else DISTRIBUTIONS
+    stages = _parse_list(args.stages) if args.stages else STAGES
+    for name in stages:
+        if name not in STAGES:
+            parser.error(f"unknown stage '{name}'")
+    for name in distributions:
+        if name not in DISTRIBUTIONS:
+            parser.error(f"unknown distribution '{name}'")
+
+    report = {
+        "meta": benchmark_metadata(args.seed, not args.warm_cache),
+        "results": run_benchmarks(sizes, distributions, stages, args.seed, not args.warm_cache)
+    }
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["comparison"] = compare_results(json.load(f), report)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
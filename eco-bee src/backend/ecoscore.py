@@ -1,9 +1,16 @@
 import json
 import os
 import csv
+import re
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from collections import OrderedDict
+from collections.abc import Mapping
+import itertools
+import threading
+
+import numpy as np
 
 # Enhanced Planetary Boundaries EcoScore Engine
 # Full implementation of Stockholm Resilience Centre framework
@@ -282,6 +289,443 @@ FACTOR_TABLES = {
     }
 }
 
+# Item types accepted at intake mapped onto factor table names
+TYPE_MAPPING = {
+    'meal': 'food',
+    'food': 'food',
+    'beverage': 'food',
+    'drink': 'food',
+    'outfit': 'fashion',
+    'clothing': 'fashion',
+    'apparel': 'fashion',
+    'transport': 'mobility',
+    'mobility': 'mobility',
+    'travel': 'mobility',
+    'job': 'career',
+    'career': 'career',
+    'work': 'career',
+    'lifestyle': 'lifestyle',
+    'habit': 'lifestyle'
+}
+
+# Keyword vocabularies in an item's category or materials that scale its impact
+# down (positive) or up (negative); overridden by modifier_keywords.json
+POSITIVE_MODIFIER_KEYWORDS = ['local', 'organic', 'recycled', 'sustainable', 'eco']
+NEGATIVE_MODIFIER_KEYWORDS = ['fast', 'processed', 'imported', 'synthetic']
+MODIFIER_KEYWORDS_FILE = Path(__file__).parent / "modifier_keywords.json"
+
+def _compile_vocabulary(keywords: List[str]):
+    """Single alternation pattern matching any keyword as a substring, None if empty"""
+    if not keywords:
+        return None
+    # Longest first so the pattern's alternatives never shadow each other
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(re.escape(keyword) for keyword in ordered))
+
+class ModifierMatcher:
+    """
+    Precompiled matcher for the contextual modifier vocabularies
+
+    Category and materials are joined into one text and each vocabulary is a
+    single compiled pattern, so classifying an item costs one regex search per
+    vocabulary regardless of how many keywords it holds.
+    """
+
+    def __init__(self, positive: List[str], negative: List[str]):
+        self.positive_keywords = tuple(keyword.lower() for keyword in positive)
+        self.negative_keywords = tuple(keyword.lower() for keyword in negative)
+        self._positive = _compile_vocabulary(list(self.positive_keywords))
+        self._negative = _compile_vocabulary(list(self.negative_keywords))
+
+    def classify(self, category: str, materials: List[str]) -> Tuple[bool, bool]:
+        """(positive, negative) for already lowercased category and materials"""
+        # Newline never occurs in a keyword, so matches cannot span two fields
+        text = "\n".join([category, *materials]) if materials else category
+        positive = self._positive is not None and self._positive.search(text) is not None
+        negative = self._negative is not None and self._negative.search(text) is not None
+        return positive, negative
+
+def load_modifier_keywords(path: Path = MODIFIER_KEYWORDS_FILE) -> ModifierMatcher:
+    """Build a ModifierMatcher from a JSON vocabulary file, falling back to the defaults"""
+    positive, negative = POSITIVE_MODIFIER_KEYWORDS, NEGATIVE_MODIFIER_KEYWORDS
+    try:
+        if Path(path).exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            positive = data.get('positive', positive)
+            negative = data.get('negative', negative)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error loading modifier keywords {path}: {e}")
+    return ModifierMatcher(positive, negative)
+
+# Active modifier vocabularies, replaced by install_modifier_keywords
+MODIFIER_MATCHER = load_modifier_keywords()
+
+def install_modifier_keywords(positive: List[str], negative: List[str]) -> ModifierMatcher:
+    """Compile new modifier vocabularies and make them active"""
+    global MODIFIER_MATCHER
+    MODIFIER_MATCHER = ModifierMatcher(positive, negative)
+    return MODIFIER_MATCHER
+
+class CompiledFactorTable:
+    """
+    Lookup structures for a single factor table
+
+    Keeps the table's category order so partial matches resolve to the same
+    entry a linear scan would have picked first.
+    """
+
+    def __init__(self, table_data: Dict, boundary_keys: Optional[List[str]] = None):
+        self.boundary_keys = list(PLANETARY_BOUNDARIES.keys()) if boundary_keys is None else list(boundary_keys)
+        self.categories = list(table_data.keys())
+        self.entries = list(table_data.values())
+        self.exact = {}
+        for position, category in enumerate(self.categories):
+            self.exact.setdefault(category, position)
+
+        # Every substring of every category -> first category containing it
+        self.substrings = {}
+        for position, category in enumerate(self.categories):
+            length = len(category)
+            for start in range(length + 1):
+                for end in range(start, length + 1):
+                    self.substrings.setdefault(category[start:end], position)
+
+        # Category lengths to probe when a category is contained in the query
+        self.category_lengths = sorted(set(len(category) for category in self.categories))
+        self.fallback_scores = self._average_scores()
+
+        # Boundary matrix for batch scoring: one row per entry plus the fallback row,
+        # NaN where an entry has no value for a boundary
+        self.fallback_position = len(self.entries)
+        rows = [
+            [float(scores[boundary]) if isinstance(scores, dict) and boundary in scores else np.nan
+             for boundary in self.boundary_keys]
+            for scores in self.entries
+        ]
+        rows.append([float(self.fallback_scores.get(boundary, 50)) for boundary in self.boundary_keys])
+        self.matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(self.boundary_keys))
+
+    def _average_scores(self) -> Dict:
+        """Per-boundary averages used when nothing in the table matches"""
+        all_scores = [scores for scores in self.entries if isinstance(scores, dict)]
+        if not all_scores:
+            return {boundary: 50 for boundary in self.boundary_keys}
+
+        averages = {}
+        for boundary in self.boundary_keys:
+            boundary_scores = [scores.get(boundary, 50) for scores in all_scores if boundary in scores]
+            averages[boundary] = sum(boundary_scores) / len(boundary_scores) if boundary_scores else 50
+        return averages
+
+    def find_partial(self, text: str) -> Optional[int]:
+        """
+        Position of the first category that contains `text` or is contained in it
+
+        Equivalent to scanning the table in order with
+        `text in category or category in text`, without touching every entry.
+        """
+        best = self.substrings.get(text)
+        text_length = len(text)
+        for length in self.category_lengths:
+            if length > text_length:
+                break
+            for start in range(text_length - length + 1):
+                position = self.exact.get(text[start:start + length])
+                if position is not None and (best is None or position < best):
+                    best = position
+                    if best == 0:
+                        return best
+        return best
+
+    def match_position(self, category: str, materials: List[str]) -> int:
+        """Row of `matrix` for a category, falling back to materials then the average row"""
+        position = self.exact.get(category)
+        if position is not None:
+            return position if self.entries[position] else self.fallback_position
+
+        position = self.find_partial(category)
+        if position is not None and self.entries[position]:
+            return position
+
+        if materials:
+            for material in materials:
+                position = self.find_partial(material.lower())
+                if position is not None:
+                    return position if self.entries[position] else self.fallback_position
+
+        return self.fallback_position
+
+    def match(self, category: str, materials: List[str]) -> Dict:
+        """Resolve base scores for a category, falling back to materials then averages"""
+        position = self.match_position(category, materials)
+        if position == self.fallback_position:
+            return self.fallback_scores.copy()
+        return self.entries[position].copy()
+
+class FactorIndex:
+    """
+    Compiled match index over a set of factor tables
+
+    Built once whenever factor tables are loaded so that score_item resolves
+    categories with hash lookups instead of scanning the tables per item.
+    `version` identifies the table revision (0 for the built-in FACTOR_TABLES).
+    """
+
+    def __init__(self, tables: Dict, boundary_keys: Optional[List[str]] = None, version: int = 0):
+        self.tables = tables
+        self.version = version
+        self.boundary_keys = list(PLANETARY_BOUNDARIES.keys()) if boundary_keys is None else list(boundary_keys)
+        self.compiled = {name: CompiledFactorTable(data, self.boundary_keys) for name, data in tables.items()}
+        self.default_table = self.compiled.get('lifestyle') or CompiledFactorTable({}, self.boundary_keys)
+
+    def with_boundaries(self, boundary_keys: List[str]) -> "FactorIndex":
+        """Same tables recompiled with one matrix column per given boundary"""
+        return FactorIndex(self.tables, boundary_keys, self.version)
+
+    def table_for(self, factor_key: str) -> CompiledFactorTable:
+        """Compiled table for a factor key, defaulting to lifestyle"""
+        return self.compiled.get(factor_key, self.default_table)
+
+    def match(self, factor_key: str, category: str, materials: List[str]) -> Dict:
+        """Base scores for an item's category and materials within a factor table"""
+        return self.table_for(factor_key).match(category, materials)
+
+# Index over the active factor tables, rebuilt by install_factor_tables
+FACTOR_INDEX = FactorIndex(FACTOR_TABLES)
+
+def install_factor_tables(tables: Dict, version: int = 0) -> FactorIndex:
+    """Compile factor tables (e.g. from load_factor_tables_from_csv) and make them active"""
+    index = FactorIndex(tables, version=version)
+    activate_factor_index(index)
+    return index
+
+# Upper composite score bound for each letter grade; anything above is "F"
+GRADE_THRESHOLDS = (
+    (20, "A+"),
+    (30, "A"),
+    (40, "B+"),
+    (50, "B"),
+    (60, "C+"),
+    (70, "C"),
+    (80, "D+"),
+    (90, "D"),
+)
+
+def boundary_fingerprint(boundaries: Optional[Dict] = None) -> Tuple:
+    """Snapshot of the boundary configuration a scoring model is compiled from"""
+    boundaries = PLANETARY_BOUNDARIES if boundaries is None else boundaries
+    return tuple(
+        (key, boundary.name, boundary.weight, boundary.safe_operating_space,
+         boundary.current_global_status, boundary.units, boundary.description)
+        for key, boundary in boundaries.items()
+    )
+
+_model_versions = itertools.count(1)
+
+@dataclass(frozen=True, eq=False)
+class ScoringModel:
+    """
+    Immutable, versioned scoring configuration
+
+    Holds everything per-item scoring and aggregation need, precomputed once:
+    the compiled factor index, per-boundary normalization slope and cap
+    (normalized = min(cap, raw / 100 * slope)), the weight vector and the
+    grade thresholds. Build with build_scoring_model.
+    """
+    version: int
+    boundaries: Dict[str, BoundaryConfig]
+    boundary_keys: Tuple[str, ...]
+    factor_index: FactorIndex
+    source_index: FactorIndex
+    modifiers: ModifierMatcher
+    slopes: np.ndarray
+    caps: np.ndarray
+    weights: np.ndarray
+    grade_thresholds: Tuple[Tuple[float, str], ...]
+    fingerprint: Tuple
+    item_fingerprint: Tuple
+
+    def normalize_value(self, raw_score: float, boundary_key: str) -> float:
+        """Normalize one raw factor score for a boundary to the 0-100 scale"""
+        position = self.boundary_keys.index(boundary_key)
+        normalized_score = min(self.caps[position], raw_score / 100.0 * self.slopes[position])
+        return float(max(0, min(100, normalized_score)))
+
+    def normalize(self, raw: np.ndarray) -> np.ndarray:
+        """Normalize an N x boundaries raw matrix; NaN entries count as 50"""
+        filled = np.where(np.isnan(raw), 50.0, raw)
+        return np.clip(np.minimum(self.caps, filled / 100.0 * self.slopes), 0, 100)
+
+    def weight(self, boundary_key: str) -> float:
+        return float(self.weights[self.boundary_keys.index(boundary_key)])
+
+    def weighting_scheme(self) -> Dict[str, float]:
+        return dict(zip(self.boundary_keys, self.weights.tolist()))
+
+    def composite(self, per_boundary_averages: Dict) -> float:
+        """Weighted mean of per-boundary averages, 50 when no boundary is present"""
+        composite_score = 0.0
+        total_weight = 0.0
+        
+        for boundary_key, weight in zip(self.boundary_keys, self.weights.tolist()):
+            if boundary_key in per_boundary_averages:
+                composite_score += per_boundary_averages[boundary_key] * weight
+                total_weight += weight
+        
+        if total_weight > 0:
+            return composite_score / total_weight
+        return 50.0
+
+    def composites(self, averages: np.ndarray) -> np.ndarray:
+        """composite() for each row of an N x boundaries matrix of per-boundary averages"""
+        composite_scores = np.zeros(len(averages))
+        total_weight = 0.0
+        # Accumulated boundary by boundary so each row equals composite() exactly
+        for column, weight in enumerate(self.weights.tolist()):
+            composite_scores += averages[:, column] * weight
+            total_weight += weight
+        if total_weight > 0:
+            return composite_scores / total_weight
+        return np.full(len(averages), 50.0)
+
+    def grade(self, composite_score: float) -> str:
+        """Letter grade for a composite score"""
+        for upper_bound, grade in self.grade_thresholds:
+            if composite_score <= upper_bound:
+                return grade
+        return "F"
+
+    def grades(self, composite_scores: np.ndarray) -> List[str]:
+        """Letter grades for an array of composite scores"""
+        grades = np.full(len(composite_scores), "F", dtype=object)
+        unassigned = np.ones(len(composite_scores), dtype=bool)
+        for upper_bound, grade in self.grade_thresholds:
+            matched = unassigned & (composite_scores <= upper_bound)
+            grades[matched] = grade
+            unassigned &= ~matched
+        return grades.tolist()
+
+    def methodology(self) -> Dict:
+        return {
+            "framework": "Stockholm Resilience Centre Planetary Boundaries",
+            "version": "2.0",
+            "model_version": self.version,
+            "factor_tables_version": self.source_index.version,
+            "boundaries_included": list(self.boundary_keys),
+            "weighting_scheme": self.weighting_scheme()
+        }
+
+def build_scoring_model(
+    boundaries: Optional[Dict[str, BoundaryConfig]] = None,
+    factor_index: Optional[FactorIndex] = None,
+    weights: Optional[Dict[str, float]] = None,
+    grade_thresholds: Optional[Tuple[Tuple[float, str], ...]] = None,
+    modifiers: Optional[ModifierMatcher] = None
+) -> ScoringModel:
+    """
+    Compile a ScoringModel
+
+    Args:
+        boundaries: Boundary configuration, defaults to PLANETARY_BOUNDARIES
+        factor_index: Compiled factor tables, defaults to the active FACTOR_INDEX
+        weights: Optional per-boundary weight overrides (e.g. for A/B weighting schemes)
+        grade_thresholds: Optional replacement for GRADE_THRESHOLDS
+        modifiers: Contextual modifier vocabularies, defaults to MODIFIER_MATCHER
+    """
+    source = PLANETARY_BOUNDARIES if boundaries is None else boundaries
+    source_index = FACTOR_INDEX if factor_index is None else factor_index
+    modifiers = MODIFIER_MATCHER if modifiers is None else modifiers
+    
+    snapshot = {}
+    for key, boundary in source.items():
+        snapshot[key] = replace(boundary)
+        if weights and key in weights:
+            snapshot[key] = replace(boundary, weight=float(weights[key]))
+    
+    boundary_keys = tuple(snapshot.keys())
+    factor_index = source_index
+    if tuple(factor_index.boundary_keys) != boundary_keys:
+        # Factor matrices must have one column per boundary of this model
+        factor_index = source_index.with_boundaries(list(boundary_keys))
+    
+    slopes = []
+    caps = []
+    for boundary in snapshot.values():
+        if boundary.current_global_status > boundary.safe_operating_space:
+            # Already in transgression zone globally
+            global_transgression = (boundary.current_global_status - boundary.safe_operating_space) / boundary.safe_operating_space
+            slopes.append(50 + global_transgression * 50)
+            caps.append(100.0)
+        else:
+            # Still within safe operating space globally
+            slopes.append(50.0)
+            caps.append(50.0)
+    
+    arrays = [np.array(values, dtype=np.float64) for values in
+              (slopes, caps, [boundary.weight for boundary in snapshot.values()])]
+    for array in arrays:
+        array.setflags(write=False)
+    
+    return ScoringModel(
+        version=next(_model_versions),
+        boundaries=snapshot,
+        boundary_keys=boundary_keys,
+        factor_index=factor_index,
+        source_index=source_index,
+        modifiers=modifiers,
+        slopes=arrays[0],
+        caps=arrays[1],
+        weights=arrays[2],
+        grade_thresholds=tuple(GRADE_THRESHOLDS if grade_thresholds is None else grade_thresholds),
+        fingerprint=boundary_fingerprint(source),
+        item_fingerprint=(boundary_keys, tuple(slopes), tuple(caps),
+                          modifiers.positive_keywords, modifiers.negative_keywords)
+    )
+
+# Model compiled from the module globals, refreshed when they change
+_DEFAULT_MODEL = build_scoring_model()
+# Explicitly installed model, takes precedence over the default when set
+_INSTALLED_MODEL = None
+
+def get_scoring_model() -> ScoringModel:
+    """Active scoring model: the installed one, else one compiled from the current globals"""
+    global _DEFAULT_MODEL
+    if _INSTALLED_MODEL is not None:
+        return _INSTALLED_MODEL
+    
+    model = _DEFAULT_MODEL
+    if (model.source_index is not FACTOR_INDEX or model.modifiers is not MODIFIER_MATCHER
+            or model.fingerprint != boundary_fingerprint()):
+        model = build_scoring_model()
+        _DEFAULT_MODEL = model
+    return model
+
+def activate_factor_index(index: FactorIndex) -> ScoringModel:
+    """
+    Make an already compiled factor index active together with its default model
+
+    Both are built by the caller (e.g. a background reload thread) so requests
+    never pay for compilation; each request sees either the old or the new tables.
+    """
+    global FACTOR_INDEX, _DEFAULT_MODEL
+    model = build_scoring_model(factor_index=index)
+    FACTOR_INDEX = index
+    _DEFAULT_MODEL = model
+    return model
+
+def install_scoring_model(model: Optional[ScoringModel]) -> Optional[ScoringModel]:
+    """
+    Atomically swap the scoring model used by default
+
+    Pass None to go back to the model compiled from PLANETARY_BOUNDARIES and
+    the active factor tables. Returns the previously installed model.
+    """
+    global _INSTALLED_MODEL
+    previous = _INSTALLED_MODEL
+    _INSTALLED_MODEL = model
+    return previous
+
 def normalize_boundary_score(raw_score: float, boundary_key: str) -> float:
     """
     Normalize boundary score to 0-100 scale using scientific thresholds
@@ -294,195 +738,242 @@ def normalize_boundary_score(raw_score: float, boundary_key: str) -> float:
     Returns:
         Normalized score where lower is better for the environment
     """
-    boundary = PLANETARY_BOUNDARIES[boundary_key]
-    
-    # For scores already in 0-100 range from factor tables, apply transgression scaling
-    # Higher factor table scores = more environmental impact = higher transgression
-    transgression_factor = raw_score / 100.0
-    
-    # Scale by current global transgression level
-    if boundary.current_global_status > boundary.safe_operating_space:
-        # Already in transgression zone globally
-        global_transgression = (boundary.current_global_status - boundary.safe_operating_space) / boundary.safe_operating_space
-        normalized_score = min(100, transgression_factor * (50 + global_transgression * 50))
-    else:
-        # Still within safe operating space globally
-        normalized_score = min(50, transgression_factor * 50)
-    
-    return max(0, min(100, normalized_score))
+    # Transgression scaling is precomputed per boundary in the scoring model
+    return get_scoring_model().normalize_value(raw_score, boundary_key)
+
+def weighted_composite(per_boundary_averages: Dict, model: Optional[ScoringModel] = None) -> float:
+    """Weighted mean of per-boundary averages using the scoring model's weights"""
+    model = model or get_scoring_model()
+    return model.composite(per_boundary_averages)
+
+# Result fields every score carries
+CORE_RESULT_FIELDS = ('per_boundary_averages', 'composite', 'grade')
+
+# Optional result sections, built only when requested
+RESULT_SECTIONS = ('items', 'recommendations', 'boundary_details', 'methodology')
 
-def calculate_ecoscore(items: List[Dict], context: Optional[Dict] = None) -> Dict:
+def resolve_sections(sections=None) -> frozenset:
+    """
+    Normalize a sections/fields selection to the set of optional sections to build
+
+    Accepts None (all sections), a comma-separated string or an iterable of
+    names. Core fields may be listed but are always included.
+    """
+    if sections is None:
+        return frozenset(RESULT_SECTIONS)
+    if isinstance(sections, str):
+        sections = [name.strip() for name in sections.split(',') if name.strip()]
+    requested = set(sections)
+    unknown = requested.difference(RESULT_SECTIONS, CORE_RESULT_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown result sections: {', '.join(sorted(unknown))} "
+            f"(available: {', '.join(CORE_RESULT_FIELDS + RESULT_SECTIONS)})"
+        )
+    return frozenset(requested.intersection(RESULT_SECTIONS))
+
+def assemble_result(wanted: frozenset, per_boundary_averages: Dict, composite_score: float, grade: str,
+                    items=None, recommendations=None, boundary_details=None, methodology=None) -> Dict:
+    """
+    Score result in the standard field order, holding only the wanted sections
+
+    Optional sections are passed as zero-argument callables and only called
+    when wanted.
+    """
+    result = {}
+    if 'items' in wanted:
+        result["items"] = items()
+    result["per_boundary_averages"] = per_boundary_averages
+    result["composite"] = round(composite_score, 1)
+    result["grade"] = grade
+    if 'recommendations' in wanted:
+        result["recommendations"] = recommendations()
+    if 'boundary_details' in wanted:
+        result["boundary_details"] = boundary_details()
+    if 'methodology' in wanted:
+        result["methodology"] = methodology()
+    return result
+
+def calculate_ecoscore(items: List[Dict], context: Optional[Dict] = None,
+                       model: Optional[ScoringModel] = None, sections=None) -> Dict:
     """
     Calculate comprehensive EcoScore using planetary boundaries framework
     
     Args:
         items: List of items to score (food, clothing, transport, etc.)
         context: Additional context like location, season, personal factors
+        model: Scoring model to evaluate against, defaults to get_scoring_model()
+        sections: Optional sections to include (see RESULT_SECTIONS), default all;
+            per_boundary_averages, composite and grade are always included
     
     Returns:
         Comprehensive scoring result with per-boundary and composite scores
     """
+    model = model or get_scoring_model()
+    wanted = resolve_sections(sections)
     if not items:
-        return create_default_ecoscore()
-    
-    # Score each item across all boundaries
-    scored_items = []
-    boundary_scores = {boundary: [] for boundary in PLANETARY_BOUNDARIES.keys()}
-    
-    for item in items:
-        scored_item = score_item(item)
-        scored_items.append(scored_item)
-        
-        # Collect boundary scores for averaging
-        for boundary in PLANETARY_BOUNDARIES.keys():
-            if boundary in scored_item:
-                boundary_scores[boundary].append(scored_item[boundary])
-    
-    # Calculate per-boundary averages
-    per_boundary_averages = {}
-    for boundary, scores in boundary_scores.items():
-        if scores:
-            per_boundary_averages[boundary] = sum(scores) / len(scores)
-        else:
-            per_boundary_averages[boundary] = 50.0  # Default neutral score
-    
-    # Calculate weighted composite score
-    composite_score = 0.0
-    total_weight = 0.0
+        return create_default_ecoscore(model, wanted)
     
-    for boundary_key, boundary_config in PLANETARY_BOUNDARIES.items():
-        if boundary_key in per_boundary_averages:
-            weighted_score = per_boundary_averages[boundary_key] * boundary_config.weight
-            composite_score += weighted_score
-            total_weight += boundary_config.weight
+    # Score all items across all boundaries in one batch
+    batch = score_items_matrix(items, model)
+    return _batch_result(items, batch, model, wanted)
+
+def calculate_ecoscores(baskets: List[List[Dict]], model: Optional[ScoringModel] = None,
+                        sections=None) -> List[Dict]:
+    """
+    EcoScores for many baskets at once, each equal to calculate_ecoscore(basket)
+
+    The items of every basket go through a single score_items_matrix call;
+    each basket's result is then built from its slice of the shared matrices.
+    """
+    model = model or get_scoring_model()
+    wanted = resolve_sections(sections)
+    items = [item for basket in baskets for item in basket]
+    batch = score_items_matrix(items, model) if items else None
     
-    if total_weight > 0:
-        composite_score = composite_score / total_weight
-    else:
-        composite_score = 50.0
+    results = []
+    start = 0
+    for basket in baskets:
+        if not basket:
+            results.append(create_default_ecoscore(model, wanted))
+            continue
+        stop = start + len(basket)
+        results.append(_batch_result(basket, batch.slice(start, stop), model, wanted))
+        start = stop
+    return results
+
+def _batch_result(items: List[Dict], batch: "BatchScores", model: ScoringModel, wanted: frozenset) -> Dict:
+    """calculate_ecoscore result for items already scored into `batch`"""
+    per_boundary_averages = batch.boundary_averages()
+    composite_score = model.composite(per_boundary_averages)
     
     # Generate grade based on composite score
-    grade = calculate_grade(composite_score)
-    
-    # Generate boundary-specific recommendations
-    recommendations = generate_recommendations(per_boundary_averages, scored_items)
+    grade = model.grade(composite_score)
     
-    # Create detailed boundary analysis
-    boundary_details = create_boundary_details(per_boundary_averages, scored_items)
+    def boundary_details():
+        # Only items that can appear as a boundary's top contributors are materialized
+        rows = batch.contributor_rows()
+        contributors = batch.take(rows).scored_items([items[row] for row in rows])
+        return create_boundary_details(per_boundary_averages, contributors, model)
     
-    return {
-        "items": scored_items,
-        "per_boundary_averages": per_boundary_averages,
-        "composite": round(composite_score, 1),
-        "grade": grade,
-        "recommendations": recommendations,
-        "boundary_details": boundary_details,
-        "methodology": {
-            "framework": "Stockholm Resilience Centre Planetary Boundaries",
-            "version": "2.0",
-            "boundaries_included": list(PLANETARY_BOUNDARIES.keys()),
-            "weighting_scheme": {k: v.weight for k, v in PLANETARY_BOUNDARIES.items()}
-        }
-    }
+    return assemble_result(
+        wanted, per_boundary_averages, composite_score, grade,
+        items=lambda: batch.scored_items(items),
+        # Recommendations only look at item types, which scoring leaves unchanged
+        recommendations=lambda: generate_recommendations(per_boundary_averages, items, model),
+        boundary_details=boundary_details,
+        methodology=model.methodology
+    )
 
-def create_default_ecoscore() -> Dict:
+def create_default_ecoscore(model: Optional[ScoringModel] = None, sections=None) -> Dict:
     """Create default EcoScore when no items provided"""
-    default_scores = {boundary: 50.0 for boundary in PLANETARY_BOUNDARIES.keys()}
+    model = model or get_scoring_model()
+    default_scores = {boundary: 50.0 for boundary in model.boundary_keys}
     
-    return {
-        "items": [],
-        "per_boundary_averages": default_scores,
-        "composite": 50.0,
-        "grade": "C",
-        "recommendations": generate_recommendations(default_scores, []),
-        "boundary_details": create_boundary_details(default_scores, []),
-        "methodology": {
-            "framework": "Stockholm Resilience Centre Planetary Boundaries",
-            "version": "2.0",
-            "boundaries_included": list(PLANETARY_BOUNDARIES.keys()),
-            "weighting_scheme": {k: v.weight for k, v in PLANETARY_BOUNDARIES.items()}
-        }
-    }
+    return assemble_result(
+        resolve_sections(sections), default_scores, 50.0, "C",
+        items=list,
+        recommendations=lambda: generate_recommendations(default_scores, [], model),
+        boundary_details=lambda: create_boundary_details(default_scores, [], model),
+        methodology=model.methodology
+    )
 
-def calculate_grade(composite_score: float) -> str:
+def calculate_grade(composite_score: float, model: Optional[ScoringModel] = None) -> str:
     """Calculate letter grade based on composite EcoScore"""
-    if composite_score <= 20:
-        return "A+"
-    elif composite_score <= 30:
-        return "A"
-    elif composite_score <= 40:
-        return "B+"
-    elif composite_score <= 50:
-        return "B"
-    elif composite_score <= 60:
-        return "C+"
-    elif composite_score <= 70:
-        return "C"
-    elif composite_score <= 80:
-        return "D+"
-    elif composite_score <= 90:
-        return "D"
-    else:
-        return "F"
+    return (model or get_scoring_model()).grade(composite_score)
+
+RECOMMENDATION_TEMPLATES_FILE = Path(__file__).parent / "recommendation_templates.json"
+
+class RecommendationIndex:
+    """
+    Recommendation templates compiled into a (boundary, context class) lookup
+
+    Context classes group item types (e.g. food: food, meal) in priority
+    order. Each template lists the classes it suits; for every boundary the
+    first template of each class is indexed, and the boundary's first
+    template is the default. Selection is one classification pass over the
+    items and a few dict lookups per boundary.
+    """
+
+    def __init__(self, spec: Dict):
+        self.context_classes = list(spec.get("context_classes", {}))
+        self._class_of_type = {}
+        for context_class, item_types in spec.get("context_classes", {}).items():
+            for item_type in item_types:
+                self._class_of_type.setdefault(item_type.lower(), context_class)
+        
+        self.templates = {}
+        self._index = {}
+        for boundary_key, templates in spec.get("templates", {}).items():
+            self.templates[boundary_key] = [
+                {key: value for key, value in template.items() if key != "contexts"} for template in templates
+            ]
+            for template, compiled in zip(templates, self.templates[boundary_key]):
+                self._index.setdefault((boundary_key, None), compiled)
+                for context_class in template.get("contexts", []):
+                    self._index.setdefault((boundary_key, context_class), compiled)
+
+    def classify(self, items: List[Dict]) -> Tuple[str, ...]:
+        """Context classes present among the items, in priority order"""
+        present = {self._class_of_type.get(item.get('type', '').lower()) for item in items}
+        return tuple(context_class for context_class in self.context_classes if context_class in present)
+
+    def select(self, boundary_key: str, contexts: Tuple[str, ...]) -> Optional[Dict]:
+        """Template for a boundary given the item contexts, None if the boundary has none"""
+        for context_class in contexts:
+            template = self._index.get((boundary_key, context_class))
+            if template is not None:
+                return template
+        return self._index.get((boundary_key, None))
+
+def load_recommendation_templates(path: Path = RECOMMENDATION_TEMPLATES_FILE) -> RecommendationIndex:
+    """Compile the recommendation template library from JSON"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return RecommendationIndex(json.load(f))
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error loading recommendation templates {path}: {e}")
+        return RecommendationIndex({})
+
+# Active recommendation templates, replaced by install_recommendation_templates
+RECOMMENDATION_INDEX = load_recommendation_templates()
 
-def generate_recommendations(boundary_scores: Dict, items: List[Dict]) -> List[Dict]:
+def install_recommendation_templates(spec: Dict) -> RecommendationIndex:
+    """Compile a recommendation template spec and make it active"""
+    global RECOMMENDATION_INDEX
+    RECOMMENDATION_INDEX = RecommendationIndex(spec)
+    return RECOMMENDATION_INDEX
+
+def generate_recommendations(boundary_scores: Dict, items: List[Dict],
+                             model: Optional[ScoringModel] = None,
+                             index: Optional[RecommendationIndex] = None,
+                             contexts: Optional[Tuple[str, ...]] = None) -> List[Dict]:
     """
     Generate personalized recommendations based on boundary pressure analysis
     Focus on highest impact boundaries with actionable alternatives
+    
+    Callers that already know the item context classes (index.classify) can
+    pass them as `contexts` instead of items.
     """
+    model = model or get_scoring_model()
+    index = index or RECOMMENDATION_INDEX
+    contexts = index.classify(items) if contexts is None else contexts
     recommendations = []
     
     # Sort boundaries by score (highest first - most room for improvement)
     sorted_boundaries = sorted(boundary_scores.items(), key=lambda x: x[1], reverse=True)
     
-    # Recommendation templates for each boundary
-    recommendation_templates = {
-        "climate": [
-            {"action": "Switch to plant-based meals 3 days/week", "impact": "Reduce GHG by 20-30%", "difficulty": "easy"},
-            {"action": "Use public transport or bike for short trips", "impact": "Cut transport emissions by 50%", "difficulty": "medium"},
-            {"action": "Choose renewable energy provider", "impact": "Reduce home carbon footprint by 40%", "difficulty": "easy"},
-            {"action": "Buy second-hand clothing instead of new", "impact": "Avoid 60% of textile emissions", "difficulty": "easy"}
-        ],
-        "biosphere": [
-            {"action": "Choose MSC/FSC certified products", "impact": "Support sustainable ecosystems", "difficulty": "easy"},
-            {"action": "Reduce meat consumption", "impact": "Lower land use pressure by 30%", "difficulty": "medium"},
-            {"action": "Plant native species in garden/balcony", "impact": "Support local biodiversity", "difficulty": "easy"},
-            {"action": "Join campus conservation activities", "impact": "Contribute to habitat protection", "difficulty": "easy"}
-        ],
-        "biogeochemical": [
-            {"action": "Choose organic produce when possible", "impact": "Reduce nitrogen runoff by 40%", "difficulty": "medium"},
-            {"action": "Compost food waste", "impact": "Prevent nutrient pollution", "difficulty": "easy"},
-            {"action": "Use phosphate-free cleaning products", "impact": "Reduce waterway eutrophication", "difficulty": "easy"},
-            {"action": "Support regenerative agriculture", "impact": "Improve soil nutrient cycling", "difficulty": "medium"}
-        ],
-        "freshwater": [
-            {"action": "Take shorter showers (5 min max)", "impact": "Save 25% of water usage", "difficulty": "easy"},
-            {"action": "Choose drought-resistant foods", "impact": "Reduce agricultural water demand", "difficulty": "medium"},
-            {"action": "Fix any leaks promptly", "impact": "Prevent 10% water waste", "difficulty": "easy"},
-            {"action": "Collect rainwater for plants", "impact": "Reduce demand on freshwater", "difficulty": "medium"}
-        ],
-        "aerosols": [
-            {"action": "Choose natural fiber clothing", "impact": "Reduce microplastic release", "difficulty": "medium"},
-            {"action": "Use reusable containers", "impact": "Avoid single-use plastics", "difficulty": "easy"},
-            {"action": "Walk/bike instead of driving", "impact": "Reduce particulate emissions", "difficulty": "medium"},
-            {"action": "Support plastic-free packaging", "impact": "Reduce novel entity pollution", "difficulty": "easy"}
-        ]
-    }
-    
     # Generate top recommendation for each high-impact boundary
     for boundary_key, score in sorted_boundaries[:3]:  # Top 3 boundaries
         if score > 40:  # Only if significant impact
-            boundary_name = PLANETARY_BOUNDARIES[boundary_key].name
-            templates = recommendation_templates.get(boundary_key, [])
+            # Select recommendation based on item context
+            selected_rec = index.select(boundary_key, contexts)
             
-            if templates:
-                # Select recommendation based on item context
-                selected_rec = select_contextual_recommendation(templates, items, boundary_key)
-                
+            if selected_rec:
                 recommendations.append({
                     "action": selected_rec["action"],
                     "impact": selected_rec["impact"],
-                    "boundary": boundary_name,
+                    "boundary": model.boundaries[boundary_key].name,
                     "current_score": round(score, 1),
                     "difficulty": selected_rec["difficulty"],
                     "category": boundary_key
@@ -490,37 +981,14 @@ def generate_recommendations(boundary_scores: Dict, items: List[Dict]) -> List[D
     
     return recommendations[:5]  # Limit to top 5 recommendations
 
-def select_contextual_recommendation(templates: List[Dict], items: List[Dict], boundary_key: str) -> Dict:
-    """Select most relevant recommendation based on user's items"""
-    # Analyze user's items to find most relevant recommendations
-    item_types = [item.get('type', '').lower() for item in items]
-    item_categories = [item.get('category', '').lower() for item in items]
-    
-    # Simple contextual selection logic
-    if 'food' in item_types or 'meal' in item_types:
-        food_recommendations = [r for r in templates if 'meal' in r['action'] or 'food' in r['action'] or 'meat' in r['action']]
-        if food_recommendations:
-            return food_recommendations[0]
-    
-    if 'clothing' in item_types or 'outfit' in item_types:
-        clothing_recommendations = [r for r in templates if 'clothing' in r['action'] or 'second-hand' in r['action']]
-        if clothing_recommendations:
-            return clothing_recommendations[0]
-    
-    if 'transport' in item_types or 'mobility' in item_types:
-        transport_recommendations = [r for r in templates if 'transport' in r['action'] or 'bike' in r['action']]
-        if transport_recommendations:
-            return transport_recommendations[0]
-    
-    # Default to first recommendation
-    return templates[0] if templates else {"action": "Explore sustainable alternatives", "impact": "Reduce environmental pressure", "difficulty": "easy"}
-
-def create_boundary_details(boundary_scores: Dict, items: List[Dict]) -> Dict:
+def create_boundary_details(boundary_scores: Dict, items: List[Dict],
+                            model: Optional[ScoringModel] = None) -> Dict:
     """Create detailed analysis for each planetary boundary"""
+    model = model or get_scoring_model()
     details = {}
     
     for boundary_key, score in boundary_scores.items():
-        boundary_config = PLANETARY_BOUNDARIES[boundary_key]
+        boundary_config = model.boundaries[boundary_key]
         
         # Determine status relative to safe operating space
         if score <= 25:
@@ -539,12 +1007,15 @@ def create_boundary_details(boundary_scores: Dict, items: List[Dict]) -> Dict:
         # Find contributing items for this boundary
         contributing_items = []
         for item in items:
-            if boundary_key in item and item[boundary_key] > 40:
+            impact = item.get(boundary_key)
+            if impact is not None and impact > 40:
                 contributing_items.append({
                     "type": item.get('type', 'Unknown'),
                     "category": item.get('category', 'Unknown'),
-                    "impact": item[boundary_key]
+                    "impact": impact
                 })
+                if len(contributing_items) == 3:
+                    break
         
         details[boundary_key] = {
             "score": round(score, 1),
@@ -562,93 +1033,171 @@ def create_boundary_details(boundary_scores: Dict, items: List[Dict]) -> Dict:
     
     return details
 
-def score_item(item: Dict) -> Dict:
-    """Score a single item across all planetary boundaries using enhanced factor tables"""
+@dataclass
+class CachedScore:
+    """Scoring result for one item signature, shared by score_item and the batch engine"""
+    factor_key: str
+    raw_row: np.ndarray
+    normalized_row: np.ndarray
+    batch: Optional["BatchScores"] = None  # one-row batch behind score_item results, built on first use
+
+class ScoreCache:
+    """
+    Bounded LRU cache of per-item scoring results
+
+    Keyed on an item's normalized signature (see item_signature). Entries are
+    dropped automatically when scoring switches to a model with a different
+    factor index or normalization, i.e. when factor tables are installed or
+    the boundary thresholds in PLANETARY_BOUNDARIES change. Models that only
+    differ in weights share entries.
+
+    sync() returns the generation (factor index, item fingerprint) that the
+    caller scores under; get() and put() take it back, so a lookup or a
+    result computed under a model that has since been replaced misses or is
+    dropped instead of mixing generations.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._index = None
+        self._fingerprint = None
+
+    def _is_current(self, generation: Tuple) -> bool:
+        index, fingerprint = generation
+        return index is self._index and fingerprint == self._fingerprint
+
+    def sync(self, model: ScoringModel) -> Tuple:
+        """Clear the cache if per-item results under `model` differ from those cached; returns its generation"""
+        generation = (model.factor_index, model.item_fingerprint)
+        with self._lock:
+            if not self._is_current(generation):
+                self._entries.clear()
+                self._index, self._fingerprint = generation
+        return generation
+
+    def get(self, signature: Tuple, generation: Tuple) -> Optional[CachedScore]:
+        with self._lock:
+            cached = self._entries.get(signature) if self._is_current(generation) else None
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(signature)
+            self.hits += 1
+            return cached
+
+    def put(self, signature: Tuple, cached: CachedScore, generation: Tuple):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if not self._is_current(generation):
+                return  # scored under a model that has since been replaced
+            self._entries[signature] = cached
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters and current occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Shared item result cache; size 0 disables caching
+SCORE_CACHE = ScoreCache(maxsize=int(os.getenv("ECOSCORE_CACHE_SIZE", "4096")))
+
+def item_signature(item: Dict) -> Tuple:
+    """
+    Normalized (type, category, materials) key that fully determines an item's scores
+
+    Materials keep their order because the material fallback uses the first
+    material that matches a category.
+    """
+    return (
+        item.get('type', '').lower(),
+        item.get('category', '').lower(),
+        tuple(material.lower() for material in item.get('materials', []))
+    )
+
+def item_problem(item) -> Optional[str]:
+    """Why an item cannot be scored (wrong shape or field types), or None if it can"""
+    if not isinstance(item, dict):
+        return "item is not a JSON object"
+    for field in ('type', 'category'):
+        if not isinstance(item.get(field, ''), str):
+            return f"{field} must be a string"
+    materials = item.get('materials', [])
+    if not isinstance(materials, list) or not all(isinstance(material, str) for material in materials):
+        return "materials must be a list of strings"
+    return None
+
+def _compute_item_score(item: Dict, model: ScoringModel) -> CachedScore:
+    """Match, modify and normalize one item without consulting the cache"""
     item_type = item.get('type', '').lower()
     category = item.get('category', '').lower()
     materials = item.get('materials', [])
-    
-    # Enhanced type mapping with more categories
-    type_mapping = {
-        'meal': 'food',
-        'food': 'food',
-        'beverage': 'food',
-        'drink': 'food',
-        'outfit': 'fashion',
-        'clothing': 'fashion',
-        'apparel': 'fashion',
-        'transport': 'mobility',
-        'mobility': 'mobility',
-        'travel': 'mobility',
-        'job': 'career',
-        'career': 'career',
-        'work': 'career',
-        'lifestyle': 'lifestyle',
-        'habit': 'lifestyle'
-    }
-    
-    factor_key = type_mapping.get(item_type, 'lifestyle')
-    factor_table = FACTOR_TABLES.get(factor_key, FACTOR_TABLES['lifestyle'])
-    
-    # Enhanced category matching with fallback logic
-    base_scores = {}
-    
-    # First try exact category match
-    if category in factor_table:
-        base_scores = factor_table[category].copy()
-    else:
-        # Try partial matching
-        for table_category, scores in factor_table.items():
-            if category in table_category or table_category in category:
-                base_scores = scores.copy()
-                break
-        
-        # Try material-based matching
-        if not base_scores and materials:
-            for material in materials:
-                material_lower = material.lower()
-                for table_category, scores in factor_table.items():
-                    if material_lower in table_category or table_category in material_lower:
-                        base_scores = scores.copy()
-                        break
-                if base_scores:
-                    break
-    
-    # Default to average scores if no match found
-    if not base_scores:
-        # Calculate average scores for the factor table
-        all_scores = [scores for scores in factor_table.values() if isinstance(scores, dict)]
-        if all_scores:
-            base_scores = {}
-            for boundary in PLANETARY_BOUNDARIES.keys():
-                boundary_scores = [scores.get(boundary, 50) for scores in all_scores if boundary in scores]
-                base_scores[boundary] = sum(boundary_scores) / len(boundary_scores) if boundary_scores else 50
-        else:
-            base_scores = {boundary: 50 for boundary in PLANETARY_BOUNDARIES.keys()}
-    
+
+    factor_key = TYPE_MAPPING.get(item_type, 'lifestyle')
+
+    # Exact, partial, material and average fallback matching via the compiled index
+    base_scores = model.factor_index.match(factor_key, category, materials)
+
     # Apply contextual modifiers
-    base_scores = apply_contextual_modifiers(base_scores, item)
+    base_scores = apply_contextual_modifiers(base_scores, item, model.modifiers)
     
     # Calculate normalized scores for each boundary
-    normalized_scores = {}
-    for boundary_key in PLANETARY_BOUNDARIES.keys():
-        raw_score = base_scores.get(boundary_key, 50)
-        normalized_scores[boundary_key] = normalize_boundary_score(raw_score, boundary_key)
-    
-    # Create enhanced item result
-    result = item.copy()
-    result.update(normalized_scores)
-    result['ecoscore_details'] = {
-        'factor_table_used': factor_key,
-        'category_matched': category,
-        'raw_scores': base_scores,
-        'normalized_scores': normalized_scores,
-        'description': base_scores.get('description', f"{item_type} item")
-    }
+    boundary_keys = model.boundary_keys
+    normalized_row = np.array([
+        float(model.normalize_value(base_scores.get(key, 50), key)) for key in boundary_keys
+    ])
+    raw_row = np.array([float(base_scores.get(key, np.nan)) for key in boundary_keys])
+    return CachedScore(factor_key=factor_key, raw_row=raw_row, normalized_row=normalized_row)
+
+def score_item(item: Dict, model: Optional[ScoringModel] = None) -> "ScoredItem":
+    """Score a single item across all planetary boundaries using enhanced factor tables"""
+    model = model or get_scoring_model()
+    signature = item_signature(item)
+    generation = SCORE_CACHE.sync(model)
+    cached = SCORE_CACHE.get(signature, generation)
+    if cached is None:
+        cached = _compute_item_score(item, model)
+        SCORE_CACHE.put(signature, cached, generation)
     
-    return result
+    # Scores stay in the cached entry; the result only references them
+    if cached.batch is None:
+        cached.batch = BatchScores(
+            boundary_keys=list(model.boundary_keys),
+            item_types=[signature[0]],
+            factor_keys=[cached.factor_key],
+            categories=[signature[1]],
+            raw=cached.raw_row[np.newaxis],
+            normalized=cached.normalized_row[np.newaxis]
+        )
+    return ScoredItem(item, cached.batch, 0)
+
+def contextual_modifier_flags(item: Dict, matcher: Optional[ModifierMatcher] = None) -> Tuple[bool, bool]:
+    """Whether an item triggers the positive and negative contextual modifiers"""
+    matcher = matcher or MODIFIER_MATCHER
+    materials = [m.lower() for m in item.get('materials', [])]
+    return matcher.classify(item.get('category', '').lower(), materials)
 
-def apply_contextual_modifiers(base_scores: Dict, item: Dict) -> Dict:
+def apply_contextual_modifiers(base_scores: Dict, item: Dict,
+                               matcher: Optional[ModifierMatcher] = None) -> Dict:
     """Apply contextual modifiers based on item properties"""
     modified_scores = base_scores.copy()
     
@@ -657,18 +1206,15 @@ def apply_contextual_modifiers(base_scores: Dict, item: Dict) -> Dict:
         del modified_scores['description']
     
     # Local/organic modifiers
-    materials = [m.lower() for m in item.get('materials', [])]
-    category = item.get('category', '').lower()
+    positive, negative = contextual_modifier_flags(item, matcher)
     
     # Positive modifiers (reduce impact)
-    if any(keyword in category or any(keyword in mat for mat in materials) 
-           for keyword in ['local', 'organic', 'recycled', 'sustainable', 'eco']):
+    if positive:
         for boundary in modified_scores:
             modified_scores[boundary] = max(5, modified_scores[boundary] * 0.8)
     
     # Negative modifiers (increase impact)
-    if any(keyword in category or any(keyword in mat for mat in materials) 
-           for keyword in ['fast', 'processed', 'imported', 'synthetic']):
+    if negative:
         for boundary in modified_scores:
             modified_scores[boundary] = min(95, modified_scores[boundary] * 1.2)
     
@@ -679,12 +1225,587 @@ def apply_contextual_modifiers(base_scores: Dict, item: Dict) -> Dict:
     
     return modified_scores
 
-def score_batch(items: List[Dict], context: Optional[Dict] = None) -> Dict:
+class ScoredItem(Mapping):
+    """
+    Read-only scored view of one item, backed by a row of a BatchScores
+
+    Reads like the dict score_item used to build (the item's own fields,
+    one normalized score per boundary and ecoscore_details) without copying
+    the item or storing boundary values per item: scores are read from the
+    batch matrices and ecoscore_details is built on access. Use to_dict()
+    or dict(scored) where a real dict is needed.
+    """
+    __slots__ = ('item', '_batch', '_row', '_scores')
+
+    def __init__(self, item: Dict, batch: "BatchScores", row: int):
+        self.item = item
+        self._batch = batch
+        self._row = row
+        self._scores = batch.normalized_rows()[row]
+
+    def __getitem__(self, key):
+        column = self._batch.columns.get(key)
+        if column is not None:
+            return self._scores[column]
+        if key == 'ecoscore_details':
+            return self.details()
+        return self.item[key]
+
+    def __iter__(self):
+        yield from self.item
+        for boundary in self._batch.boundary_keys:
+            if boundary not in self.item:
+                yield boundary
+        if 'ecoscore_details' not in self.item:
+            yield 'ecoscore_details'
+
+    def __len__(self) -> int:
+        extra = [key for key in self._batch.boundary_keys if key not in self.item]
+        return len(self.item) + len(extra) + ('ecoscore_details' not in self.item)
+
+    def get(self, key, default=None):
+        column = self._batch.columns.get(key)
+        if column is not None:
+            return self._scores[column]
+        if key == 'ecoscore_details':
+            return self.details()
+        return self.item.get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self._batch.columns or key == 'ecoscore_details' or key in self.item
+
+    def __repr__(self) -> str:
+        return f"ScoredItem({self.to_dict()!r})"
+
+    def normalized_scores(self) -> Dict[str, float]:
+        return dict(zip(self._batch.boundary_keys, self._scores))
+
+    def raw_scores(self) -> Dict[str, float]:
+        return {
+            boundary: value for boundary, value in zip(self._batch.boundary_keys, self._batch.raw[self._row].tolist())
+            if value == value  # skip NaN
+        }
+
+    def details(self) -> Dict:
+        return {
+            'factor_table_used': self._batch.factor_keys[self._row],
+            'category_matched': self._batch.categories[self._row],
+            'raw_scores': self.raw_scores(),
+            'normalized_scores': self.normalized_scores(),
+            'description': f"{self._batch.item_types[self._row]} item"
+        }
+
+    def with_item(self, item: Dict) -> "ScoredItem":
+        """The same scores attached to another item with the same signature"""
+        return ScoredItem(item, self._batch, self._row)
+
+    def to_dict(self) -> Dict:
+        result = self.item.copy()
+        result.update(self.normalized_scores())
+        result['ecoscore_details'] = self.details()
+        return result
+
+def scored_item_json(value):
+    """json.dumps default hook materializing ScoredItem values"""
+    if isinstance(value, ScoredItem):
+        return value.to_dict()
+    return str(value)
+
+@dataclass
+class BatchScores:
+    """
+    Matrix form of a scored batch, one row per item and one column per boundary
+
+    raw holds the modified factor values (NaN where the matched factor row has
+    no value for a boundary), normalized the 0-100 boundary scores.
+    """
+    boundary_keys: List[str]
+    item_types: List[str]
+    factor_keys: List[str]
+    categories: List[str]
+    raw: np.ndarray
+    normalized: np.ndarray
+    columns: Dict[str, int] = field(init=False, repr=False)
+    _rows: Optional[List[List[float]]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.columns = {boundary: column for column, boundary in enumerate(self.boundary_keys)}
+
+    def normalized_rows(self) -> List[List[float]]:
+        """Normalized scores as Python floats, converted once per batch"""
+        if self._rows is None:
+            self._rows = self.normalized.tolist()
+        return self._rows
+
+    def __len__(self) -> int:
+        return len(self.factor_keys)
+
+    def boundary_averages(self) -> Dict[str, float]:
+        """Per-boundary mean of normalized scores, neutral 50 for an empty batch"""
+        if not len(self):
+            return {boundary: 50.0 for boundary in self.boundary_keys}
+        means = self.normalized.mean(axis=0).tolist()
+        return dict(zip(self.boundary_keys, means))
+
+    def scored_items(self, items: List[Dict]) -> List[ScoredItem]:
+        """Per-item results in the same shape as score_item, as views onto this batch"""
+        return [ScoredItem(item, self, row) for row, item in enumerate(items)]
+
+    def slice(self, start: int, stop: int) -> "BatchScores":
+        """Sub-batch of the contiguous rows start..stop-1, sharing this batch's matrices"""
+        return BatchScores(
+            boundary_keys=self.boundary_keys,
+            item_types=self.item_types[start:stop],
+            factor_keys=self.factor_keys[start:stop],
+            categories=self.categories[start:stop],
+            raw=self.raw[start:stop],
+            normalized=self.normalized[start:stop]
+        )
+
+    def take(self, rows: List[int]) -> "BatchScores":
+        """Sub-batch holding only the given rows, in the given order"""
+        return BatchScores(
+            boundary_keys=self.boundary_keys,
+            item_types=[self.item_types[row] for row in rows],
+            factor_keys=[self.factor_keys[row] for row in rows],
+            categories=[self.categories[row] for row in rows],
+            raw=self.raw[rows],
+            normalized=self.normalized[rows]
+        )
+
+    def contributor_rows(self, threshold: float = 40, limit: int = 3) -> List[int]:
+        """Rows of the first `limit` items above `threshold` on any boundary, in batch order"""
+        above = self.normalized > threshold
+        rows = set()
+        for column in range(above.shape[1]):
+            rows.update(np.flatnonzero(above[:, column])[:limit].tolist())
+        return sorted(rows)
+
+def score_items_matrix(items: List[Dict], model: Optional[ScoringModel] = None) -> BatchScores:
+    """
+    Score N items into N x boundaries matrices
+
+    Items already in SCORE_CACHE are copied straight into the matrices. The
+    rest are matched once per distinct signature against the compiled
+    FactorIndex, with contextual modifiers and normalization applied as array
+    operations. Values match score_item for every item.
+    """
+    model = model or get_scoring_model()
+    index = model.factor_index
+    boundary_keys = model.boundary_keys
+    count = len(items)
+    
+    raw = np.empty((count, len(boundary_keys)), dtype=np.float64)
+    normalized = np.empty((count, len(boundary_keys)), dtype=np.float64)
+    positive = np.zeros(count, dtype=bool)
+    negative = np.zeros(count, dtype=bool)
+    item_types = []
+    factor_keys = []
+    categories = []
+    
+    generation = SCORE_CACHE.sync(model)
+    pending = {}  # signature -> first row scored in this batch
+    duplicates = []  # (row, first row) for repeated uncached signatures
+    
+    for row, item in enumerate(items):
+        signature = item_signature(item)
+        item_type, category = signature[0], signature[1]
+        item_types.append(item_type)
+        categories.append(category)
+        
+        cached = SCORE_CACHE.get(signature, generation)
+        if cached is not None:
+            factor_keys.append(cached.factor_key)
+            raw[row] = cached.raw_row
+            normalized[row] = cached.normalized_row
+            continue
+        
+        factor_key = TYPE_MAPPING.get(item_type, 'lifestyle')
+        factor_keys.append(factor_key)
+        if signature in pending:
+            duplicates.append((row, pending[signature]))
+            continue
+        
+        pending[signature] = row
+        table = index.table_for(factor_key)
+        raw[row] = table.matrix[table.match_position(category, item.get('materials', []))]
+        positive[row], negative[row] = model.modifiers.classify(category, list(signature[2]))
+    
+    if pending:
+        rows = np.fromiter(pending.values(), dtype=np.intp, count=len(pending))
+        block = raw[rows]
+        
+        # Contextual modifiers; NaN entries stay NaN and default to 50 below
+        block_positive = positive[rows]
+        block_negative = negative[rows]
+        block[block_positive] = np.maximum(5, block[block_positive] * 0.8)
+        block[block_negative] = np.minimum(95, block[block_negative] * 1.2)
+        
+        raw[rows] = block
+        normalized[rows] = model.normalize(block)
+        
+        for signature, row in pending.items():
+            SCORE_CACHE.put(signature, CachedScore(
+                factor_key=factor_keys[row],
+                raw_row=raw[row].copy(),
+                normalized_row=normalized[row].copy()
+            ), generation)
+        
+        for row, first_row in duplicates:
+            raw[row] = raw[first_row]
+            normalized[row] = normalized[first_row]
+    
+    return BatchScores(
+        boundary_keys=list(boundary_keys),
+        item_types=item_types,
+        factor_keys=factor_keys,
+        categories=categories,
+        raw=raw,
+        normalized=normalized
+    )
+
+def score_batch(items: List[Dict], context: Optional[Dict] = None,
+                model: Optional[ScoringModel] = None, sections=None) -> Dict:
     """
     Score a batch of items and return comprehensive EcoScore analysis
     This is the main entry point for the scoring API
+
+    Items are scored together through score_items_matrix, so large batches
+    pay one array pass per stage rather than per-item dict work.
+    """
+    return calculate_ecoscore(items, context, model, sections)
+
+def score_what_if(items: List[Dict], substitutions: Dict[int, List[Dict]],
+                  model: Optional[ScoringModel] = None) -> Dict:
+    """
+    Score every candidate swap of one basket item for an alternative in one pass
+
+    The basket is scored once; all alternatives are scored together in a
+    second batch. Each swap's per-boundary averages are then the basket's
+    boundary sums with the original row replaced by the alternative's.
+
+    Args:
+        items: The current basket
+        substitutions: Basket index -> alternative items to try in its place
+        model: Scoring model to evaluate against, defaults to get_scoring_model()
+
+    Returns:
+        The baseline score and, per candidate swap, the resulting averages,
+        composite and grade with deltas against the baseline (negative deltas
+        mean less pressure on the planetary boundaries)
+    """
+    model = model or get_scoring_model()
+    if not items:
+        raise ValueError("What-if scoring needs a non-empty basket")
+    for index in substitutions:
+        if not 0 <= index < len(items):
+            raise ValueError(f"Substitution index {index} is outside the basket (0-{len(items) - 1})")
+
+    basket = score_items_matrix(items, model)
+    boundary_sums = basket.normalized.sum(axis=0)
+    baseline_averages = boundary_sums / len(items)
+    baseline_composite = model.composite(dict(zip(model.boundary_keys, baseline_averages.tolist())))
+
+    swaps = [(index, alternative) for index, alternatives in substitutions.items() for alternative in alternatives]
+    candidates = score_items_matrix([alternative for _, alternative in swaps], model)
+    indices = np.asarray([index for index, _ in swaps], dtype=np.int64)
+
+    if swaps:
+        averages = (boundary_sums - basket.normalized[indices] + candidates.normalized) / len(items)
+    else:
+        averages = np.zeros((0, len(model.boundary_keys)))
+    composites = model.composites(averages)
+    grades = model.grades(composites)
+
+    results = []
+    best = {}
+    rows = zip(swaps, averages.tolist(), (averages - baseline_averages).tolist(), composites.tolist(), grades)
+    for (index, alternative), swap_averages, deltas, composite_score, grade in rows:
+        results.append({
+            "item_index": index,
+            "original": items[index],
+            "substitute": alternative,
+            "per_boundary_averages": dict(zip(model.boundary_keys, swap_averages)),
+            "boundary_deltas": dict(zip(model.boundary_keys, deltas)),
+            "composite": round(composite_score, 1),
+            "composite_delta": round(composite_score - baseline_composite, 1),
+            "grade": grade
+        })
+        if index not in best or composite_score < best[index][0]:
+            best[index] = (composite_score, len(results) - 1)
+
+    return {
+        "baseline": {
+            "per_boundary_averages": dict(zip(model.boundary_keys, baseline_averages.tolist())),
+            "composite": round(baseline_composite, 1),
+            "grade": model.grade(baseline_composite)
+        },
+        "substitutions": results,
+        # Per basket index, the position in substitutions of the swap with the lowest composite
+        "best_substitutions": {index: position for index, (_, position) in sorted(best.items())},
+        "methodology": model.methodology()
+    }
+
+def weight_scheme_matrix(schemes, model: Optional[ScoringModel] = None) -> np.ndarray:
+    """
+    S x boundaries weight matrix for a list of weighting schemes
+
+    Each scheme is a boundary -> weight mapping (boundaries it leaves out keep
+    the model's weight) or a sequence of weights in model.boundary_keys order.
+    An S x boundaries array is validated and returned as is.
+    """
+    model = model or get_scoring_model()
+    boundary_count = len(model.boundary_keys)
+    if isinstance(schemes, np.ndarray):
+        matrix = schemes.astype(np.float64, copy=False)
+    else:
+        matrix = np.tile(model.weights, (len(schemes), 1))
+        for row, scheme in enumerate(schemes):
+            if isinstance(scheme, dict):
+                unknown = set(scheme).difference(model.boundary_keys)
+                if unknown:
+                    raise ValueError(f"Scheme {row} has unknown boundaries: {', '.join(sorted(unknown))}")
+                for column, boundary in enumerate(model.boundary_keys):
+                    if boundary in scheme:
+                        matrix[row, column] = float(scheme[boundary])
+            else:
+                if len(scheme) != boundary_count:
+                    raise ValueError(f"Scheme {row} has {len(scheme)} weights, expected {boundary_count}")
+                matrix[row] = scheme
+    
+    if matrix.ndim != 2 or matrix.shape[1] != boundary_count:
+        raise ValueError(f"Weight matrix must have {boundary_count} columns ({', '.join(model.boundary_keys)})")
+    if not np.isfinite(matrix).all() or (matrix < 0).any():
+        raise ValueError("Weights must be finite and non-negative")
+    return matrix
+
+def evaluate_weight_schemes(per_boundary_averages: Dict[str, float], schemes,
+                            model: Optional[ScoringModel] = None) -> Dict:
+    """
+    Composites and grades of one set of per-boundary averages under many weighting schemes
+
+    Args:
+        per_boundary_averages: Averages from calculate_ecoscore, a session or the quiz
+        schemes: Weighting schemes, see weight_scheme_matrix
+        model: Scoring model providing the boundary order, default weights and grading
+
+    Returns:
+        Baseline composite and grade under the model's own weights and, per
+        scheme in input order, arrays of composites and grades
     """
-    return calculate_ecoscore(items, context)
+    model = model or get_scoring_model()
+    weights = weight_scheme_matrix(schemes, model)
+    averages = [per_boundary_averages.get(boundary, 50.0) for boundary in model.boundary_keys]
+    
+    # Same accumulation order as ScoringModel.composite, one column at a time
+    composite_scores = np.zeros(len(weights))
+    total_weights = np.zeros(len(weights))
+    for column, average in enumerate(averages):
+        composite_scores += average * weights[:, column]
+        total_weights += weights[:, column]
+    weighted = total_weights > 0
+    composite_scores = np.where(weighted, composite_scores / np.where(weighted, total_weights, 1.0), 50.0)
+    
+    baseline_composite = model.composite(per_boundary_averages)
+    return {
+        "per_boundary_averages": dict(zip(model.boundary_keys, averages)),
+        "baseline": {"composite": round(baseline_composite, 1), "grade": model.grade(baseline_composite)},
+        "composites": composite_scores,
+        "grades": model.grades(composite_scores)
+    }
+
+def score_weight_scenarios(items: List[Dict], schemes, model: Optional[ScoringModel] = None) -> Dict:
+    """
+    Score a basket once and evaluate it under many weighting schemes
+
+    Per-boundary averages do not depend on weights, so items are scored a
+    single time and every scheme only costs a weighted sum. See
+    evaluate_weight_schemes for the result.
+    """
+    model = model or get_scoring_model()
+    per_boundary_averages = score_items_matrix(items, model).boundary_averages()
+    return evaluate_weight_schemes(per_boundary_averages, schemes, model)
+
+FACTOR_UNCERTAINTY_FILE = Path(__file__).parent / "factor_uncertainty.json"
+
+# Monte Carlo draws per uncertainty estimate unless the caller picks a count
+DEFAULT_UNCERTAINTY_SAMPLES = 2000
+MAX_UNCERTAINTY_SAMPLES = 20000
+UNCERTAINTY_PERCENTILES = (5, 50, 95)
+
+class FactorUncertainty:
+    """
+    Relative ranges around factor table values
+
+    A spread of 0.3 means the true value lies within -30%/+30% of the table
+    value. Spreads are set per factor table and category, falling back to the
+    table default and then the global default; items that match no category
+    (the table average row) use the `fallback` spread. Each spread is a number
+    for all boundaries or a boundary -> number mapping.
+    """
+
+    def __init__(self, spec: Dict):
+        self.default = spec.get("default", 0.25)
+        self.fallback = spec.get("fallback", self.default)
+        self.tables = spec.get("tables", {})
+        self._compiled = {}  # factor key -> (compiled table, spread matrix)
+
+    @staticmethod
+    def _spread_row(spread, boundary_keys: List[str], defaults: List[float]) -> List[float]:
+        if isinstance(spread, dict):
+            return [float(spread.get(boundary, default)) for boundary, default in zip(boundary_keys, defaults)]
+        return [float(spread)] * len(boundary_keys)
+
+    def spreads(self, factor_key: str, table: CompiledFactorTable) -> np.ndarray:
+        """Spread matrix aligned with table.matrix (one row per category plus the average row)"""
+        compiled = self._compiled.get(factor_key)
+        if compiled is not None and compiled[0] is table:
+            return compiled[1]
+
+        boundary_keys = table.boundary_keys
+        global_row = self._spread_row(self.default, boundary_keys, [0.25] * len(boundary_keys))
+        table_spec = self.tables.get(factor_key, {})
+        table_row = self._spread_row(table_spec.get("default", global_row[0]), boundary_keys, global_row)
+        categories = table_spec.get("categories", {})
+        rows = [
+            self._spread_row(categories[category], boundary_keys, table_row) if category in categories else table_row
+            for category in table.categories
+        ]
+        rows.append(self._spread_row(self.fallback, boundary_keys, table_row))
+        matrix = np.clip(np.array(rows, dtype=np.float64).reshape(len(rows), len(boundary_keys)), 0.0, 1.0)
+        self._compiled[factor_key] = (table, matrix)
+        return matrix
+
+def load_factor_uncertainty(path: Path = FACTOR_UNCERTAINTY_FILE) -> FactorUncertainty:
+    """Load factor value ranges from JSON"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return FactorUncertainty(json.load(f))
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error loading factor uncertainty {path}: {e}")
+        return FactorUncertainty({})
+
+# Active factor value ranges, replaced by install_factor_uncertainty
+FACTOR_UNCERTAINTY = load_factor_uncertainty()
+
+def install_factor_uncertainty(spec: Dict) -> FactorUncertainty:
+    """Compile a factor uncertainty spec and make it active"""
+    global FACTOR_UNCERTAINTY
+    FACTOR_UNCERTAINTY = FactorUncertainty(spec)
+    return FACTOR_UNCERTAINTY
+
+def score_uncertainty(items: List[Dict], samples: int = DEFAULT_UNCERTAINTY_SAMPLES,
+                      seed: Optional[int] = None, model: Optional[ScoringModel] = None,
+                      uncertainty: Optional[FactorUncertainty] = None) -> Dict:
+    """
+    Monte Carlo uncertainty bands for a basket's boundary averages and composite
+
+    Factor values are drawn from symmetric triangular distributions over their
+    ranges, once per distinct item signature (identical items share a draw),
+    then pushed through the contextual modifiers, normalization, basket
+    averaging and weighting as samples x signatures x boundaries arrays.
+
+    Args:
+        items: Basket items
+        samples: Number of draws, 1 to MAX_UNCERTAINTY_SAMPLES
+        seed: Random seed, for reproducible bands
+        model: Scoring model, defaults to the active one
+        uncertainty: Factor ranges, defaults to FACTOR_UNCERTAINTY
+
+    Returns:
+        p5/p50/p95 of every boundary average and of the composite, and the
+        grades at those composite percentiles
+    """
+    model = model or get_scoring_model()
+    uncertainty = uncertainty or FACTOR_UNCERTAINTY
+    if not items:
+        raise ValueError("No items provided for scoring")
+    if not 1 <= samples <= MAX_UNCERTAINTY_SAMPLES:
+        raise ValueError(f"Sample count must be between 1 and {MAX_UNCERTAINTY_SAMPLES}")
+
+    index = model.factor_index
+    rows = {}  # signature -> row in the per-signature arrays
+    counts = []
+    base_rows = []
+    spread_rows = []
+    positive = []
+    negative = []
+    for item in items:
+        signature = item_signature(item)
+        row = rows.get(signature)
+        if row is not None:
+            counts[row] += 1
+            continue
+        rows[signature] = len(counts)
+        counts.append(1)
+
+        factor_key = TYPE_MAPPING.get(signature[0], 'lifestyle')
+        table = index.table_for(factor_key)
+        position = table.match_position(signature[1], item.get('materials', []))
+        base_rows.append(table.matrix[position])
+        spread_rows.append(uncertainty.spreads(factor_key, table)[position])
+        is_positive, is_negative = model.modifiers.classify(signature[1], list(signature[2]))
+        positive.append(is_positive)
+        negative.append(is_negative)
+
+    base = np.array(base_rows, dtype=np.float64)
+    spread = np.array(spread_rows)
+    positive = np.array(positive)[:, np.newaxis]
+    negative = np.array(negative)[:, np.newaxis]
+
+    # Modifiers and normalization are increasing piecewise-linear maps of the
+    # factor value, so together they fold into normalized =
+    # clip(scale * value, lower, upper) per signature and boundary. Each
+    # sample then costs a few in-place array passes instead of one per step.
+    # Raw values are unbounded above; only the modifiers and model.caps limit them.
+    scale = np.ones_like(base)
+    lower = np.zeros_like(base)
+    upper = np.full_like(base, np.inf)
+    for applies, factor, limit, bound in ((positive, 0.8, 5.0, np.maximum), (negative, 1.2, 95.0, np.minimum)):
+        scale = np.where(applies, scale * factor, scale)
+        lower = np.where(applies, bound(limit, lower * factor), lower)
+        upper = np.where(applies, bound(limit, upper * factor), upper)
+    slopes = model.slopes / 100.0
+    scale = scale * slopes
+    lower = np.clip(np.minimum(model.caps, lower * slopes), 0, 100)
+    upper = np.clip(np.minimum(model.caps, upper * slopes), 0, 100)
+
+    # Boundaries the matched factors leave out score a fixed neutral 50
+    missing = np.isnan(base)
+    neutral = np.broadcast_to(np.clip(np.minimum(model.caps, 50.0 * slopes), 0, 100), base.shape)
+    base = np.where(missing, 0.0, base)
+    lower = np.where(missing, neutral, lower)
+    upper = np.where(missing, neutral, upper)
+
+    # value = base * (1 + spread * offset), where the sum of two uniform draws
+    # minus one gives a symmetric triangular offset on [-1, 1]
+    center = scale * base
+    width = center * spread
+    rng = np.random.default_rng(seed)
+    normalized = rng.random((samples,) + base.shape)
+    normalized += rng.random(normalized.shape)
+    normalized *= width
+    normalized += center - width
+    np.maximum(normalized, lower, out=normalized)
+    np.minimum(normalized, upper, out=normalized)
+
+    # samples x boundaries basket averages, then one composite per sample
+    shares = np.array(counts, dtype=np.float64) / len(items)
+    averages = np.tensordot(normalized, shares, axes=([1], [0]))
+    composite_scores = model.composites(averages)
+
+    # One percentile pass over the boundary averages plus the composite column
+    bands = np.percentile(np.column_stack((averages, composite_scores)), UNCERTAINTY_PERCENTILES, axis=0).T
+    labels = [f"p{percentile}" for percentile in UNCERTAINTY_PERCENTILES]
+    return {
+        "samples": samples,
+        "percentiles": list(UNCERTAINTY_PERCENTILES),
+        "per_boundary": {
+            boundary: dict(zip(labels, band)) for boundary, band in zip(model.boundary_keys, bands[:-1].round(1).tolist())
+        },
+        "composite": dict(zip(labels, bands[-1].round(1).tolist())),
+        "grades": dict(zip(labels, model.grades(bands[-1])))
+    }
 
 # Utility functions for factor table management
 def load_factor_tables_from_csv(csv_directory: str) -> Dict:
@@ -696,30 +1817,34 @@ def load_factor_tables_from_csv(csv_directory: str) -> Dict:
         return FACTOR_TABLES
     
     for csv_file in csv_path.glob("*.csv"):
-        table_name = csv_file.stem
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                table_data = {}
-                
-                for row in reader:
-                    category = row.get('category', '')
-                    if category:
-                        scores = {}
-                        for boundary in PLANETARY_BOUNDARIES.keys():
-                            if boundary in row:
-                                scores[boundary] = float(row[boundary])
-                        if 'description' in row:
-                            scores['description'] = row['description']
-                        table_data[category] = scores
-                
-                if table_data:
-                    tables[table_name] = table_data
+            table_data = load_factor_table_csv(csv_file)
+            if table_data:
+                tables[csv_file.stem] = table_data
         except Exception as e:
             print(f"Error loading factor table {csv_file}: {e}")
     
     return tables if tables else FACTOR_TABLES
 
+def load_factor_table_csv(csv_file: Path) -> Dict:
+    """Parse a single factor table CSV (category, boundary columns, description)"""
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        table_data = {}
+        
+        for row in reader:
+            category = row.get('category', '')
+            if category:
+                scores = {}
+                for boundary in PLANETARY_BOUNDARIES.keys():
+                    if boundary in row:
+                        scores[boundary] = float(row[boundary])
+                if 'description' in row:
+                    scores['description'] = row['description']
+                table_data[category] = scores
+    
+    return table_data
+
 def save_factor_tables_to_csv(tables: Dict, csv_directory: str):
     """Save factor tables to CSV files"""
     csv_path = Path(csv_directory)
@@ -749,127 +1874,335 @@ def save_factor_tables_to_csv(tables: Dict, csv_directory: str):
         except Exception as e:
             print(f"Error saving factor table {table_name}: {e}")
 
-def calculate_ecoscore_from_quiz_responses(quiz_responses: List) -> Dict:
+QUIZ_RULES_FILE = Path(__file__).parent / "quiz_rules.json"
+
+@dataclass
+class QuizStage:
+    """
+    One question of a compiled quiz rule table
+
+    Row r of delta/lower/upper holds the per-boundary effect of answer
+    option r: scores become clip(score + delta, lower, upper). Boundaries an
+    option does not touch have delta 0 and unbounded limits.
+    """
+    question_id: str
+    kind: str  # "choice", "rating" or "count"
+    options: object  # choice: answer -> row, rating: [(min, max, row)], count: None
+    delta: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    effects: List[Tuple[Tuple[int, float, float, float], ...]]  # per row: (column, delta, lower, upper)
+
+    def match(self, answer) -> Tuple[int, float]:
+        """(row, delta multiplier) for an answer, row -1 when no rule applies"""
+        if self.kind == "choice":
+            if isinstance(answer, str):
+                return self.options.get(answer, -1), 1.0
+            try:
+                return self.options.get(answer, -1), 1.0
+            except TypeError:  # unhashable answer, e.g. a list
+                return -1, 1.0
+        if self.kind == "rating":
+            try:
+                rating = int(answer)
+            except (ValueError, TypeError):
+                return -1, 1.0
+            for low, high, row in self.options:
+                if low <= rating <= high:
+                    return row, 1.0
+            return -1, 1.0
+        if isinstance(answer, list):
+            return 0, float(len(answer))
+        return -1, 1.0
+
+@dataclass
+class QuizCohortScores:
+    """Quiz scores for a cohort, one row per respondent and one column per boundary"""
+    boundary_keys: Tuple[str, ...]
+    scores: np.ndarray
+    composites: np.ndarray
+    grades: List[str]
+
+    def __len__(self) -> int:
+        return len(self.grades)
+
+    def per_boundary_scores(self, row: int) -> Dict[str, float]:
+        return dict(zip(self.boundary_keys, self.scores[row].tolist()))
+
+def _effect_limits(effect: Dict) -> Tuple[float, float, float]:
+    return (
+        float(effect.get("delta", 0)),
+        float(effect.get("floor", -np.inf)),
+        float(effect.get("ceiling", np.inf))
+    )
+
+class QuizRuleTable:
+    """
+    Quiz scoring rules compiled from a rule table (see quiz_rules.json)
+
+    Each question maps answers to per-boundary deltas with a floor (for
+    reductions) or ceiling (for increases). Questions are applied in table
+    order, every respondent starting from base_score on each boundary. A
+    single respondent is scored with one lookup per answered question; a
+    cohort with one array pass per question.
+    """
+
+    def __init__(self, spec: Dict):
+        self.base_score = float(spec.get("base_score", 50.0))
+        self.questions = list(spec.get("questions", []))
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def compile(self, boundary_keys: Tuple[str, ...]) -> List[QuizStage]:
+        """Rule arrays laid out for a boundary order, built once per order"""
+        boundary_keys = tuple(boundary_keys)
+        stages = self._compiled.get(boundary_keys)
+        if stages is not None:
+            return stages
+
+        columns = {boundary: column for column, boundary in enumerate(boundary_keys)}
+        stages = []
+        for question in self.questions:
+            kind = question.get("kind", "choice")
+            if kind == "choice":
+                answers = question.get("answers", {})
+                options = {answer: row for row, answer in enumerate(answers)}
+                effect_rows = list(answers.values())
+            elif kind == "rating":
+                ranges = question.get("ranges", [])
+                options = [
+                    (band.get("min", -np.inf), band.get("max", np.inf), row)
+                    for row, band in enumerate(ranges)
+                ]
+                effect_rows = [band.get("effects", {}) for band in ranges]
+            elif kind == "count":
+                options = None
+                effect_rows = [question.get("effects", {})]
+            else:
+                raise ValueError(f"Unknown quiz rule kind '{kind}' for {question.get('question_id')}")
+
+            shape = (len(effect_rows), len(boundary_keys))
+            delta = np.zeros(shape)
+            lower = np.full(shape, -np.inf)
+            upper = np.full(shape, np.inf)
+            for row, effects in enumerate(effect_rows):
+                for boundary, effect in effects.items():
+                    if boundary in columns:
+                        delta[row, columns[boundary]], lower[row, columns[boundary]], upper[row, columns[boundary]] = \
+                            _effect_limits(effect)
+            effects = [
+                tuple(
+                    (column, float(delta[row, column]), float(lower[row, column]), float(upper[row, column]))
+                    for column in range(len(boundary_keys))
+                    if delta[row, column] or np.isfinite(lower[row, column]) or np.isfinite(upper[row, column])
+                )
+                for row in range(len(effect_rows))
+            ]
+            stages.append(QuizStage(question["question_id"], kind, options, delta, lower, upper, effects))
+
+        with self._lock:
+            self._compiled[boundary_keys] = stages
+        return stages
+
+    def evaluate_one(self, responses, boundary_keys: Tuple[str, ...]) -> List[float]:
+        """Per-boundary scores for one respondent's quiz responses"""
+        stages = self.compile(boundary_keys)
+        answers = quiz_answers(responses)
+        scores = [self.base_score] * len(boundary_keys)
+        for stage in stages:
+            if stage.question_id not in answers:
+                continue
+            row, multiplier = stage.match(answers[stage.question_id])
+            if row < 0:
+                continue
+            for column, delta, lower, upper in stage.effects[row]:
+                value = scores[column] + delta * multiplier
+                scores[column] = lower if value < lower else upper if value > upper else value
+        return scores
+
+    def evaluate(self, cohort: List, boundary_keys: Tuple[str, ...]) -> np.ndarray:
+        """N x boundaries score matrix for a cohort of respondents' quiz responses"""
+        stages = self.compile(boundary_keys)
+        stage_index = {}
+        for position, stage in enumerate(stages):
+            stage_index.setdefault(stage.question_id, []).append((position, stage.match))
+        rows = [[-1] * len(cohort) for _ in stages]
+        multipliers = [[1.0] * len(cohort) for _ in stages]
+        for respondent, responses in enumerate(cohort):
+            for question_id, answer in quiz_answers(responses).items():
+                for position, match in stage_index.get(question_id, ()):
+                    rows[position][respondent], multipliers[position][respondent] = match(answer)
+
+        scores = np.full((len(cohort), len(boundary_keys)), self.base_score)
+        for stage, stage_rows, stage_multipliers in zip(stages, rows, multipliers):
+            stage_rows = np.asarray(stage_rows, dtype=np.int64)
+            matched = np.flatnonzero(stage_rows >= 0)
+            if not len(matched):
+                continue
+            options = stage_rows[matched]
+            scores[matched] = np.clip(
+                scores[matched] + stage.delta[options] * np.asarray(stage_multipliers)[matched, None],
+                stage.lower[options], stage.upper[options]
+            )
+        return scores
+
+def quiz_answers(responses) -> Dict:
+    """question_id -> answer for QuizResponse objects, response dicts or an answer mapping"""
+    if isinstance(responses, dict):
+        return responses
+    answers = {}
+    for response in responses:
+        if isinstance(response, dict):
+            answers[response.get("question_id")] = response.get("answer")
+        else:
+            answers[response.question_id] = response.answer
+    return answers
+
+def load_quiz_rules(path: Path = QUIZ_RULES_FILE) -> QuizRuleTable:
+    """Load the quiz rule table from JSON"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return QuizRuleTable(json.load(f))
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error loading quiz rules {path}: {e}")
+        return QuizRuleTable({})
+
+# Active quiz rules, replaced by install_quiz_rules
+QUIZ_RULES = load_quiz_rules()
+
+def install_quiz_rules(spec: Dict) -> QuizRuleTable:
+    """Compile a quiz rule table spec and make it active"""
+    global QUIZ_RULES
+    QUIZ_RULES = QuizRuleTable(spec)
+    return QUIZ_RULES
+
+def score_quiz_cohort(cohort: List, model: Optional[ScoringModel] = None,
+                      rules: Optional[QuizRuleTable] = None) -> QuizCohortScores:
+    """
+    Score many respondents' quiz responses in one vectorized pass
+
+    Args:
+        cohort: One entry per respondent: a list of QuizResponse objects or
+            response dicts, or a question_id -> answer mapping
+        model: Scoring model to evaluate against, defaults to get_scoring_model()
+        rules: Quiz rule table, defaults to QUIZ_RULES
+
+    Returns:
+        QuizCohortScores with per-boundary scores, composites and grades
+    """
+    model = model or get_scoring_model()
+    rules = rules or QUIZ_RULES
+    scores = rules.evaluate(cohort, model.boundary_keys)
+    
+    # Weighted sum accumulated boundary by boundary, as for a single respondent
+    composites = np.zeros(len(scores))
+    for column, weight in enumerate(model.weights.tolist()):
+        composites += scores[:, column] * weight
+    
+    return QuizCohortScores(model.boundary_keys, scores, composites, model.grades(composites))
+
+def calculate_ecoscore_from_quiz_responses(quiz_responses: List,
+                                            model: Optional[ScoringModel] = None,
+                                            sections=None,
+                                            rules: Optional[QuizRuleTable] = None) -> Dict:
     """
     Calculate EcoScore based on quiz responses when no items are scanned
     
     Args:
         quiz_responses: List of QuizResponse objects from the quiz
+        model: Scoring model to evaluate against, defaults to get_scoring_model()
+        sections: Optional sections to include, as for calculate_ecoscore
+        rules: Quiz rule table, defaults to QUIZ_RULES
     
     Returns:
         Comprehensive scoring result based on quiz answers
     """
-    # Initialize boundary scores
-    boundary_scores = {boundary: 50.0 for boundary in PLANETARY_BOUNDARIES.keys()}
-    
-    # Convert quiz responses to a more workable format
-    responses_dict = {}
-    for response in quiz_responses:
-        responses_dict[response.question_id] = response.answer
-    
-    # Calculate scores based on quiz responses
-    # Food choices impact
-    if "food_today" in responses_dict:
-        food_choice = responses_dict["food_today"]
-        if food_choice == "plant-based":
-            boundary_scores["climate"] = max(15, boundary_scores["climate"] - 30)
-            boundary_scores["biosphere"] = max(20, boundary_scores["biosphere"] - 25)
-            boundary_scores["biogeochemical"] = max(25, boundary_scores["biogeochemical"] - 20)
-        elif food_choice == "mixed":
-            boundary_scores["climate"] = max(25, boundary_scores["climate"] - 15)
-            boundary_scores["biosphere"] = max(30, boundary_scores["biosphere"] - 10)
-        elif food_choice == "meat-heavy":
-            boundary_scores["climate"] = min(85, boundary_scores["climate"] + 25)
-            boundary_scores["biosphere"] = min(80, boundary_scores["biosphere"] + 20)
-            boundary_scores["biogeochemical"] = min(85, boundary_scores["biogeochemical"] + 25)
-        elif food_choice == "packaged":
-            boundary_scores["climate"] = min(75, boundary_scores["climate"] + 15)
-            boundary_scores["aerosols"] = min(75, boundary_scores["aerosols"] + 20)
-    
-    # Transport choices impact
-    if "transport_today" in responses_dict:
-        transport = responses_dict["transport_today"]
-        if transport in ["walk", "bike"]:
-            boundary_scores["climate"] = max(10, boundary_scores["climate"] - 35)
-            boundary_scores["aerosols"] = max(15, boundary_scores["aerosols"] - 30)
-        elif transport == "public":
-            boundary_scores["climate"] = max(25, boundary_scores["climate"] - 15)
-            boundary_scores["aerosols"] = max(30, boundary_scores["aerosols"] - 15)
-        elif transport == "electric":
-            boundary_scores["climate"] = max(30, boundary_scores["climate"] - 10)
-        elif transport == "car":
-            boundary_scores["climate"] = min(85, boundary_scores["climate"] + 30)
-            boundary_scores["aerosols"] = min(80, boundary_scores["aerosols"] + 25)
-    
-    # Distance traveled impact
-    if "distance_traveled" in responses_dict:
-        distance = responses_dict["distance_traveled"]
-        if distance == "under_5km":
-            # Minimal additional impact
-            pass
-        elif distance == "5_20km":
-            boundary_scores["climate"] = min(80, boundary_scores["climate"] + 10)
-        elif distance == "20_50km":
-            boundary_scores["climate"] = min(85, boundary_scores["climate"] + 20)
-        elif distance == "over_50km":
-            boundary_scores["climate"] = min(90, boundary_scores["climate"] + 30)
-    
-    # Water usage consciousness
-    if "water_usage" in responses_dict:
-        try:
-            water_rating = int(responses_dict["water_usage"])
-            # Scale from 1 (very conscious) to 5 (not conscious)
-            if water_rating <= 2:
-                boundary_scores["freshwater"] = max(20, boundary_scores["freshwater"] - 25)
-            elif water_rating == 3:
-                boundary_scores["freshwater"] = max(35, boundary_scores["freshwater"] - 10)
-            elif water_rating >= 4:
-                boundary_scores["freshwater"] = min(75, boundary_scores["freshwater"] + 20)
-        except (ValueError, TypeError):
-            pass
-    
-    # Waste reduction actions
-    if "waste_reduction" in responses_dict:
-        waste_actions = responses_dict["waste_reduction"]
-        if isinstance(waste_actions, list):
-            reduction_factor = len(waste_actions) * 5  # 5 points per action
-            boundary_scores["aerosols"] = max(20, boundary_scores["aerosols"] - reduction_factor)
-            boundary_scores["biogeochemical"] = max(25, boundary_scores["biogeochemical"] - reduction_factor)
+    model = model or get_scoring_model()
+    rules = rules or QUIZ_RULES
+    boundary_scores = dict(zip(model.boundary_keys, rules.evaluate_one(quiz_responses, model.boundary_keys)))
     
     # Calculate composite score
     composite_score = 0.0
     for boundary, score in boundary_scores.items():
-        weight = PLANETARY_BOUNDARIES[boundary].weight
-        composite_score += score * weight
+        composite_score += score * model.weight(boundary)
     
     # Determine grade
-    grade = calculate_grade(composite_score)
+    grade = model.grade(composite_score)
+    return _quiz_result(boundary_scores, composite_score, grade, model, resolve_sections(sections))
+
+def calculate_ecoscores_from_quiz_cohort(cohort: List, model: Optional[ScoringModel] = None,
+                                         sections=None, rules: Optional[QuizRuleTable] = None) -> List[Dict]:
+    """
+    Full quiz-based results for many respondents, scored in one score_quiz_cohort pass
+
+    Each entry equals calculate_ecoscore_from_quiz_responses for that respondent.
+    """
+    model = model or get_scoring_model()
+    wanted = resolve_sections(sections)
+    if not cohort:
+        return []
+    scores = score_quiz_cohort(cohort, model, rules)
+    composites = scores.composites.tolist()
+    return [
+        _quiz_result(scores.per_boundary_scores(row), composites[row], scores.grades[row], model, wanted)
+        for row in range(len(scores))
+    ]
+
+def _quiz_result(boundary_scores: Dict[str, float], composite_score: float, grade: str,
+                 model: ScoringModel, wanted: frozenset) -> Dict:
+    def methodology():
+        details = model.methodology()
+        details["based_on"] = "quiz_responses"
+        return details
     
-    return {
-        "items": [],
-        "per_boundary_averages": boundary_scores,
-        "composite": round(composite_score, 1),
-        "grade": grade,
-        "recommendations": generate_recommendations(boundary_scores, []),
-        "boundary_details": create_boundary_details(boundary_scores, []),
-        "methodology": {
-            "framework": "Stockholm Resilience Centre Planetary Boundaries",
-            "version": "2.0",
-            "boundaries_included": list(PLANETARY_BOUNDARIES.keys()),
-            "weighting_scheme": {k: v.weight for k, v in PLANETARY_BOUNDARIES.items()},
-            "based_on": "quiz_responses"
-        }
-    }
+    return assemble_result(
+        wanted, boundary_scores, composite_score, grade,
+        items=list,
+        recommendations=lambda: generate_recommendations(boundary_scores, [], model),
+        boundary_details=lambda: create_boundary_details(boundary_scores, [], model),
+        methodology=methodology
+    )
 
 # Export main functions
 __all__ = [
     'calculate_ecoscore',
+    'calculate_ecoscores',
     'calculate_ecoscore_from_quiz_responses',
+    'calculate_ecoscores_from_quiz_cohort',
+    'score_quiz_cohort',
+    'QuizRuleTable',
+    'install_quiz_rules',
     'score_item',
     'score_batch',
+    'score_items_matrix',
+    'score_what_if',
+    'score_weight_scenarios',
+    'RecommendationIndex',
+    'install_recommendation_templates',
+    'evaluate_weight_schemes',
+    'score_uncertainty',
+    'FactorUncertainty',
+    'install_factor_uncertainty',
+    'RESULT_SECTIONS',
+    'resolve_sections',
+    'BatchScores',
+    'ScoredItem',
+    'ScoreCache',
+    'SCORE_CACHE',
+    'item_signature',
     'normalize_boundary_score',
+    'ScoringModel',
+    'build_scoring_model',
+    'get_scoring_model',
+    'install_scoring_model',
     'PLANETARY_BOUNDARIES',
     'FACTOR_TABLES',
+    'FactorIndex',
+    'install_factor_tables',
+    'activate_factor_index',
+    'load_factor_table_csv',
+    'ModifierMatcher',
+    'install_modifier_keywords',
     'load_factor_tables_from_csv',
     'save_factor_tables_to_csv'
 ]
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Compact binary factor tables for the EcoScore engine
+Compiles factor tables in the CSV layout written by save_factor_tables_to_csv
+into a single file holding, per table, a float32 boundary matrix and a hashed
+category index. The file is opened with mmap so every worker process shares
+the same pages instead of holding its own dicts of dicts.
+
+Usage:
+    python factor_binary.py compile <csv_directory> <output.bin>
+    python factor_binary.py info <tables.bin>
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ecoscore import PLANETARY_BOUNDARIES, load_factor_tables_from_csv
+
+MAGIC = b"ECOFTBL1"
+FORMAT_VERSION = 1
+HEADER_PREFIX = struct.Struct("<8sII")  # magic, format version, JSON header length
+ALIGNMENT = 8
+
+# Bounded memo of partial-match results per table
+PARTIAL_MATCH_MEMO_SIZE = 10000
+
+def category_hash(category: str) -> int:
+    """Stable 64-bit key hash shared by the writer and the reader (never 0)"""
+    value = int.from_bytes(hashlib.blake2b(category.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+def _pad(buffer: bytearray):
+    buffer.extend(b"\0" * (-len(buffer) % ALIGNMENT))
+
+def write_factor_tables_binary(tables: Dict, output_path: str, boundary_keys: Optional[List[str]] = None):
+    """
+    Write factor tables to the binary format
+
+    Each table stores its entries in their original order followed by one
+    fallback row of per-boundary averages, matching CompiledFactorTable.
+    Descriptions are not stored; scoring does not use them.
+    """
+    boundary_keys = list(PLANETARY_BOUNDARIES.keys()) if boundary_keys is None else list(boundary_keys)
+    body = bytearray()
+    directory = {}
+
+    for table_name, table_data in tables.items():
+        categories = list(table_data.keys())
+        entries = list(table_data.values())
+        count = len(categories)
+
+        matrix = np.full((count + 1, len(boundary_keys)), np.nan, dtype=np.float32)
+        for row, scores in enumerate(entries):
+            for column, boundary in enumerate(boundary_keys):
+                if isinstance(scores, dict) and boundary in scores:
+                    matrix[row, column] = float(scores[boundary])
+        for column, boundary in enumerate(boundary_keys):
+            values = [scores[boundary] for scores in entries if isinstance(scores, dict) and boundary in scores]
+            matrix[count, column] = sum(values) / len(values) if values else 50
+
+        # Open addressing hash index, load factor <= 0.5
+        slot_count = 1
+        while slot_count < max(2, count * 2):
+            slot_count *= 2
+        hashes = np.zeros(slot_count, dtype=np.uint64)
+        rows = np.full(slot_count, -1, dtype=np.int32)
+        for row, category in enumerate(categories):
+            key_hash = category_hash(category)
+            slot = key_hash & (slot_count - 1)
+            while rows[slot] != -1:
+                slot = (slot + 1) & (slot_count - 1)
+            hashes[slot] = key_hash
+            rows[slot] = row
+
+        encoded = [category.encode("utf-8") for category in categories]
+        key_offsets = np.zeros(count + 1, dtype=np.uint32)
+        np.cumsum([len(key) for key in encoded], out=key_offsets[1:])
+
+        sections = {}
+        for section, array in (("matrix", matrix), ("hashes", hashes), ("rows", rows), ("key_offsets", key_offsets)):
+            sections[section] = len(body)
+            body.extend(array.tobytes())
+            _pad(body)
+        sections["keys"] = len(body)
+        body.extend(b"".join(encoded))
+        _pad(body)
+
+        directory[table_name] = {
+            "entries": count,
+            "slots": slot_count,
+            "key_bytes": int(key_offsets[-1]),
+            "key_lengths": sorted(set(len(category) for category in categories)),
+            # Falsy entries (e.g. {}) never match; lookups fall through as CompiledFactorTable does
+            "empty_rows": [row for row, scores in enumerate(entries) if not scores],
+            "sections": sections
+        }
+
+    header = json.dumps({"boundaries": boundary_keys, "tables": directory}).encode("utf-8")
+    header += b" " * (-(HEADER_PREFIX.size + len(header)) % ALIGNMENT)
+    with open(output_path, "wb") as f:
+        f.write(HEADER_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(body)
+
+def compile_factor_tables_csv(csv_directory: str, output_path: str):
+    """Compile a directory of factor table CSVs into the binary format"""
+    write_factor_tables_binary(load_factor_tables_from_csv(csv_directory), output_path)
+
+class BinaryFactorTable:
+    """
+    One factor table read directly from the mapped file
+
+    Provides the CompiledFactorTable interface (matrix, categories,
+    match_position, match) so score_item, the batch engine and the
+    uncertainty bands can run against it. Exact category lookups go through
+    the hash index; partial and material fallbacks search the key blob in
+    table order and are memoized.
+    """
+
+    def __init__(self, buffer, base: int, meta: Dict, boundary_keys: List[str]):
+        self.boundary_keys = boundary_keys
+        self.entry_count = meta["entries"]
+        self.fallback_position = self.entry_count
+        self.category_lengths = meta["key_lengths"]
+        self.empty_rows = frozenset(meta.get("empty_rows", ()))
+        sections = meta["sections"]
+        boundary_count = len(boundary_keys)
+
+        self.matrix = np.frombuffer(buffer, dtype=np.float32, count=(self.entry_count + 1) * boundary_count,
+                                    offset=base + sections["matrix"]).reshape(self.entry_count + 1, boundary_count)
+        self.hashes = np.frombuffer(buffer, dtype=np.uint64, count=meta["slots"], offset=base + sections["hashes"])
+        self.rows = np.frombuffer(buffer, dtype=np.int32, count=meta["slots"], offset=base + sections["rows"])
+        self.key_offsets = np.frombuffer(buffer, dtype=np.uint32, count=self.entry_count + 1,
+                                         offset=base + sections["key_offsets"])
+        self.keys_start = base + sections["keys"]
+        self.keys_end = self.keys_start + meta["key_bytes"]
+        self._buffer = buffer
+        self._slot_mask = meta["slots"] - 1
+        self._partial_memo = {}
+        self._categories = None
+
+    @property
+    def categories(self) -> List[str]:
+        """Category keys in table order, aligned with the matrix rows (decoded once)"""
+        if self._categories is None:
+            self._categories = [self._key_bytes(row).decode("utf-8") for row in range(self.entry_count)]
+        return self._categories
+
+    def _key_bytes(self, row: int) -> bytes:
+        return self._buffer[self.keys_start + int(self.key_offsets[row]):self.keys_start + int(self.key_offsets[row + 1])]
+
+    def find_exact(self, category: str) -> Optional[int]:
+        """Row of an exact category key via the hash index"""
+        if not self.entry_count:
+            return None
+        key_hash = category_hash(category)
+        encoded = category.encode("utf-8")
+        slot = key_hash & self._slot_mask
+        while True:
+            row = int(self.rows[slot])
+            if row == -1:
+                return None
+            if int(self.hashes[slot]) == key_hash and self._key_bytes(row) == encoded:
+                return row
+            slot = (slot + 1) & self._slot_mask
+
+    def _find_partial_uncached(self, text: str) -> Optional[int]:
+        best = None
+
+        # Categories containing `text`: first hit in the (ordered) key blob that lies within one key
+        needle = text.encode("utf-8")
+        start = self.keys_start
+        if not needle:
+            best = 0 if self.entry_count else None
+        while needle:
+            position = self._buffer.find(needle, start, self.keys_end)
+            if position == -1:
+                break
+            relative = position - self.keys_start
+            row = int(np.searchsorted(self.key_offsets, relative, side="right")) - 1
+            if relative + len(needle) <= int(self.key_offsets[row + 1]):
+                best = row
+                break
+            start = position + 1
+
+        # Categories contained in `text`
+        for length in self.category_lengths:
+            if length > len(text):
+                break
+            for offset in range(len(text) - length + 1):
+                row = self.find_exact(text[offset:offset + length])
+                if row is not None and (best is None or row < best):
+                    best = row
+        return best
+
+    def find_partial(self, text: str) -> Optional[int]:
+        """First category (in table order) containing `text` or contained in it"""
+        if text in self._partial_memo:
+            return self._partial_memo[text]
+        row = self._find_partial_uncached(text)
+        if len(self._partial_memo) >= PARTIAL_MATCH_MEMO_SIZE:
+            self._partial_memo.clear()
+        self._partial_memo[text] = row
+        return row
+
+    def match_position(self, category: str, materials: List[str]) -> int:
+        position = self.find_exact(category)
+        if position is not None:
+            return self.fallback_position if position in self.empty_rows else position
+
+        position = self.find_partial(category)
+        if position is not None and position not in self.empty_rows:
+            return position
+
+        for material in materials or []:
+            position = self.find_partial(material.lower())
+            if position is not None:
+                return self.fallback_position if position in self.empty_rows else position
+
+        return self.fallback_position
+
+    def match(self, category: str, materials: List[str]) -> Dict:
+        row = self.matrix[self.match_position(category, materials)].tolist()
+        return {boundary: value for boundary, value in zip(self.boundary_keys, row) if value == value}
+
+class BinaryFactorIndex:
+    """
+    Memory-mapped factor index with the FactorIndex interface
+
+    Accepted by activate_factor_index and build_scoring_model like a
+    FactorIndex compiled from dicts.
+    """
+
+    def __init__(self, path: str, version: int = 0):
+        self.path = Path(path)
+        self.version = version
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, header_length = HEADER_PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} factor table file")
+        header = json.loads(bytes(self._mmap[HEADER_PREFIX.size:HEADER_PREFIX.size + header_length]))
+        base = HEADER_PREFIX.size + header_length
+
+        self.boundary_keys = header["boundaries"]
+        self.compiled = {
+            name: BinaryFactorTable(self._mmap, base, meta, self.boundary_keys)
+            for name, meta in header["tables"].items()
+        }
+        self.default_table = self.compiled.get("lifestyle") or next(iter(self.compiled.values()), None)
+        if self.default_table is None:
+            raise ValueError(f"{self.path} contains no factor tables")
+
+    def with_boundaries(self, boundary_keys: List[str]) -> "BinaryFactorIndex":
+        if list(boundary_keys) != list(self.boundary_keys):
+            raise ValueError(
+                f"{self.path} was compiled for boundaries {self.boundary_keys}, "
+                f"recompile it for {list(boundary_keys)}"
+            )
+        return self
+
+    def table_for(self, factor_key: str) -> BinaryFactorTable:
+        return self.compiled.get(factor_key, self.default_table)
+
+    def match(self, factor_key: str, category: str, materials: List[str]) -> Dict:
+        return self.table_for(factor_key).match(category, materials)
+
+def open_binary_factor_index(path: str, version: int = 0) -> BinaryFactorIndex:
+    """Open a compiled factor table file for scoring"""
+    return BinaryFactorIndex(path, version)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 3 and argv[0] == "compile":
+        compile_factor_tables_csv(argv[1], argv[2])
+        print(f"✅ Compiled factor tables from {argv[1]} to {argv[2]}")
+        return 0
+    if len(argv) == 2 and argv[0] == "info":
+        index = open_binary_factor_index(argv[1])
+        print(f"Boundaries: {', '.join(index.boundary_keys)}")
+        for name, table in index.compiled.items():
+            print(f"  {name}: {table.entry_count} categories")
+        return 0
+    print(__doc__)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Hot-reloadable factor tables for the EcoScore engine
+Watches a directory of factor table CSVs (the layout written by
+save_factor_tables_to_csv) and swaps updated tables into the running app
+without a restart.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ecoscore import FactorIndex, activate_factor_index, load_factor_table_csv
+
+class FactorTableRegistry:
+    """
+    Polls a CSV directory by mtime and activates new factor tables atomically
+
+    Changed files are re-parsed on a background thread once their mtime and
+    size have been stable for one poll, then a new FactorIndex and scoring
+    model are compiled off the request path and swapped in together. Each
+    successful reload bumps `version`, which scores report as
+    methodology.factor_tables_version.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 5.0):
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.version = 0
+        self.last_reload = None
+        self.last_error = None
+        self._tables = {}  # table name -> parsed table
+        self._loaded = {}  # file name -> (mtime_ns, size) of the parsed revision
+        self._seen = {}  # file name -> (mtime_ns, size) at the previous poll
+        self._failed = {}  # file name -> (mtime_ns, size) that failed to parse
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        signatures = {}
+        if not self.directory.exists():
+            return signatures
+        for csv_file in self.directory.glob("*.csv"):
+            try:
+                stat = csv_file.stat()
+            except OSError:
+                continue
+            signatures[csv_file.name] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def check_now(self) -> bool:
+        """
+        Reload tables whose files changed and have settled since the last poll
+
+        Returns True when a new version was activated.
+        """
+        with self._lock:
+            current = self._scan()
+            previous, self._seen = self._seen, current
+
+            # Only pick up files that did not change between two polls (not mid-write)
+            changed = [
+                name for name, signature in current.items()
+                if self._loaded.get(name) != signature and previous.get(name) == signature
+                and self._failed.get(name) != signature
+            ]
+            removed = [name for name in self._loaded if name not in current]
+            if not changed and not removed:
+                return False
+
+            tables = dict(self._tables)
+            loaded = dict(self._loaded)
+            for name in removed:
+                tables.pop(Path(name).stem, None)
+                loaded.pop(name, None)
+
+            for name in changed:
+                try:
+                    table_data = load_factor_table_csv(self.directory / name)
+                except Exception as e:
+                    # Keep serving the last good revision of this table
+                    self.last_error = f"{name}: {e}"
+                    self._failed[name] = current[name]
+                    print(f"Error reloading factor table {name}: {e}")
+                    continue
+                if table_data:
+                    tables[Path(name).stem] = table_data
+                else:
+                    tables.pop(Path(name).stem, None)
+                loaded[name] = current[name]
+
+            if loaded == self._loaded:
+                return False
+
+            self._loaded = loaded
+            self._tables = tables
+            if not tables:
+                return False
+
+            version = self.version + 1
+            activate_factor_index(FactorIndex(tables, version=version))
+            self.version = version
+            self.last_reload = time.time()
+            self.last_error = None
+            print(f"Factor tables reloaded from {self.directory} (version {version})")
+            return True
+
+    def load(self) -> bool:
+        """Load the directory immediately, without waiting for files to settle"""
+        with self._lock:
+            self._seen = self._scan()
+        return self.check_now()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_now()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Factor table watcher error: {e}")
+
+    def start(self):
+        """Load current tables and start watching in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="factor-table-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def status(self) -> Dict:
+        return {
+            "directory": str(self.directory),
+            "version": self.version,
+            "tables": sorted(self._tables.keys()),
+            "watching": bool(self._thread and self._thread.is_alive()),
+            "last_reload": self.last_reload,
+            "last_error": self.last_error
+        }
+
+def create_factor_registry() -> Optional[FactorTableRegistry]:
+    """Registry for FACTOR_TABLES_DIR, or None when hot reloading is not configured"""
+    directory = os.getenv("FACTOR_TABLES_DIR")
+    if not directory:
+        return None
+    poll_interval = float(os.getenv("FACTOR_TABLES_POLL_SECONDS", "5"))
+    return FactorTableRegistry(directory, poll_interval)
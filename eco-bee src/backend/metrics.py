@@ -0,0 +1,345 @@
+"""
+In-process metrics in the Prometheus text exposition format
+Counters, gauges and fixed-bucket histograms with labels, plus collector
+callbacks for values owned by other components (e.g. cache statistics).
+Recording is a lock-free update of the calling thread's own accumulators,
+so it stays well below a microsecond per observation; shards are summed
+and formatted only when /metrics is scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Request latency buckets in seconds, from sub-millisecond scoring calls to slow upstream APIs
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """A metric family: one value (or histogram) per combination of label values"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child for the given label values (created on first use; keep it to skip this lookup)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.label_names, values))
+        return lines
+
+class _Sharded:
+    """
+    Per-thread accumulators
+
+    Each thread only ever writes its own shard (a list of numbers, found via
+    a thread-local), so recording needs no lock and stays exact; readers sum
+    the shards, which outlive their threads.
+    """
+    __slots__ = ("_local", "_shards", "_size", "_lock")
+
+    def __init__(self, size: int):
+        self._local = threading.local()
+        self._shards = []
+        self._size = size
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> List:
+        shard = self._local.shard = [0] * self._size
+        with self._lock:
+            self._shards.append(shard)
+        return shard
+
+    def _totals(self) -> List:
+        totals = [0] * self._size
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for index, value in enumerate(shard):
+                totals[index] += value
+        return totals
+
+class _Value(_Sharded):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+    def render(self, name, label_names, values) -> List[str]:
+        return [f"{name}{_label_text(label_names, values)} {_number(self.value)}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+class _HistogramValue(_Sharded):
+    __slots__ = ("bounds",)
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        # Per-bucket counts (not cumulative, the last bucket is +Inf) followed by the sum
+        super().__init__(len(bounds) + 2)
+        self.bounds = bounds
+
+    def observe(self, value: float):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def render(self, name, label_names, values) -> List[str]:
+        totals = self._totals()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), totals):
+            cumulative += count
+            bucket = _label_text(label_names, values, f'le="{_number(bound)}"')
+            lines.append(f"{name}_bucket{bucket} {cumulative}")
+        labels = _label_text(label_names, values)
+        lines.append(f"{name}_sum{labels} {_number(float(totals[-1]))}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+class MetricsRegistry:
+    """Named metrics plus collectors called at scrape time for externally owned values"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]):
+        """
+        Add a scrape-time callback
+
+        It returns (name, type, help, labels, value) samples, e.g. values read
+        from a cache's own hit and miss counters.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        families = {}
+        for collector in collectors:
+            try:
+                for name, kind, documentation, labels, value in collector():
+                    families.setdefault(name, (kind, documentation, []))[2].append((labels, value))
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        for name, (kind, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f"{name}{_label_text(names, tuple(labels[key] for key in names))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+# Global registry exported at /metrics
+METRICS = MetricsRegistry()
+
+HTTP_REQUESTS = METRICS.counter(
+    "ecobee_http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+HTTP_ERRORS = METRICS.counter(
+    "ecobee_http_request_errors_total", "HTTP requests that failed with a 5xx status or an exception",
+    ("method", "route"))
+HTTP_LATENCY = METRICS.histogram(
+    "ecobee_http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+HTTP_IN_FLIGHT = METRICS.gauge(
+    "ecobee_http_requests_in_flight", "HTTP requests currently being handled").labels()
+
+UPSTREAM_REQUESTS = METRICS.counter(
+    "ecobee_upstream_requests_total", "Outbound API calls by upstream and outcome", ("upstream", "outcome"))
+UPSTREAM_ERRORS = METRICS.counter(
+    "ecobee_upstream_errors_total", "Outbound API calls that raised or returned a non-2xx status", ("upstream",))
+UPSTREAM_LATENCY = METRICS.histogram(
+    "ecobee_upstream_request_duration_seconds", "Outbound API call latency by upstream", ("upstream",))
+UPSTREAM_IN_FLIGHT = METRICS.gauge(
+    "ecobee_upstream_requests_in_flight", "Outbound API calls currently waiting on the upstream", ("upstream",))
+
+CACHE_REQUESTS = METRICS.counter(
+    "ecobee_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result"))
+
+def cache_ratio_samples(cache: str, hits: float, misses: float) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    """Collector samples for a cache that keeps its own hit and miss counts"""
+    lookups = hits + misses
+    labels = {"cache": cache}
+    return [
+        ("ecobee_cache_hits", "gauge", "Cache hits counted by the cache itself", labels, hits),
+        ("ecobee_cache_misses", "gauge", "Cache misses counted by the cache itself", labels, misses),
+        ("ecobee_cache_hit_ratio", "gauge", "Cache hits / lookups since startup", labels,
+         hits / lookups if lookups else 0.0)
+    ]
+
+def _counted_cache_samples():
+    """Hit ratios for caches that report through CACHE_REQUESTS"""
+    by_cache = {}
+    for (cache, result), child in list(CACHE_REQUESTS._children.items()):
+        by_cache.setdefault(cache, {})[result] = child.value
+    samples = []
+    for cache, results in sorted(by_cache.items()):
+        hits, misses = results.get("hit", 0.0), results.get("miss", 0.0)
+        lookups = hits + misses
+        samples.append(("ecobee_cache_hit_ratio", "gauge", "Cache hits / lookups since startup",
+                        {"cache": cache}, hits / lookups if lookups else 0.0))
+    return samples
+
+METRICS.register_collector(_counted_cache_samples)
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+class _UpstreamCall:
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = None
+
+@contextmanager
+def track_upstream(upstream: str):
+    """
+    Time an outbound call and count its outcome
+
+    Set `.status` on the yielded object to the response status code; a
+    status of 400 or more, or an exception, counts as an error.
+    """
+    in_flight = UPSTREAM_IN_FLIGHT.labels(upstream)
+    call = _UpstreamCall()
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        UPSTREAM_REQUESTS.labels(upstream, "exception").inc()
+        UPSTREAM_ERRORS.labels(upstream).inc()
+        raise
+    else:
+        status = call.status
+        UPSTREAM_REQUESTS.labels(upstream, f"{status // 100}xx" if status else "unknown").inc()
+        if status is not None and status >= 400:
+            UPSTREAM_ERRORS.labels(upstream).inc()
+    finally:
+        UPSTREAM_LATENCY.labels(upstream).observe(time.perf_counter() - started)
+        in_flight.dec()
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request counts, errors, latency and in-flight requests"""
+
+    def __init__(self, app, route_label: Callable[[Dict], str]):
+        self.app = app
+        self.route_label = route_label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_holder = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            method, route, status = scope["method"], self.route_label(scope), status_holder[0]
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            if status >= 500:
+                HTTP_ERRORS.labels(method, route).inc()
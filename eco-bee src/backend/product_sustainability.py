@@ -4,7 +4,6 @@ Product Sustainability Analysis Module
 This module provides comprehensive product information and sustainability scoring
 """
 
-import requests
 import json
 import os
 import time
@@ -12,6 +11,9 @@ from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
+from metrics import record_cache
+from upstream_http import UPSTREAM_HTTP
+
 # Load environment variables
 load_dotenv()
 
@@ -50,7 +52,7 @@ class ProductSustainabilityAnalyzer:
         # Cache for API responses to avoid repeated calls
         self.cache = {}
         
-    def get_product_info(self, barcode: str, product_type: str = "food") -> Optional[ProductInfo]:
+    async def get_product_info(self, barcode: str, product_type: str = "food") -> Optional[ProductInfo]:
         """Get comprehensive product information and sustainability analysis
         
         Args:
@@ -65,22 +67,23 @@ class ProductSustainabilityAnalyzer:
             
             # Check cache first
             cache_key = f"product_{product_type}_{barcode}"
+            record_cache("product", cache_key in self.cache)
             if cache_key in self.cache:
                 print(f"💾 Found in cache for barcode: {barcode}")
                 return self.cache[cache_key]
             
             # Route to appropriate data source based on product type
             if product_type == "clothing":
-                basic_info = self._get_clothing_product_data(barcode)
+                basic_info = await self._get_clothing_product_data(barcode)
             else:
                 # Step 1: Get basic product info from Open Food Facts (for food products)
                 print(f"📊 Checking OpenFoodFacts for barcode: {barcode}")
-                basic_info = self._get_openfoodfacts_data(barcode)
+                basic_info = await self._get_openfoodfacts_data(barcode)
                 
                 # Step 2: If not found in OpenFoodFacts, try UPCitemdb
                 if not basic_info:
                     print(f"📊 Checking UPCitemdb for barcode: {barcode}")
-                    basic_info = self._get_upcitemdb_data(barcode)
+                    basic_info = await self._get_upcitemdb_data(barcode)
             
             # Step 3: If still no info, create basic structure
             if not basic_info:
@@ -103,9 +106,9 @@ class ProductSustainabilityAnalyzer:
             # Step 5: Use AI to analyze sustainability
             print(f"🤖 Starting AI sustainability analysis for: {basic_info.get('name', 'Unknown')}")
             if product_type == "clothing":
-                sustainability_analysis = self._analyze_clothing_sustainability_with_ai(basic_info, barcode)
+                sustainability_analysis = await self._analyze_clothing_sustainability_with_ai(basic_info, barcode)
             else:
-                sustainability_analysis = self._analyze_sustainability_with_ai(basic_info, barcode)
+                sustainability_analysis = await self._analyze_sustainability_with_ai(basic_info, barcode)
             
             # Step 5: Create ProductInfo object with category detection
             product_info = ProductInfo(
@@ -136,11 +139,11 @@ class ProductSustainabilityAnalyzer:
             print(f"Error getting product info for {barcode}: {e}")
             return None
     
-    def _get_openfoodfacts_data(self, barcode: str) -> Optional[Dict[str, Any]]:
+    async def _get_openfoodfacts_data(self, barcode: str) -> Optional[Dict[str, Any]]:
         """Get product data from Open Food Facts API"""
         try:
             url = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-            response = requests.get(url, timeout=10)
+            response = await UPSTREAM_HTTP.get("openfoodfacts", url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -174,13 +177,13 @@ class ProductSustainabilityAnalyzer:
             print(f"Error fetching from OpenFoodFacts: {e}")
             return None
     
-    def _get_upcitemdb_data(self, barcode: str) -> Optional[Dict[str, Any]]:
+    async def _get_upcitemdb_data(self, barcode: str) -> Optional[Dict[str, Any]]:
         """Get product data from UPCitemdb API"""
         try:
             url = f"https://api.upcitemdb.com/prod/trial/lookup"
             params = {'upc': barcode}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await UPSTREAM_HTTP.get("upcitemdb", url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -203,7 +206,7 @@ class ProductSustainabilityAnalyzer:
             print(f"Error fetching from UPCitemdb: {e}")
             return None
     
-    def _get_clothing_product_data(self, barcode: str) -> Optional[Dict[str, Any]]:
+    async def _get_clothing_product_data(self, barcode: str) -> Optional[Dict[str, Any]]:
         """Get clothing/textile product data from various sources
         
         Args:
@@ -216,7 +219,7 @@ class ProductSustainabilityAnalyzer:
             print(f"👕 Searching clothing databases for barcode: {barcode}")
             
             # First try UPCitemdb (works for many retail products including clothing)
-            clothing_info = self._get_upcitemdb_data(barcode)
+            clothing_info = await self._get_upcitemdb_data(barcode)
             
             if clothing_info:
                 # Enhance with clothing-specific categorization
@@ -296,7 +299,7 @@ class ProductSustainabilityAnalyzer:
             print(f"Error getting brand sustainability info: {e}")
             return None
     
-    def _analyze_sustainability_with_ai(self, product_data: Dict[str, Any], barcode: str) -> SustainabilityScore:
+    async def _analyze_sustainability_with_ai(self, product_data: Dict[str, Any], barcode: str) -> SustainabilityScore:
         """Use Mistral AI to analyze product sustainability"""
         try:
             if not self.mistral_api_key:
@@ -360,7 +363,7 @@ class ProductSustainabilityAnalyzer:
                 "temperature": 0.3
             }
             
-            response = requests.post(self.mistral_url, headers=headers, json=payload, timeout=30)
+            response = await UPSTREAM_HTTP.post("mistral", self.mistral_url, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -394,7 +397,7 @@ class ProductSustainabilityAnalyzer:
             print(f"Error in AI sustainability analysis: {e}")
             return self._create_fallback_sustainability_score()
     
-    def _analyze_clothing_sustainability_with_ai(self, product_data: Dict[str, Any], barcode: str) -> SustainabilityScore:
+    async def _analyze_clothing_sustainability_with_ai(self, product_data: Dict[str, Any], barcode: str) -> SustainabilityScore:
         """Use Mistral AI to analyze clothing sustainability"""
         try:
             if not self.mistral_api_key:
@@ -459,7 +462,7 @@ class ProductSustainabilityAnalyzer:
                 "max_tokens": 1500
             }
 
-            response = requests.post(self.mistral_url, headers=headers, json=payload, timeout=30)
+            response = await UPSTREAM_HTTP.post("mistral", self.mistral_url, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -42,6 +42,18 @@ class EcoBeeRecommender:
         self.resources = self._load_resources()
         self.user_profiles = {}  # user_id -> profile data
         self.action_graph = self._build_action_graph()
+        # Bumped whenever actions or resources change, so cached responses built from them go stale
+        self.version = 0
+    
+    def update_data(self, actions: Optional[Dict[str, Action]] = None,
+                    resources: Optional[Dict[str, Resource]] = None):
+        """Replace the actions and/or resources databases and rebuild the action graph"""
+        if actions is not None:
+            self.actions = dict(actions)
+        if resources is not None:
+            self.resources = dict(resources)
+        self.action_graph = self._build_action_graph()
+        self.version += 1
     
     def _load_actions(self) -> Dict[str, Action]:
         """Load sustainable actions database"""
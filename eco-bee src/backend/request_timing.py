@@ -0,0 +1,171 @@
+"""
+Per-request stage timing
+An ASGI middleware times every request and reports the stages recorded
+with span() in a Server-Timing response header; durations are also
+aggregated in memory per route and stage. Handlers call span() and timed()
+unconditionally: with timing disabled (ECOBEE_TIMING=0, or
+REQUEST_TIMING.enabled = False at runtime) they do nothing. Routes built
+with TimedRoute also record each endpoint call as a "handler" stage.
+"""
+
+import functools
+import inspect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+# Stages recorded for the request being handled, None outside a timed request
+_current_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timing_stages", default=None)
+
+_TOKEN_INVALID = re.compile(r"[^A-Za-z0-9_.\-]")
+
+def route_label(scope: Dict) -> str:
+    """Route template a request matched (e.g. /api/session/{session_id}/score), "unmatched" if none"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class StageStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+class RequestTiming:
+    """
+    In-memory per-route, per-stage duration aggregates
+
+    Every timed request contributes a "total" stage (time until the response
+    headers were sent) plus whatever stages its handler recorded.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._stats = {}  # (method, route, stage) -> StageStats
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, stages: List[Tuple[str, float]]):
+        with self._lock:
+            for stage, seconds in stages:
+                stats = self._stats.get((method, route, stage))
+                if stats is None:
+                    stats = self._stats[(method, route, stage)] = StageStats()
+                stats.add(seconds)
+
+    def snapshot(self) -> Dict:
+        """Aggregates as {"METHOD route": {stage: {count, mean_ms, max_ms, total_ms}}}"""
+        with self._lock:
+            routes = {}
+            for (method, route, stage), stats in sorted(self._stats.items()):
+                routes.setdefault(f"{method} {route}", {})[stage] = {
+                    "count": stats.count,
+                    "mean_ms": round(stats.total / stats.count * 1000, 3),
+                    "max_ms": round(stats.max * 1000, 3),
+                    "total_ms": round(stats.total * 1000, 3)
+                }
+            return {"enabled": self.enabled, "routes": routes}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+# Global timing aggregates and switch used by the middleware
+REQUEST_TIMING = RequestTiming(enabled=os.getenv("ECOBEE_TIMING", "1").lower() not in ("0", "false", "off"))
+
+@contextmanager
+def span(name: str):
+    """Record the duration of the enclosed block as stage `name` of the current request"""
+    stages = _current_stages.get()
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages.append((name, time.perf_counter() - started))
+
+def timed(name: Optional[str] = None):
+    """Decorator recording every call of a function (sync or async) as a stage of the current request"""
+    def decorate(function):
+        stage = name or function.__name__
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class TimedRoute(APIRoute):
+    """APIRoute recording the endpoint call as the "handler" stage; set as the router's route_class"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, timed("handler")(endpoint), **kwargs)
+
+def server_timing_header(stages: List[Tuple[str, float]]) -> str:
+    """Server-Timing header value; repeated stages are summed and keep first-seen order"""
+    durations = {}
+    for stage, seconds in stages:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    return ", ".join(
+        f"{_TOKEN_INVALID.sub('_', stage)};dur={seconds * 1000:.3f}" for stage, seconds in durations.items()
+    )
+
+class TimingMiddleware:
+    """
+    ASGI middleware timing each HTTP request
+
+    Adds a Server-Timing header listing the handler's stages and the total,
+    and feeds the same durations into `timing`. Checks `timing.enabled` per
+    request, so it can be switched off without touching handlers.
+    """
+
+    def __init__(self, app, timing: RequestTiming = REQUEST_TIMING):
+        self.app = app
+        self.timing = timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.timing.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages = []
+        token = _current_stages.set(stages)
+        recorded = []
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                recorded.extend(stages)
+                recorded.append(("total", time.perf_counter() - started))
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(recorded).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stages.reset(token)
+            if recorded:
+                self.timing.record(scope["method"], route_label(scope), recorded)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Bulk re-scoring of archived intake submissions
+Splits JSONL archives of /api/intake request bodies into line-aligned chunks
+and re-scores them on a process pool. Every worker builds the scoring model
+once, reads its own byte range of the archive and writes one columnar .npz
+file per chunk, so finished chunks are skipped when a run is resumed.
+
+Usage:
+    python rescore.py intake_2024.jsonl intake_2025.jsonl -o rescored/
+    python rescore.py archive/*.jsonl -o rescored/ --factor-tables-dir factor_tables/ --workers 16
+    python rescore.py archive/*.jsonl -o rescored/ --weights weights.json --resume
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ecoscore import (
+    FactorIndex, ScoringModel, build_scoring_model, item_problem, load_factor_tables_from_csv,
+    score_items_matrix, score_quiz_cohort
+)
+from score_stream import ScoreAggregate
+
+DEFAULT_CHUNK_SIZE = 5000
+MANIFEST_FILE = "manifest.json"
+SUMMARY_FILE = "summary.json"
+
+# Model built once per worker process by _init_worker
+_WORKER_MODEL = None
+
+def load_model(factor_tables_dir: Optional[str] = None, factor_tables_binary: Optional[str] = None,
+               weights_file: Optional[str] = None) -> ScoringModel:
+    """Scoring model for a re-scoring run, from optional factor tables and weight overrides"""
+    factor_index = None
+    if factor_tables_binary:
+        from factor_binary import open_binary_factor_index
+        factor_index = open_binary_factor_index(factor_tables_binary)
+    elif factor_tables_dir:
+        factor_index = FactorIndex(load_factor_tables_from_csv(factor_tables_dir))
+
+    weights = None
+    if weights_file:
+        with open(weights_file, "r", encoding="utf-8") as f:
+            weights = json.load(f)
+    return build_scoring_model(factor_index=factor_index, weights=weights)
+
+def plan_chunks(paths: List[str], chunk_size: int) -> Iterator[Dict]:
+    """
+    Split archives into chunks of `chunk_size` lines
+
+    Only newlines are scanned here; parsing happens in the workers, which
+    read their chunk's byte range directly.
+    """
+    for source, path in enumerate(paths):
+        with open(path, "rb") as f:
+            start = 0
+            first_line = 1
+            lines = 0
+            offset = 0
+            for line in f:
+                offset += len(line)
+                lines += 1
+                if lines == chunk_size:
+                    yield {"source": source, "path": path, "start": start, "end": offset, "first_line": first_line}
+                    start, first_line, lines = offset, first_line + lines, 0
+            if lines:
+                yield {"source": source, "path": path, "start": start, "end": offset, "first_line": first_line}
+
+def _chunk_file(output_dir: Path, chunk_id: int) -> Path:
+    return output_dir / f"chunk-{chunk_id:06d}.npz"
+
+def _submission_items(record: Dict) -> Tuple[List[Dict], List]:
+    """Items and quiz responses of an archived intake request"""
+    if "items" not in record and "quiz_responses" not in record:
+        # Bare item export: a single-item submission
+        return [record], []
+    items = [
+        {
+            "type": item.get("type", ""),
+            "category": item.get("category", ""),
+            "materials": item.get("materials") or [],
+            "barcode": item.get("barcode")
+        }
+        for item in record.get("items") or []
+    ]
+    return items, record.get("quiz_responses") or []
+
+def _responses_problem(responses) -> Optional[str]:
+    """Why quiz responses cannot be scored, or None if they can"""
+    if isinstance(responses, dict):
+        return None
+    if not isinstance(responses, list) or not all(isinstance(response, dict) for response in responses):
+        return "quiz_responses must be an answer mapping or a list of response objects"
+    return None
+
+def score_chunk(chunk: Dict, model: ScoringModel) -> Dict:
+    """
+    Re-score the submissions in one chunk
+
+    All items in the chunk go through the batch engine in a single call;
+    submissions without items are scored from their quiz responses like
+    /api/intake does. Returns the columns and the chunk's item aggregate.
+    """
+    with open(chunk["path"], "rb") as f:
+        f.seek(chunk["start"])
+        data = f.read(chunk["end"] - chunk["start"])
+
+    line_numbers, session_ids, user_ids, item_counts = [], [], [], []
+    items, offsets, quiz_rows = [], [], {}
+    errors = 0
+    for line_number, line in enumerate(data.splitlines(), chunk["first_line"]):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record is not a JSON object")
+            submission_items, responses = _submission_items(record)
+            problem = next(filter(None, map(item_problem, submission_items)), None) or _responses_problem(responses)
+            if problem:
+                raise ValueError(problem)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Skipping invalid record {chunk['path']}:{line_number}: {e}", file=sys.stderr)
+            errors += 1
+            continue
+
+        row = len(line_numbers)
+        line_numbers.append(line_number)
+        session_ids.append(record.get("session_id") or "")
+        user_ids.append(record.get("user_id") or "")
+        item_counts.append(len(submission_items))
+        offsets.append(len(items))
+        items.extend(submission_items)
+        if not submission_items:
+            quiz_rows[row] = responses
+
+    boundary_count = len(model.boundary_keys)
+    averages = np.full((len(line_numbers), boundary_count), 50.0)
+    batch = score_items_matrix(items, model)
+    counts = np.asarray(item_counts, dtype=np.int32)
+    has_items = counts > 0
+    if has_items.any():
+        sums = np.add.reduceat(batch.normalized, np.asarray(offsets)[has_items], axis=0)
+        averages[has_items] = sums / counts[has_items, None]
+    # Every boundary is present, so the composite is the plain weighted mean
+    composites = averages @ model.weights / model.weights.sum() if len(averages) else np.zeros(0)
+    grades = model.grades(composites)
+    if quiz_rows:
+        # Quiz-only submissions are scored as one cohort; the quiz composite is
+        # a weighted sum that is not normalized by the weight total
+        quiz = score_quiz_cohort(list(quiz_rows.values()), model)
+        rows = list(quiz_rows)
+        averages[rows] = quiz.scores
+        composites[rows] = quiz.composites
+        for row, grade in zip(rows, quiz.grades):
+            grades[row] = grade
+
+    aggregate = ScoreAggregate(model)
+    aggregate.update(batch.normalized)
+    columns = {
+        "source": np.full(len(line_numbers), chunk["source"], dtype=np.int32),
+        "line": np.asarray(line_numbers, dtype=np.int64),
+        "session_id": np.asarray(session_ids, dtype=str),
+        "user_id": np.asarray(user_ids, dtype=str),
+        "item_count": counts,
+        "composite": np.round(composites, 1),
+        "grade": np.asarray(grades, dtype=str),
+    }
+    for column, boundary in enumerate(model.boundary_keys):
+        columns[boundary] = averages[:, column]
+    return {"columns": columns, "aggregate": aggregate, "errors": errors}
+
+def _write_chunk(path: Path, result: Dict):
+    """Write a chunk's columns and aggregate atomically (readers never see partial files)"""
+    aggregate = result["aggregate"]
+    temporary = path.with_suffix(".tmp.npz")
+    np.savez(
+        temporary,
+        **result["columns"],
+        _boundary_sums=aggregate.boundary_sums,
+        _item_count=np.asarray(aggregate.item_count),
+        _errors=np.asarray(result["errors"])
+    )
+    os.replace(temporary, path)
+
+def _init_worker(factor_tables_dir: Optional[str], factor_tables_binary: Optional[str],
+                 weights_file: Optional[str]):
+    global _WORKER_MODEL
+    _WORKER_MODEL = load_model(factor_tables_dir, factor_tables_binary, weights_file)
+
+def _run_chunk(chunk_id: int, chunk: Dict, output_dir: str) -> Tuple[int, int]:
+    result = score_chunk(chunk, _WORKER_MODEL)
+    _write_chunk(_chunk_file(Path(output_dir), chunk_id), result)
+    return chunk_id, len(result["columns"]["line"])
+
+def _run_signature(paths: List[str], chunk_size: int, args: Dict) -> Dict:
+    files = []
+    for path in paths:
+        stat = os.stat(path)
+        files.append({"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return {"files": files, "chunk_size": chunk_size, "model": args}
+
+def merge_chunks(output_dir: str, model: ScoringModel) -> Dict:
+    """Merge the aggregates of every finished chunk into the run summary"""
+    aggregate = ScoreAggregate(model)
+    submissions = 0
+    errors = 0
+    grade_counts = {}
+    composite_sum = 0.0
+    for path in sorted(Path(output_dir).glob("chunk-*[0-9].npz")):
+        with np.load(path) as chunk:
+            chunk_aggregate = ScoreAggregate(model)
+            chunk_aggregate.boundary_sums = chunk["_boundary_sums"]
+            chunk_aggregate.item_count = int(chunk["_item_count"])
+            aggregate.merge(chunk_aggregate)
+            submissions += len(chunk["line"])
+            errors += int(chunk["_errors"])
+            composite_sum += float(chunk["composite"].sum())
+            grades, counts = np.unique(chunk["grade"], return_counts=True)
+            for grade, count in zip(grades.tolist(), counts.tolist()):
+                grade_counts[grade] = grade_counts.get(grade, 0) + count
+
+    summary = aggregate.result()
+    summary["submission_count"] = submissions
+    summary["invalid_records"] = errors
+    summary["mean_submission_composite"] = round(composite_sum / submissions, 1) if submissions else 50.0
+    summary["grade_distribution"] = dict(sorted(grade_counts.items()))
+    return summary
+
+def load_rescored(output_dir: str) -> Dict[str, np.ndarray]:
+    """Concatenate the columns of every chunk in a run, in chunk order"""
+    parts = {}
+    for path in sorted(Path(output_dir).glob("chunk-*[0-9].npz")):
+        with np.load(path) as chunk:
+            for name in chunk.files:
+                if not name.startswith("_"):
+                    parts.setdefault(name, []).append(chunk[name])
+    return {name: np.concatenate(arrays) for name, arrays in parts.items()}
+
+def rescore(
+    paths: List[str],
+    output_dir: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    factor_tables_dir: Optional[str] = None,
+    factor_tables_binary: Optional[str] = None,
+    weights_file: Optional[str] = None
+) -> Dict:
+    """
+    Re-score intake archives on a process pool and return the merged summary
+
+    Args:
+        paths: JSONL archives of intake request bodies (or bare item records)
+        output_dir: Directory for chunk files, the manifest and summary.json
+        chunk_size: Submissions (lines) per chunk
+        workers: Worker processes, defaults to os.cpu_count()
+        resume: Keep finished chunks of a previous run over the same inputs
+        factor_tables_dir: Factor table CSV directory to score against
+        factor_tables_binary: Compiled factor table file to score against
+        weights_file: JSON file of per-boundary weight overrides
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    model_args = {
+        "factor_tables_dir": factor_tables_dir,
+        "factor_tables_binary": factor_tables_binary,
+        "weights_file": weights_file
+    }
+    signature = _run_signature(paths, chunk_size, model_args)
+    manifest_path = output / MANIFEST_FILE
+
+    if resume and manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous != signature:
+            raise ValueError(f"{output} holds a run over different inputs or settings, refusing to resume")
+    else:
+        for stale in output.glob("chunk-*.npz"):
+            stale.unlink()
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(signature, f, indent=2)
+
+    model = load_model(factor_tables_dir, factor_tables_binary, weights_file)
+    workers = workers or os.cpu_count() or 1
+    started = time.time()
+    done_chunks = skipped = submissions = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(factor_tables_dir, factor_tables_binary, weights_file)) as pool:
+        pending = set()
+        for chunk_id, chunk in enumerate(plan_chunks(paths, chunk_size)):
+            if _chunk_file(output, chunk_id).exists():
+                skipped += 1
+                continue
+            # Bound in-flight chunks so planning never runs far ahead of the pool
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    submissions += future.result()[1]
+                    done_chunks += 1
+                _report_progress(done_chunks, skipped, submissions, started)
+            pending.add(pool.submit(_run_chunk, chunk_id, chunk, str(output)))
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                submissions += future.result()[1]
+                done_chunks += 1
+            _report_progress(done_chunks, skipped, submissions, started)
+
+    summary = merge_chunks(str(output), model)
+    summary["elapsed_seconds"] = round(time.time() - started, 3)
+    with open(output / SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def _report_progress(done_chunks: int, skipped: int, submissions: int, started: float):
+    elapsed = max(time.time() - started, 1e-9)
+    resumed = f", {skipped} resumed" if skipped else ""
+    print(f"Rescored {done_chunks} chunks{resumed}, {submissions} submissions "
+          f"({submissions / elapsed:,.0f}/s)", file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score archived intake submissions on a process pool")
+    parser.add_argument("inputs", nargs="+", help="JSONL intake archives")
+    parser.add_argument("-o", "--output-dir", required=True, help="Directory for columnar chunk files")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Submissions per chunk")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--resume", action="store_true", help="Skip chunks finished by a previous run")
+    parser.add_argument("--factor-tables-dir", help="Score against factor table CSVs in this directory")
+    parser.add_argument("--factor-tables-binary", help="Score against a compiled factor table file")
+    parser.add_argument("--weights", help="JSON file of per-boundary weight overrides")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = rescore(args.inputs, args.output_dir, args.chunk_size, args.workers, args.resume,
+                          args.factor_tables_dir, args.factor_tables_binary, args.weights)
+    except (OSError, ValueError) as e:
+        print(f"❌ Rescoring failed: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(summary, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
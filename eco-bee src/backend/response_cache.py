@@ -0,0 +1,147 @@
+"""
+HTTP response caching for read-mostly GET endpoints
+Rendered JSON bodies are kept in a bounded in-process LRU with a TTL, keyed
+on the endpoint, the version of the data it reads and its normalized
+parameters. Every body gets a strong ETag derived from its bytes, so clients
+revalidating with If-None-Match get an empty 304 whenever the data is
+unchanged, whether or not the body is still cached here. Bumping the data
+version (factor tables, actions, resources) makes older entries unreachable;
+they age out of the LRU.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from metrics import record_cache
+
+DEFAULT_TTL = 300.0
+
+class CachedBody:
+    __slots__ = ("body", "etag", "expires")
+
+    def __init__(self, body: bytes, etag: str, expires: float):
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+class ResponseCache:
+    """
+    Bounded LRU of rendered JSON response bodies with per-entry expiry
+
+    Keys are (endpoint, data version, params). Expired entries are rebuilt
+    on their next lookup; size 0 disables storing but ETag/304 handling
+    still works.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[CachedBody]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.expires <= time.monotonic():
+                del self._entries[key]
+                cached = None
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key: Tuple, cached: CachedBody):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Drop every entry, or only those of one endpoint"""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == endpoint]:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def respond(self, request: Request, endpoint: str, version: Hashable, params: Tuple,
+                build: Callable[[], Any], max_age: int = 60) -> Response:
+        """
+        Cached JSON response for a GET endpoint
+
+        Args:
+            request: Incoming request, read for If-None-Match
+            endpoint: Cache namespace, usually the route name
+            version: Version of the data the body is computed from
+            params: Normalized parameters the body depends on (hashable)
+            build: Computes the response content on a miss; exceptions are not cached
+            max_age: Seconds clients and proxies may reuse the response without revalidating
+
+        Returns:
+            200 with the body, or 304 if the client's ETag is current; both carry ETag and Cache-Control
+        """
+        key = (endpoint, version, params)
+        cached = self.get(key)
+        record_cache("response", cached is not None)
+        if cached is None:
+            body = JSONResponse(content=jsonable_encoder(build())).body
+            cached = CachedBody(body, strong_etag(body), time.monotonic() + self.ttl)
+            self.put(key, cached)
+
+        headers = {"ETag": cached.etag, "Cache-Control": f"public, max-age={max_age}"}
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+# Shared cache for the read-mostly GET endpoints; ECOBEE_RESPONSE_CACHE_SIZE=0 disables storing bodies
+RESPONSE_CACHE = ResponseCache(
+    maxsize=int(os.getenv("ECOBEE_RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ECOBEE_RESPONSE_CACHE_TTL", str(DEFAULT_TTL)))
+)
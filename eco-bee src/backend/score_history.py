@@ -0,0 +1,297 @@
+"""
+Per-user EcoScore history
+Every score a user receives is appended to a JSON-lines log next to the
+product database. Rolling 7/30/90-day means and trend slopes of the
+composite and each boundary, and daily streaks, are kept up to date as
+records arrive and age out, so progress views read them directly instead
+of rescanning the history.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, asdict, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ecoscore import PLANETARY_BOUNDARIES
+
+HISTORY_FILE = Path(__file__).parent / "score_history.jsonl"
+
+# Rolling windows, in days, maintained for every user
+DEFAULT_WINDOWS = (7, 30, 90)
+
+@dataclass
+class ScoreRecord:
+    user_id: str
+    timestamp: str
+    composite_score: float
+    boundary_scores: Dict[str, float]
+    grade: Optional[str] = None
+    source: str = "score"
+
+class WindowAggregate:
+    """
+    Running least-squares sums for one rolling window
+
+    Per series (composite, then each boundary) it keeps the count and the
+    sums of t, t^2, y and t*y, where t is days since the user's first
+    record; means and slopes follow in O(1). Records are added when they
+    arrive and subtracted when they fall out of the window.
+    """
+
+    def __init__(self, days: int, series_count: int):
+        self.days = days
+        self.start = 0  # index of the oldest record still inside the window
+        self._reset(series_count)
+
+    def _reset(self, series_count: int):
+        self.count = np.zeros(series_count)
+        self.sum_t = np.zeros(series_count)
+        self.sum_tt = np.zeros(series_count)
+        self.sum_y = np.zeros(series_count)
+        self.sum_ty = np.zeros(series_count)
+
+    def add(self, t: float, values: np.ndarray, present: np.ndarray, sign: float = 1.0):
+        weight = present * sign
+        self.count += weight
+        self.sum_t += weight * t
+        self.sum_tt += weight * t * t
+        self.sum_y += weight * values
+        self.sum_ty += weight * t * values
+
+    def evict(self, records: List, cutoff: datetime):
+        """Subtract records older than `cutoff` (records are in time order)"""
+        while self.start < len(records) and records[self.start][0] < cutoff:
+            _, t, values, present = records[self.start]
+            self.add(t, values, present, -1.0)
+            self.start += 1
+        if self.start == len(records):
+            # Drop accumulated rounding error once the window is empty
+            self._reset(len(self.count))
+
+    def summary(self, series: List[str]) -> Dict:
+        means = {}
+        slopes = {}
+        for column, name in enumerate(series):
+            count = round(self.count[column])
+            if not count:
+                means[name] = None
+                slopes[name] = None
+                continue
+            means[name] = round(float(self.sum_y[column] / count), 2)
+            spread = count * self.sum_tt[column] - self.sum_t[column] ** 2
+            # Points spanning (almost) no time give no trend
+            if count < 2 or spread <= 1e-9 * max(1.0, count * self.sum_tt[column]):
+                slopes[name] = None
+            else:
+                slope = (count * self.sum_ty[column] - self.sum_t[column] * self.sum_y[column]) / spread
+                slopes[name] = round(float(slope), 3)
+        return {
+            "days": self.days,
+            "count": int(round(self.count.max())) if len(self.count) else 0,
+            "means": means,
+            "slopes_per_day": slopes
+        }
+
+@dataclass
+class UserHistory:
+    """In-memory history and rolling aggregates for one user"""
+    origin: datetime
+    records: List = field(default_factory=list)  # (timestamp, t, values, present)
+    offsets: List[Tuple[datetime, int]] = field(default_factory=list)  # (timestamp, byte offset in the log)
+    windows: List[WindowAggregate] = field(default_factory=list)
+    total: int = 0
+    last_day: Optional[date] = None
+    current_streak: int = 0
+    longest_streak: int = 0
+
+class ScoreHistory:
+    """
+    Append-only per-user score history with incrementally maintained aggregates
+
+    Records are appended to `path` (one JSON object per line) and replayed on
+    startup. Timestamps must not go backwards for a user. Each rolling window
+    only ever moves forward: records are added once and subtracted once when
+    they age out, so reading aggregates costs O(1) amortized per record.
+    The byte offset of every user's lines is kept, so reading one user's
+    history seeks straight to their records without holding the writer lock.
+    """
+
+    def __init__(self, path: Path = HISTORY_FILE, windows=DEFAULT_WINDOWS,
+                 boundary_keys: Optional[List[str]] = None):
+        self.path = Path(path)
+        self.window_days = tuple(sorted(windows))
+        self.boundary_keys = list(PLANETARY_BOUNDARIES.keys()) if boundary_keys is None else list(boundary_keys)
+        self.series = ["composite"] + self.boundary_keys
+        self._users = {}
+        self._lock = threading.Lock()
+        self.load_history()
+
+    def load_history(self):
+        """Replay the history log into memory"""
+        self._users = {}
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                offset = 0
+                for line_number, line in enumerate(f, 1):
+                    line_offset, offset = offset, offset + len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = ScoreRecord(**json.loads(line))
+                        self._check_order(record)
+                        self._apply(record, line_offset)
+                    except (json.JSONDecodeError, UnicodeDecodeError, TypeError, ValueError) as e:
+                        print(f"Skipping score history line {line_number}: {e}")
+        except OSError as e:
+            print(f"Error loading score history {self.path}: {e}")
+
+    def _check_order(self, record: ScoreRecord):
+        """Reject a record older than its user's latest one"""
+        user = self._users.get(record.user_id)
+        if user is not None and user.offsets and datetime.fromisoformat(record.timestamp) < user.offsets[-1][0]:
+            raise ValueError(f"Timestamp {record.timestamp} is older than the user's latest record")
+
+    def _apply(self, record: ScoreRecord, offset: int):
+        """Fold one record (stored at `offset` in the log) into its user's in-memory history and aggregates"""
+        timestamp = datetime.fromisoformat(record.timestamp)
+        scores = dict(record.boundary_scores, composite=record.composite_score)
+        present = np.array([scores.get(name) is not None for name in self.series], dtype=np.float64)
+        values = np.array([float(scores.get(name) or 0.0) for name in self.series])
+
+        user = self._users.get(record.user_id)
+        if user is None:
+            user = UserHistory(origin=timestamp)
+            user.windows = [WindowAggregate(days, len(self.series)) for days in self.window_days]
+            self._users[record.user_id] = user
+        user.offsets.append((timestamp, offset))
+        t = (timestamp - user.origin).total_seconds() / 86400.0
+        user.records.append((timestamp, t, values, present))
+        user.total += 1
+        for window in user.windows:
+            window.add(t, values, present)
+
+        day = timestamp.date()
+        if user.last_day is None or day - user.last_day > timedelta(days=1):
+            user.current_streak = 1
+        elif day != user.last_day:
+            user.current_streak += 1
+        user.last_day = day
+        user.longest_streak = max(user.longest_streak, user.current_streak)
+
+        # Only the longest window needs the raw records
+        self._trim(user)
+
+    def _trim(self, user: UserHistory):
+        for window in user.windows:
+            window.evict(user.records, user.records[-1][0] - timedelta(days=window.days))
+        oldest_needed = min(window.start for window in user.windows)
+        if oldest_needed > 1024 and oldest_needed * 2 > len(user.records):
+            del user.records[:oldest_needed]
+            for window in user.windows:
+                window.start -= oldest_needed
+
+    def record_score(self, user_id: str, composite_score: float, boundary_scores: Dict[str, float],
+                     grade: Optional[str] = None, source: str = "score",
+                     timestamp: Optional[datetime] = None) -> Dict:
+        """
+        Append a score to a user's history
+
+        Args:
+            user_id: User the score belongs to
+            composite_score: Composite EcoScore
+            boundary_scores: Per-boundary scores; missing boundaries are left out of their aggregates
+            grade: Letter grade, if known
+            source: What produced the score (e.g. "intake", "leaderboard")
+            timestamp: When it was scored, defaults to now
+
+        Returns:
+            The stored record
+        """
+        record = ScoreRecord(
+            user_id=user_id,
+            timestamp=(timestamp or datetime.now()).isoformat(),
+            composite_score=float(composite_score),
+            boundary_scores={key: float(value) for key, value in boundary_scores.items()
+                             if key in self.boundary_keys and value is not None},
+            grade=grade,
+            source=source
+        )
+        line = (json.dumps(asdict(record)) + "\n").encode('utf-8')
+        with self._lock:
+            self._check_order(record)
+            # Only a record that reached the log is counted in memory
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, 2)
+                f.write(line)
+            self._apply(record, offset)
+        return asdict(record)
+
+    def history(self, user_id: str, since: Optional[datetime] = None, limit: Optional[int] = None) -> List[Dict]:
+        """A user's records from the log, oldest first, optionally only those since a time"""
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return []
+            # Offsets are only ever appended, so a copy is a consistent snapshot
+            offsets = list(user.offsets)
+        if since:
+            offsets = offsets[bisect_left(offsets, (since, -1)):]
+        if limit:
+            offsets = offsets[-limit:]
+
+        records = []
+        try:
+            with open(self.path, 'rb') as f:
+                for _, offset in offsets:
+                    f.seek(offset)
+                    records.append(json.loads(f.readline()))
+        except OSError as e:
+            print(f"Error reading score history {self.path}: {e}")
+        return records
+
+    def aggregates(self, user_id: str, now: Optional[datetime] = None) -> Optional[Dict]:
+        """
+        Rolling means, trend slopes (score points per day) and streaks for a user
+
+        Windows end at `now` (default: the current time); a window never moves
+        back, so an earlier `now` than a previous call reads as that call.
+        None if the user has no history.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return None
+            for window in user.windows:
+                window.evict(user.records, now - timedelta(days=window.days))
+
+            streak_alive = user.last_day is not None and (now.date() - user.last_day).days <= 1
+            return {
+                "user_id": user_id,
+                "total_records": user.total,
+                "latest": user.records[-1][0].isoformat() if user.records else None,
+                "windows": {f"{window.days}d": window.summary(self.series) for window in user.windows},
+                "streak": {
+                    "current_days": user.current_streak if streak_alive else 0,
+                    "longest_days": user.longest_streak,
+                    "last_active_day": user.last_day.isoformat() if user.last_day else None
+                }
+            }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "records": sum(user.total for user in self._users.values()),
+                "windows_days": list(self.window_days)
+            }
+
+# Global score history instance
+score_history = ScoreHistory()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Streaming EcoScore scoring for exported intake logs
+Reads JSONL/CSV item files lazily, scores them in fixed-size chunks and keeps
+only running per-boundary sums for the aggregate, so memory stays flat
+regardless of input size.
+
+Usage:
+    python score_stream.py items.jsonl > scored.jsonl
+    python score_stream.py items.csv --details --summary summary.json
+    cat items.jsonl | python score_stream.py -
+"""
+
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+import numpy as np
+
+from ecoscore import ScoringModel, get_scoring_model, item_problem, score_items_matrix, scored_item_json
+
+DEFAULT_CHUNK_SIZE = 1024
+
+# Separators accepted for the materials column of CSV exports
+CSV_MATERIAL_SEPARATORS = (';', '|')
+
+class ScoreAggregate:
+    """Running per-boundary sums and counts for a stream of scored items"""
+
+    def __init__(self, model: Optional[ScoringModel] = None):
+        self.model = model or get_scoring_model()
+        self.boundary_sums = np.zeros(len(self.model.boundary_keys), dtype=np.float64)
+        self.item_count = 0
+
+    def update(self, normalized: np.ndarray):
+        """Add an N x boundaries block of normalized scores"""
+        if len(normalized):
+            self.boundary_sums += normalized.sum(axis=0)
+            self.item_count += len(normalized)
+
+    def merge(self, other: "ScoreAggregate"):
+        """Fold another aggregate over the same model into this one"""
+        self.boundary_sums += other.boundary_sums
+        self.item_count += other.item_count
+
+    def per_boundary_averages(self) -> Dict[str, float]:
+        if not self.item_count:
+            return {boundary: 50.0 for boundary in self.model.boundary_keys}
+        averages = (self.boundary_sums / self.item_count).tolist()
+        return dict(zip(self.model.boundary_keys, averages))
+
+    def result(self) -> Dict:
+        """Aggregate EcoScore over everything seen so far"""
+        per_boundary_averages = self.per_boundary_averages()
+        composite_score = self.model.composite(per_boundary_averages) if self.item_count else 50.0
+        return {
+            "item_count": self.item_count,
+            "per_boundary_averages": per_boundary_averages,
+            "composite": round(composite_score, 1),
+            "grade": self.model.grade(composite_score),
+            "methodology": self.model.methodology()
+        }
+
+def _valid_items(items: Iterable[Dict]) -> Iterator[Dict]:
+    for position, item in enumerate(items, 1):
+        problem = item_problem(item)
+        if problem:
+            print(f"Skipping invalid item {position}: {problem}", file=sys.stderr)
+            continue
+        yield item
+
+def score_stream(
+    items: Iterable[Dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    model: Optional[ScoringModel] = None,
+    aggregate: Optional[ScoreAggregate] = None,
+    details: bool = False
+) -> Iterator[Dict]:
+    """
+    Score an iterable of items lazily, yielding one scored record per item
+
+    Items are pulled `chunk_size` at a time and scored through the batch
+    engine; nothing but the current chunk is held in memory. Pass an
+    aggregate to collect running per-boundary averages and the composite.
+
+    Args:
+        items: Any iterable of item dicts (type, category, materials, ...)
+        chunk_size: Number of items scored per batch
+        model: Scoring model to evaluate against, defaults to get_scoring_model()
+        aggregate: Optional ScoreAggregate updated as chunks are scored
+        details: Include the per-item ecoscore_details block in each record
+
+    Items that cannot be scored (see item_problem) are skipped and reported
+    on stderr.
+    """
+    model = model or (aggregate.model if aggregate else get_scoring_model())
+    iterator = _valid_items(items)
+
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+
+        batch = score_items_matrix(chunk, model)
+        if aggregate is not None:
+            aggregate.update(batch.normalized)
+
+        if details:
+            yield from batch.scored_items(chunk)
+            continue
+
+        for item, factor_key, normalized_row in zip(chunk, batch.factor_keys, batch.normalized.tolist()):
+            record = item.copy()
+            record.update(zip(batch.boundary_keys, normalized_row))
+            record["factor_table_used"] = factor_key
+            yield record
+
+def _parse_materials(value: str) -> List[str]:
+    value = (value or "").strip()
+    if not value:
+        return []
+    if value.startswith('['):
+        return json.loads(value)
+    for separator in CSV_MATERIAL_SEPARATORS:
+        if separator in value:
+            return [material.strip() for material in value.split(separator) if material.strip()]
+    return [value]
+
+def read_jsonl_items(handle: TextIO) -> Iterator[Dict]:
+    """Yield parsed values from a JSON Lines stream, skipping blank lines and invalid JSON"""
+    for line_number, line in enumerate(handle, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Skipping invalid JSON on line {line_number}: {e}", file=sys.stderr)
+            continue
+        yield item
+
+def read_csv_items(handle: TextIO) -> Iterator[Dict]:
+    """Yield item dicts from a CSV stream with type, category and materials columns"""
+    for row in csv.DictReader(handle):
+        item = {key: value for key, value in row.items() if key is not None}
+        item["materials"] = _parse_materials(row.get("materials", ""))
+        yield item
+
+def read_items(handle: TextIO, input_format: str) -> Iterator[Dict]:
+    if input_format == "csv":
+        return read_csv_items(handle)
+    return read_jsonl_items(handle)
+
+def _detect_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream EcoScores for a JSONL/CSV item export")
+    parser.add_argument("input", help="Input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Items scored per batch")
+    parser.add_argument("--details", action="store_true", help="Include ecoscore_details per item")
+    parser.add_argument("--summary", help="Write the aggregate EcoScore to this JSON file (default: stderr)")
+    args = parser.parse_args(argv)
+
+    input_format = _detect_format(args.input, args.format)
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    aggregate = ScoreAggregate()
+
+    try:
+        records = score_stream(read_items(source, input_format), args.chunk_size,
+                               aggregate=aggregate, details=args.details)
+        for record in records:
+            sink.write(json.dumps(record, default=scored_item_json))
+            sink.write("\n")
+    except BrokenPipeError:
+        # Downstream consumer (e.g. head) closed the pipe
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    summary = json.dumps(aggregate.result(), indent=2)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(summary)
+    else:
+        print(summary, file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
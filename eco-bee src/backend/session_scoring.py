@@ -0,0 +1,276 @@
+"""
+Incremental EcoScore accumulation per intake session
+Keeps running per-boundary sums for each session so adding, removing or
+editing one item updates the averages, composite and grade without
+rescoring the rest of the basket.
+"""
+
+import itertools
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import ecoscore
+from ecoscore import (
+    ScoringModel, assemble_result, create_boundary_details, create_default_ecoscore,
+    generate_recommendations, get_scoring_model, item_signature, resolve_sections, score_item
+)
+
+# Boundary scores above this count an item as a contributor in boundary details
+CONTRIBUTOR_THRESHOLD = 40
+
+class SessionScore:
+    """
+    Running EcoScore for one session's basket
+
+    Items are scored once when they join the session (through the shared
+    score cache) and their boundary rows are added to running sums.
+    Recommendations are regenerated only when the top-3 boundary ordering,
+    which of those boundaries pass the recommendation threshold, or the item
+    context classes that drive template selection change; otherwise only their scores
+    are refreshed.
+    """
+
+    def __init__(self, session_id: str, model: Optional[ScoringModel] = None):
+        self.session_id = session_id
+        self.model = model or get_scoring_model()
+        self.last_access = time.time()
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._items = OrderedDict()  # item id -> (signature, item, scored item, boundary row, sequence)
+        self._by_signature = {}  # signature -> item ids, for syncing full item lists
+        self._type_counts = Counter()
+        self._contributors = {}  # boundary -> ordered item ids scoring above CONTRIBUTOR_THRESHOLD
+        self._recommendation_key = None
+        self._recommendations = []
+        self._lock = threading.RLock()
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self.boundary_sums = np.zeros(len(self.model.boundary_keys), dtype=np.float64)
+        self._contributors = {boundary: OrderedDict() for boundary in self.model.boundary_keys}
+        self._recommendation_key = None
+
+    def _ensure_current_model(self):
+        """Rebuild the sums from stored items if the active scoring model was swapped"""
+        model = get_scoring_model()
+        if model is self.model:
+            return
+        items = [(item_id, entry[1]) for item_id, entry in self._items.items()]
+        self.model = model
+        self._items.clear()
+        self._by_signature.clear()
+        self._type_counts.clear()
+        self._reset_sums()
+        for item_id, item in items:
+            self._add(item, item_id)
+
+    def _add(self, item: Dict, item_id: str):
+        signature = item_signature(item)
+        scored = score_item(item, self.model)
+        row = np.array([scored[boundary] for boundary in self.model.boundary_keys], dtype=np.float64)
+
+        self._items[item_id] = (signature, item, scored, row, next(self._sequence))
+        self._by_signature.setdefault(signature, []).append(item_id)
+        self._type_counts[signature[0]] += 1
+        self.boundary_sums += row
+        for boundary, value in zip(self.model.boundary_keys, row.tolist()):
+            if value > CONTRIBUTOR_THRESHOLD:
+                self._contributors[boundary][item_id] = None
+
+    def _remove(self, item_id: str):
+        signature, _, _, row, _ = self._items.pop(item_id)
+        same_signature = self._by_signature[signature]
+        same_signature.remove(item_id)
+        if not same_signature:
+            del self._by_signature[signature]
+        self._type_counts[signature[0]] -= 1
+        if not self._type_counts[signature[0]]:
+            del self._type_counts[signature[0]]
+        for contributors in self._contributors.values():
+            contributors.pop(item_id, None)
+
+        if self._items:
+            self.boundary_sums -= row
+        else:
+            # Drop accumulated rounding error once the basket is empty
+            self.boundary_sums[:] = 0.0
+
+    def add_item(self, item: Dict, item_id: Optional[str] = None) -> str:
+        """Score one item into the session and return its item id"""
+        with self._lock:
+            self._ensure_current_model()
+            item_id = item_id or str(next(self._ids))
+            if item_id in self._items:
+                self._remove(item_id)
+            self._add(item, item_id)
+            self.last_access = time.time()
+            return item_id
+
+    def remove_item(self, item_id: str) -> bool:
+        """Remove an item from the session, False if it is not there"""
+        with self._lock:
+            self._ensure_current_model()
+            self.last_access = time.time()
+            if item_id not in self._items:
+                return False
+            self._remove(item_id)
+            return True
+
+    def update_item(self, item_id: str, item: Dict) -> str:
+        """Replace an item's contents; the item moves to the end of the basket"""
+        return self.add_item(item, item_id)
+
+    def sync_items(self, items: List[Dict]):
+        """
+        Make the basket hold exactly `items`
+
+        For clients that resend the full item list: items are matched by
+        scoring signature, so only the difference is scored, added or removed.
+        """
+        wanted = Counter(item_signature(item) for item in items)
+        with self._lock:
+            self._ensure_current_model()
+            for signature, item_ids in list(self._by_signature.items()):
+                for item_id in item_ids[wanted.get(signature, 0):]:
+                    self._remove(item_id)
+            for item in items:
+                signature = item_signature(item)
+                if len(self._by_signature.get(signature, ())) < wanted[signature]:
+                    self._add(item, str(next(self._ids)))
+
+            # Report items in the order (and with the fields) the client sent them
+            remaining = {signature: iter(item_ids) for signature, item_ids in self._by_signature.items()}
+            self._reorder([(next(remaining[item_signature(item)]), item) for item in items])
+            self.last_access = time.time()
+
+    def _reorder(self, ordered: List[Tuple[str, Dict]]):
+        """Rebuild the basket as `ordered` (item id, item) pairs with unchanged signatures"""
+        entries = OrderedDict()
+        for item_id, item in ordered:
+            signature, previous, scored, row, _ = self._items[item_id]
+            if item != previous:
+                # Same signature, so only non-scoring fields (e.g. barcode) differ
+                scored = scored.with_item(item)
+            entries[item_id] = (signature, item, scored, row, next(self._sequence))
+        self._items = entries
+        for boundary, contributors in self._contributors.items():
+            self._contributors[boundary] = OrderedDict(
+                (item_id, None) for item_id in entries if item_id in contributors
+            )
+
+    def item_count(self) -> int:
+        return len(self._items)
+
+    def per_boundary_averages(self) -> Dict[str, float]:
+        if not self._items:
+            return {boundary: 50.0 for boundary in self.model.boundary_keys}
+        averages = (self.boundary_sums / len(self._items)).tolist()
+        return dict(zip(self.model.boundary_keys, averages))
+
+    def recommendations(self, per_boundary_averages: Dict[str, float]) -> List[Dict]:
+        ranked = sorted(per_boundary_averages.items(), key=lambda x: x[1], reverse=True)[:3]
+        index = ecoscore.RECOMMENDATION_INDEX
+        # Item types are stored lowercased in signatures, so stand-in items suffice
+        contexts = index.classify([{'type': item_type} for item_type in self._type_counts])
+        key = (
+            tuple(boundary for boundary, _ in ranked),
+            tuple(score > 40 for _, score in ranked),
+            contexts,
+            index
+        )
+        if key != self._recommendation_key:
+            self._recommendations = generate_recommendations(
+                per_boundary_averages, [], self.model, index=index, contexts=contexts
+            )
+            self._recommendation_key = key
+        else:
+            for recommendation in self._recommendations:
+                recommendation["current_score"] = round(per_boundary_averages[recommendation["category"]], 1)
+        return [dict(recommendation) for recommendation in self._recommendations]
+
+    def boundary_details(self, per_boundary_averages: Dict[str, float]) -> Dict:
+        # Details list the first three contributors per boundary, so the union
+        # of those (in basket order) yields the same details as the full basket
+        item_ids = set()
+        for contributors in self._contributors.values():
+            item_ids.update(itertools.islice(contributors, 3))
+        entries = sorted((self._items[item_id] for item_id in item_ids), key=lambda entry: entry[4])
+        return create_boundary_details(per_boundary_averages, [entry[2] for entry in entries], self.model)
+
+    def result(self, sections=None) -> Dict:
+        """Current score in the shape calculate_ecoscore returns, limited to `sections`"""
+        wanted = resolve_sections(sections)
+        with self._lock:
+            self._ensure_current_model()
+            self.last_access = time.time()
+            if not self._items:
+                result = create_default_ecoscore(self.model, wanted)
+            else:
+                per_boundary_averages = self.per_boundary_averages()
+                composite_score = self.model.composite(per_boundary_averages)
+                result = assemble_result(
+                    wanted, per_boundary_averages, composite_score, self.model.grade(composite_score),
+                    items=lambda: [dict(entry[2], item_id=item_id) for item_id, entry in self._items.items()],
+                    recommendations=lambda: self.recommendations(per_boundary_averages),
+                    boundary_details=lambda: self.boundary_details(per_boundary_averages),
+                    methodology=self.model.methodology
+                )
+            result["session_id"] = self.session_id
+            return result
+
+class SessionScoreStore:
+    """
+    SessionScore accumulators keyed by session_id
+
+    Bounded to `max_sessions` (least recently used sessions are dropped) and
+    sessions idle for longer than `ttl_seconds` expire.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def get(self, session_id: str, create: bool = True) -> Optional[SessionScore]:
+        """The session's accumulator, created empty if missing and `create` is set"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                if not create:
+                    return None
+                session = SessionScore(session_id)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def drop(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+# Global session accumulators used by the API
+SESSION_SCORES = SessionScoreStore()
@@ -20,6 +20,7 @@ from typing import Dict, Any
 # Import barcode scanner
 try:
     from barcode_scanner import create_scanner
+    from upstream_http import UPSTREAM_HTTP
     BARCODE_SCANNER_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️  Barcode scanner not available: {e}")
@@ -276,7 +277,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
                             image_data = image_field.file.read()
                             
                             # Scan barcode using Pixtral
-                            result = self.scanner.scan_barcode_from_image(image_data, product_type)
+                            result = UPSTREAM_HTTP.run_sync(self.scanner.scan_barcode_from_image(image_data, product_type))
                             self.send_json_response(result)
                             return
                     
@@ -305,7 +306,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
                             base64_image = base64_image.split(',')[1]
                         
                         # Scan barcode using Pixtral
-                        result = self.scanner.scan_barcode_from_base64(base64_image, product_type)
+                        result = UPSTREAM_HTTP.run_sync(self.scanner.scan_barcode_from_base64(base64_image, product_type))
                         self.send_json_response(result)
                     else:
                         self.send_json_response({
@@ -361,7 +362,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 
                 # Get sustainability information
                 print(f"🔍 Looking up sustainability info for {product_type} barcode: {barcode}")
-                sustainability_info = self.scanner._get_product_sustainability(barcode, product_type)
+                sustainability_info = UPSTREAM_HTTP.run_sync(self.scanner._get_product_sustainability(barcode, product_type))
                 print(f"📊 Sustainability result: {sustainability_info is not None}")
                 
                 if sustainability_info:
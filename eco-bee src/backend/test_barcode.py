@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from product_sustainability import create_sustainability_analyzer
+from upstream_http import UPSTREAM_HTTP
 
 def test_barcode_lookup(barcode):
     """Test barcode lookup"""
@@ -17,7 +18,7 @@ def test_barcode_lookup(barcode):
     
     # Test Open Food Facts first
     print("\n1. Testing Open Food Facts API...")
-    basic_info = analyzer._get_openfoodfacts_data(barcode)
+    basic_info = UPSTREAM_HTTP.run_sync(analyzer._get_openfoodfacts_data(barcode))
     if basic_info:
         print(f"✅ Found product in OpenFoodFacts: {basic_info['name']}")
         print(f"   Brand: {basic_info['brand']}")
@@ -29,7 +30,7 @@ def test_barcode_lookup(barcode):
     # Test UPC Item DB if not found
     if not basic_info:
         print("\n2. Testing UPCitemdb API...")
-        basic_info = analyzer._get_upcitemdb_data(barcode)
+        basic_info = UPSTREAM_HTTP.run_sync(analyzer._get_upcitemdb_data(barcode))
         if basic_info:
             print(f"✅ Found product in UPCitemdb: {basic_info['name']}")
             print(f"   Brand: {basic_info['brand']}")
@@ -39,7 +40,7 @@ def test_barcode_lookup(barcode):
     
     # Test full product info lookup
     print("\n3. Testing full product analysis...")
-    product_info = analyzer.get_product_info(barcode)
+    product_info = UPSTREAM_HTTP.run_sync(analyzer.get_product_info(barcode))
     if product_info:
         print(f"✅ Full analysis completed!")
         print(f"   Product: {product_info.name}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the NumPy batch scoring engine behind calculate_ecoscore
+Results must equal the original per-item path (score each item as a dict,
+average per boundary, weight into a composite) for every item and basket.
+/api/score is the batch scoring endpoint, so its responses are checked too.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from benchmark import generate_items
+from ecoscore import (FACTOR_TABLES, PLANETARY_BOUNDARIES, SCORE_CACHE, TYPE_MAPPING, calculate_ecoscore,
+                      calculate_ecoscores, score_item, score_items_matrix)
+from test_factor_index import reference_match
+
+POSITIVE_KEYWORDS = ['local', 'organic', 'recycled', 'sustainable', 'eco']
+NEGATIVE_KEYWORDS = ['fast', 'processed', 'imported', 'synthetic']
+
+MIXED_BASKET = [
+    {"type": "food", "category": "plant-based", "materials": ["local", "organic"]},
+    {"type": "meal", "category": "processed meat-heavy", "materials": []},
+    {"type": "clothing", "category": "fast fashion polyester", "materials": ["synthetic"]},
+    {"type": "transport", "category": "bike", "materials": []},
+    {"type": "travel", "category": "plane", "materials": ["imported"]},
+    {"type": "habit", "category": "zz-nothing", "materials": ["qq-nothing"]},
+    {"type": "unknown-type", "category": "", "materials": []},
+    {"type": "food", "category": "plant-based", "materials": ["local", "organic"]},
+]
+
+def reference_normalize(raw_score, boundary_key):
+    """normalize_boundary_score as computed from the boundary config on every call"""
+    boundary = PLANETARY_BOUNDARIES[boundary_key]
+    transgression_factor = raw_score / 100.0
+    if boundary.current_global_status > boundary.safe_operating_space:
+        global_transgression = (boundary.current_global_status - boundary.safe_operating_space) / boundary.safe_operating_space
+        normalized_score = min(100, transgression_factor * (50 + global_transgression * 50))
+    else:
+        normalized_score = min(50, transgression_factor * 50)
+    return max(0, min(100, normalized_score))
+
+def reference_score_item(item):
+    """score_item's boundary scores as the original dict-based implementation computed them"""
+    item_type = item.get('type', '').lower()
+    category = item.get('category', '').lower()
+    materials = item.get('materials', [])
+    factor_key = TYPE_MAPPING.get(item_type, 'lifestyle')
+    base_scores = reference_match(FACTOR_TABLES.get(factor_key, FACTOR_TABLES['lifestyle']), category, materials)
+    base_scores.pop('description', None)
+
+    lowered = [material.lower() for material in materials]
+    def mentions(keywords):
+        return any(keyword in category or any(keyword in material for material in lowered) for keyword in keywords)
+    if mentions(POSITIVE_KEYWORDS):
+        base_scores = {boundary: max(5, value * 0.8) for boundary, value in base_scores.items()}
+    if mentions(NEGATIVE_KEYWORDS):
+        base_scores = {boundary: min(95, value * 1.2) for boundary, value in base_scores.items()}
+
+    return {boundary: reference_normalize(base_scores.get(boundary, 50), boundary) for boundary in PLANETARY_BOUNDARIES}
+
+def reference_grade(composite_score):
+    for threshold, grade in ((20, "A+"), (30, "A"), (40, "B+"), (50, "B"), (60, "C+"), (70, "C"), (80, "D+"), (90, "D")):
+        if composite_score <= threshold:
+            return grade
+    return "F"
+
+def reference_ecoscore(items):
+    """Per-boundary averages, composite and grade the way calculate_ecoscore used to build them"""
+    scored = [reference_score_item(item) for item in items]
+    averages = {boundary: sum(scores[boundary] for scores in scored) / len(scored) for boundary in PLANETARY_BOUNDARIES}
+    composite_score = sum(averages[key] * config.weight for key, config in PLANETARY_BOUNDARIES.items())
+    composite_score /= sum(config.weight for config in PLANETARY_BOUNDARIES.values())
+    return scored, averages, round(composite_score, 1), reference_grade(composite_score)
+
+def workloads():
+    yield MIXED_BASKET
+    for distribution in ("hit", "partial", "miss"):
+        yield generate_items(300, distribution, seed=7)
+
+def test_items_match_per_item_path():
+    SCORE_CACHE.clear()
+    for items in workloads():
+        batch = score_items_matrix(items)
+        for item, scored in zip(items, batch.scored_items(items)):
+            expected = reference_score_item(item)
+            assert {boundary: scored[boundary] for boundary in expected} == pytest.approx(expected)
+            assert dict(score_item(item)) == dict(scored)
+
+def test_baskets_match_per_item_path():
+    for cold_cache in (True, False):
+        if cold_cache:
+            SCORE_CACHE.clear()
+        for items in workloads():
+            expected_items, averages, composite, grade = reference_ecoscore(items)
+            result = calculate_ecoscore(items)
+            assert result["per_boundary_averages"] == pytest.approx(averages)
+            assert result["composite"] == composite
+            assert result["grade"] == grade
+            for scored, expected in zip(result["items"], expected_items):
+                assert {boundary: scored[boundary] for boundary in expected} == pytest.approx(expected)
+
+def test_many_baskets_match_single_baskets():
+    baskets = [MIXED_BASKET[:cut] for cut in range(1, len(MIXED_BASKET) + 1)] + [generate_items(50, "partial", seed=3)]
+    for batched, basket in zip(calculate_ecoscores(baskets), baskets):
+        single = calculate_ecoscore(basket)
+        assert batched["per_boundary_averages"] == single["per_boundary_averages"]
+        assert (batched["composite"], batched["grade"]) == (single["composite"], single["grade"])
+        assert [dict(item) for item in batched["items"]] == [dict(item) for item in single["items"]]
+        assert batched["recommendations"] == single["recommendations"]
+
+def test_score_endpoint_scores_the_batch():
+    client = TestClient(app)
+    response = client.post("/api/score", json={"items": MIXED_BASKET})
+    assert response.status_code == 200
+    body = response.json()
+    _, averages, composite, grade = reference_ecoscore(MIXED_BASKET)
+    assert body["per_boundary_averages"] == pytest.approx(averages)
+    assert (body["composite"], body["grade"]) == (composite, grade)
+    assert len(body["items"]) == len(MIXED_BASKET)
+    assert body["items"][0]["ecoscore_details"]["factor_table_used"] == "food"
+
+def test_score_endpoint_sections_and_errors():
+    client = TestClient(app)
+    response = client.post("/api/score?fields=composite", json={"items": MIXED_BASKET})
+    assert response.status_code == 200
+    assert set(response.json()) == {"per_boundary_averages", "composite", "grade"}
+
+    assert client.post("/api/score", json={"items": []}).status_code == 400
+    assert client.post("/api/score", json={"items": MIXED_BASKET, "uncertainty": {"samples": 0}}).status_code == 400
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped binary factor table format
+A binary index must resolve every lookup to the same entry as the
+in-memory FactorIndex, with values equal up to float32 precision.
+"""
+
+import numpy as np
+import pytest
+
+from ecoscore import FACTOR_TABLES, TYPE_MAPPING, FactorIndex, build_scoring_model, calculate_ecoscore
+from factor_binary import open_binary_factor_index, write_factor_tables_binary
+from test_batch_scoring import MIXED_BASKET
+from test_factor_index import probe_queries
+
+EDGE_CASE_TABLES = {
+    "lifestyle": {
+        "beef": {"climate": 90, "biosphere": 80},
+        "beef-burger": {"climate": 70},
+        "bee": {"freshwater": 10, "description": "pollinator friendly"},
+        "empty": {},
+        "note": {"description": "text only"},
+        "café crème": {"climate": 12.5, "aerosols": 7},
+        "b": {"biogeochemical": 3},
+    },
+    "food": {},
+}
+
+def open_written(tables, tmp_path):
+    path = tmp_path / "factors.bin"
+    write_factor_tables_binary(tables, str(path))
+    return open_binary_factor_index(str(path))
+
+def without_descriptions(scores):
+    return {key: value for key, value in scores.items() if key != "description"}
+
+@pytest.mark.parametrize("tables", [FACTOR_TABLES, EDGE_CASE_TABLES], ids=["builtin", "edge_cases"])
+def test_lookups_match_in_memory_index(tables, tmp_path):
+    binary = open_written(tables, tmp_path)
+    index = FactorIndex(tables)
+    categories, materials_options = probe_queries(tables)
+    for factor_key in set(TYPE_MAPPING.values()) | set(tables):
+        table, expected_table = binary.table_for(factor_key), index.table_for(factor_key)
+        assert table.categories == expected_table.categories
+        np.testing.assert_allclose(table.matrix, expected_table.matrix, rtol=1e-6)
+        for category in categories:
+            for materials in materials_options:
+                assert table.match_position(category, materials) == expected_table.match_position(category, materials)
+                expected = without_descriptions(index.match(factor_key, category, materials))
+                assert binary.match(factor_key, category, materials) == pytest.approx(expected, rel=1e-6)
+
+def test_scores_match_in_memory_tables(tmp_path):
+    binary_model = build_scoring_model(factor_index=open_written(FACTOR_TABLES, tmp_path))
+    result = calculate_ecoscore(MIXED_BASKET, model=binary_model)
+    expected = calculate_ecoscore(MIXED_BASKET)
+    assert result["per_boundary_averages"] == pytest.approx(expected["per_boundary_averages"], rel=1e-6)
+    assert (result["composite"], result["grade"]) == (expected["composite"], expected["grade"])
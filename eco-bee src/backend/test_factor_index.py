@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled factor-table match index (FactorIndex)
+Every lookup must resolve to the entry the original linear scan in
+score_item picked: exact category, first partial match in table order,
+first matching material, then the table average.
+"""
+
+from ecoscore import FACTOR_TABLES, PLANETARY_BOUNDARIES, TYPE_MAPPING, FactorIndex
+
+def reference_match(factor_table, category, materials):
+    """Category matching as score_item did it before the index: a scan of the table per item"""
+    base_scores = {}
+    if category in factor_table:
+        base_scores = factor_table[category].copy()
+    else:
+        for table_category, scores in factor_table.items():
+            if category in table_category or table_category in category:
+                base_scores = scores.copy()
+                break
+        if not base_scores and materials:
+            for material in materials:
+                material_lower = material.lower()
+                for table_category, scores in factor_table.items():
+                    if material_lower in table_category or table_category in material_lower:
+                        base_scores = scores.copy()
+                        break
+                if base_scores:
+                    break
+
+    if not base_scores:
+        all_scores = [scores for scores in factor_table.values() if isinstance(scores, dict)]
+        if all_scores:
+            base_scores = {}
+            for boundary in PLANETARY_BOUNDARIES.keys():
+                boundary_scores = [scores.get(boundary, 50) for scores in all_scores if boundary in scores]
+                base_scores[boundary] = sum(boundary_scores) / len(boundary_scores) if boundary_scores else 50
+        else:
+            base_scores = {boundary: 50 for boundary in PLANETARY_BOUNDARIES.keys()}
+    return base_scores
+
+def probe_queries(tables):
+    """Categories and materials that exercise every matching branch"""
+    categories = ["", "x", "zzz-unknown", "organic beef burger with fries", "a"]
+    for table in tables.values():
+        for category in table:
+            categories += [category, category[1:], category[:-1], f"local {category}", f"{category} (imported)"]
+    materials = [[], ["zzz"], ["Cotton"], ["unknown", "POLYESTER"], ["bike", "car"], ["local", "organic"]]
+    return categories, materials
+
+def assert_index_matches_scan(tables):
+    index = FactorIndex(tables)
+    categories, materials_options = probe_queries(tables)
+    for factor_key in set(TYPE_MAPPING.values()) | set(tables):
+        factor_table = tables.get(factor_key, tables.get('lifestyle', {}))
+        for category in categories:
+            for materials in materials_options:
+                expected = reference_match(factor_table, category, materials)
+                assert index.match(factor_key, category, materials) == expected, (factor_key, category, materials)
+
+def test_matches_linear_scan_on_builtin_tables():
+    assert_index_matches_scan(FACTOR_TABLES)
+
+def test_matches_linear_scan_on_edge_case_tables():
+    tables = {
+        "lifestyle": {
+            "beef": {"climate": 90, "biosphere": 80},
+            "beef-burger": {"climate": 70},
+            "bee": {"freshwater": 10, "description": "pollinator friendly"},
+            "empty": {},
+            "ab": {"climate": 1, "aerosols": 2},
+            "b": {"biogeochemical": 3},
+        },
+        "food": {},
+    }
+    assert_index_matches_scan(tables)
+
+def test_compiled_matrix_rows_follow_table_order():
+    index = FactorIndex(FACTOR_TABLES)
+    for factor_key, table in FACTOR_TABLES.items():
+        compiled = index.table_for(factor_key)
+        assert compiled.categories == list(table)
+        for position, scores in enumerate(table.values()):
+            for column, boundary in enumerate(compiled.boundary_keys):
+                if boundary in scores:
+                    assert compiled.matrix[position, column] == scores[boundary]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for hot-reloading factor tables (FactorTableRegistry)
+Polls are driven explicitly with check_now() against a CSV directory under
+tmp_path; the factor index active before each test is restored after it.
+"""
+
+import copy
+import os
+
+import pytest
+
+import ecoscore
+from ecoscore import (
+    FACTOR_TABLES, SCORE_CACHE, activate_factor_index, calculate_ecoscore, get_scoring_model,
+    item_signature, save_factor_tables_to_csv, score_item
+)
+from factor_registry import FactorTableRegistry
+
+ITEM = {"type": "food", "category": "plant-based", "materials": []}
+
+@pytest.fixture
+def registry(tmp_path):
+    original = ecoscore.FACTOR_INDEX
+    save_factor_tables_to_csv(FACTOR_TABLES, tmp_path)
+    yield FactorTableRegistry(str(tmp_path))
+    activate_factor_index(original)
+
+def edit_food_table(directory, climate, revision):
+    """Rewrite food.csv with a new plant-based climate factor and a distinct mtime"""
+    tables = {"food": copy.deepcopy(FACTOR_TABLES["food"])}
+    tables["food"]["plant-based"]["climate"] = climate
+    save_factor_tables_to_csv(tables, directory)
+    stamp = 1_900_000_000 + revision
+    os.utime(directory / "food.csv", (stamp, stamp))
+
+def is_cached(item):
+    return SCORE_CACHE.get(item_signature(item), SCORE_CACHE.sync(get_scoring_model())) is not None
+
+def test_edits_are_picked_up_after_one_stable_poll(registry):
+    assert registry.load()
+    assert registry.version == 1
+    assert set(registry.status()["tables"]) == set(FACTOR_TABLES)
+    assert calculate_ecoscore([ITEM])["methodology"]["factor_tables_version"] == 1
+    before = score_item(ITEM)["climate"]
+    assert is_cached(ITEM)
+
+    edit_food_table(registry.directory, 95, revision=1)
+    assert not registry.check_now()  # seen for the first time, may still be mid-write
+    assert registry.version == 1
+    assert score_item(ITEM)["climate"] == before
+
+    assert registry.check_now()
+    assert registry.version == 2
+    assert not is_cached(ITEM)
+    assert score_item(ITEM)["climate"] > before
+    assert calculate_ecoscore([ITEM])["methodology"]["factor_tables_version"] == 2
+    assert not registry.check_now()  # nothing changed since
+
+def test_malformed_csv_keeps_the_last_good_revision(registry):
+    registry.load()
+    edit_food_table(registry.directory, 95, revision=1)
+    registry.check_now()
+    registry.check_now()
+    good = score_item(ITEM)["climate"]
+
+    with open(registry.directory / "food.csv", 'a', encoding='utf-8') as f:
+        f.write("broken,not-a-number,1,1,1,1,oops\n")
+    os.utime(registry.directory / "food.csv", (1_900_000_100, 1_900_000_100))
+    registry.check_now()
+    assert not registry.check_now()
+
+    assert registry.version == 2
+    assert "food.csv" in registry.status()["last_error"]
+    assert score_item(ITEM)["climate"] == good
+    assert calculate_ecoscore([ITEM])["methodology"]["factor_tables_version"] == 2
+
+    # A fixed file is picked up again
+    edit_food_table(registry.directory, 12, revision=2)
+    registry.check_now()
+    assert registry.check_now()
+    assert registry.version == 3
+    assert registry.status()["last_error"] is None
+
+def test_removed_tables_are_dropped(registry):
+    registry.load()
+    (registry.directory / "career.csv").unlink()
+    assert registry.check_now()
+    assert "career" not in registry.status()["tables"]
+    assert registry.version == 2
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming batch intake endpoint (/api/intake/batch)
+Every NDJSON line must carry the same scoring result /api/intake gives for
+that intake, in request order, with invalid intakes failing only their
+own line.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from app import app
+
+def quiz(food, transport):
+    return [
+        {"question_id": "food_today", "question_text": "What did you eat today?", "answer": food, "category": "food"},
+        {"question_id": "transport_today", "question_text": "How did you travel?", "answer": transport,
+         "category": "transport"},
+    ]
+
+INTAKES = [
+    {"quiz_responses": quiz("plant-based", "bike"),
+     "items": [{"type": "food", "category": "vegan", "materials": ["local"]}]},
+    {"quiz_responses": quiz("meat-heavy", "car")},
+    {"quiz_responses": quiz("mixed", "public"),
+     "items": [{"type": "clothing", "category": "fast fashion", "materials": ["polyester"]},
+               {"type": "transport", "category": "plane"}]},
+    {"quiz_responses": quiz("packaged", "walk")},
+]
+
+def read_lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_lines_match_single_intakes():
+    client = TestClient(app)
+    lines = read_lines(client.post("/api/intake/batch", json=INTAKES))
+    *results, summary = lines
+    assert summary["summary"]["total"] == len(INTAKES)
+    assert (summary["summary"]["succeeded"], summary["summary"]["failed"]) == (len(INTAKES), 0)
+
+    assert [line["index"] for line in results] == list(range(len(INTAKES)))
+    for intake, line in zip(INTAKES, results):
+        assert line["status"] == "ok"
+        single = client.post("/api/intake", json=intake).json()
+        assert line["response"]["scoring_result"] == single["scoring_result"]
+        assert line["response"]["session_id"] == line["session_id"]
+
+def test_invalid_intakes_fail_their_own_line(monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_CHUNK_SIZE", 2)
+    client = TestClient(app)
+    entries = [INTAKES[0], "not an intake", {"items": 5}, INTAKES[1], {"quiz_responses": [], "session_id": "s-1"}]
+    *results, summary = read_lines(client.post("/api/intake/batch", json={"intakes": entries}))
+
+    assert [line["index"] for line in results] == list(range(len(entries)))
+    assert [line["status"] for line in results] == ["ok", "error", "error", "ok", "ok"]
+    assert results[1]["error"] == results[2]["error"] == "validation_error"
+    assert results[4]["session_id"] == "s-1"
+    assert (summary["summary"]["succeeded"], summary["summary"]["failed"]) == (3, 2)
+
+def test_batch_limits(monkeypatch):
+    client = TestClient(app)
+    assert client.post("/api/intake/batch", content=b"{not json").status_code == 400
+    assert client.post("/api/intake/batch", json={"intake": INTAKES}).status_code == 400
+
+    monkeypatch.setattr(app_module, "BATCH_MAX_INTAKES", 3)
+    assert client.post("/api/intake/batch", json=INTAKES).status_code == 413
+    monkeypatch.setattr(app_module, "BATCH_MAX_INTAKES", 100)
+    monkeypatch.setattr(app_module, "BATCH_MAX_ITEMS", 2)
+    assert client.post("/api/intake/batch", json=INTAKES).status_code == 413
+    monkeypatch.setattr(app_module, "BATCH_MAX_BYTES", 64)
+    assert client.post("/api/intake/batch", json=INTAKES[:1]).status_code == 413
+
+@pytest.mark.parametrize("entries", [[], [INTAKES[1]]])
+def test_small_batches(entries):
+    client = TestClient(app)
+    lines = read_lines(client.post("/api/intake/batch", json=entries))
+    assert len(lines) == len(entries) + 1
+    assert lines[-1]["summary"]["total"] == len(entries)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics registry and the /metrics endpoint
+Metrics are process-wide, so endpoint checks compare samples before and
+after the requests they make.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from metrics import MetricsRegistry, track_upstream
+
+def parse_samples(text):
+    """Sample line (name and labels) -> value, skipping comments"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return samples
+
+def scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return parse_samples(response.text)
+
+def test_registry_renders_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests", ("route",))
+    in_flight = registry.gauge("demo_in_flight", "In flight").labels()
+    latency = registry.histogram("demo_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    in_flight.inc()
+    for value in (0.05, 0.5, 5.0):
+        latency.labels().observe(value)
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert "# TYPE demo_seconds histogram" in text
+    samples = parse_samples(text)
+    assert samples['demo_requests_total{route="/a\\"b"}'] == 3
+    assert samples["demo_in_flight"] == 1
+    assert samples['demo_seconds_bucket{le="0.1"}'] == 1
+    assert samples['demo_seconds_bucket{le="1.0"}'] == 2
+    assert samples['demo_seconds_bucket{le="+Inf"}'] == 3
+    assert samples["demo_seconds_count"] == 3
+    assert samples["demo_seconds_sum"] == pytest.approx(5.55)
+
+def test_track_upstream_counts_outcomes():
+    client = TestClient(app)
+    before = scrape(client)
+    with track_upstream("test-upstream") as call:
+        call.status = 200
+    with track_upstream("test-upstream") as call:
+        call.status = 503
+    with pytest.raises(RuntimeError):
+        with track_upstream("test-upstream"):
+            raise RuntimeError("connection reset")
+    after = scrape(client)
+
+    def delta(sample):
+        return after.get(sample, 0) - before.get(sample, 0)
+
+    assert delta('ecobee_upstream_requests_total{upstream="test-upstream",outcome="2xx"}') == 1
+    assert delta('ecobee_upstream_requests_total{upstream="test-upstream",outcome="5xx"}') == 1
+    assert delta('ecobee_upstream_requests_total{upstream="test-upstream",outcome="exception"}') == 1
+    assert delta('ecobee_upstream_errors_total{upstream="test-upstream"}') == 2
+    assert delta('ecobee_upstream_request_duration_seconds_count{upstream="test-upstream"}') == 3
+    assert after['ecobee_upstream_requests_in_flight{upstream="test-upstream"}'] == 0
+
+def test_metrics_endpoint_records_requests_by_route():
+    client = TestClient(app)
+    before = scrape(client)
+    item = {"type": "food", "category": "plant-based", "materials": []}
+    for _ in range(3):
+        assert client.post("/api/score", json={"items": [item]}).status_code == 200
+    assert client.post("/api/score", json={"items": []}).status_code == 400
+    assert client.get("/api/actions/no-such-action").status_code == 404
+    after = scrape(client)
+
+    def delta(sample):
+        return after.get(sample, 0) - before.get(sample, 0)
+
+    assert delta('ecobee_http_requests_total{method="POST",route="/api/score",status="200"}') == 3
+    assert delta('ecobee_http_requests_total{method="POST",route="/api/score",status="400"}') == 1
+    # Unmatched path parameters are reported by route template, not by raw path
+    assert delta('ecobee_http_requests_total{method="GET",route="/api/actions/{action_id}",status="404"}') == 1
+    assert delta('ecobee_http_request_duration_seconds_count{method="POST",route="/api/score"}') == 4
+    assert delta('ecobee_http_request_errors_total{method="POST",route="/api/score"}') == 0
+    assert 'ecobee_cache_hit_ratio{cache="score"}' in after
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled contextual modifier vocabularies (ModifierMatcher)
+classify() must agree with the original keyword-by-keyword substring loop
+over the category and each material.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from ecoscore import MODIFIER_KEYWORDS_FILE, ModifierMatcher, load_modifier_keywords
+
+def reference_hit(keywords, category, materials):
+    """The baseline check: any keyword in the category or in any material"""
+    return any(keyword in category or any(keyword in material for material in materials) for keyword in keywords)
+
+def reference_classify(positive, negative, category, materials):
+    positive = [keyword.lower() for keyword in positive]
+    negative = [keyword.lower() for keyword in negative]
+    return reference_hit(positive, category, materials), reference_hit(negative, category, materials)
+
+VOCABULARIES = [
+    # Shipped vocabulary file
+    None,
+    # Overlapping and prefix keywords, shared between the two lists
+    (["eco", "ecology", "co", "local", "locally", "Organic"], ["fast", "fast food", "st", "local"]),
+    # Regex metacharacters are plain text
+    (["c++", "a.b", "(re)used"], ["*", "x|y"]),
+    # Empty vocabularies never match
+    ([], ["imported"]),
+]
+
+FRAGMENTS = ["", "eco", "ecol", "ecology", "co", "c", "o", "local", "loc", "ally", "fast", "fas", "t food", "st",
+             "organic", "processed", "imported", "synthetic", "recycled", "c++", "a.b", "axb", "(re)used", "*",
+             "x|y", "xy", "plant-based", "bike", " "]
+
+def probes(seed=11, count=400):
+    """(category, materials) pairs built from keyword fragments, so partial and spanning matches occur"""
+    rng = random.Random(seed)
+    cases = [("", []), ("eco", []), ("", ["eco"]), ("ec", ["o"]), ("fas", ["t food"]), ("lo", ["cal", "ly"])]
+    for _ in range(count):
+        category = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 3)))
+        materials = ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 2))) for _ in range(rng.randint(0, 3))]
+        cases.append((category, materials))
+    return cases
+
+def matcher_for(vocabulary):
+    if vocabulary is None:
+        return load_modifier_keywords(MODIFIER_KEYWORDS_FILE)
+    return ModifierMatcher(*vocabulary)
+
+@pytest.mark.parametrize("vocabulary", VOCABULARIES)
+def test_classify_matches_keyword_loop(vocabulary):
+    matcher = matcher_for(vocabulary)
+    for category, materials in probes():
+        expected = reference_classify(matcher.positive_keywords, matcher.negative_keywords, category, materials)
+        assert matcher.classify(category, materials) == expected, (category, materials)
+
+def test_keywords_do_not_match_across_fields():
+    matcher = ModifierMatcher(["eco"], ["fast food"])
+    assert matcher.classify("ec", ["o"]) == (False, False)
+    assert matcher.classify("fast", ["food"]) == (False, False)
+    assert matcher.classify("fast food", ["eco"]) == (True, True)
+
+def test_multiple_hits_in_both_vocabularies():
+    matcher = load_modifier_keywords(MODIFIER_KEYWORDS_FILE)
+    for category, materials in [("local organic processed", []), ("fast fashion", ["recycled", "synthetic"]),
+                                ("imported", ["eco", "sustainable"])]:
+        assert matcher.classify(category, materials) == (True, True)
+    assert matcher.classify("plant-based", ["cotton"]) == (False, False)
+
+def test_shipped_vocabulary_matches_baseline_lists():
+    matcher = load_modifier_keywords(MODIFIER_KEYWORDS_FILE)
+    assert set(matcher.positive_keywords) == {"local", "organic", "recycled", "sustainable", "eco"}
+    assert set(matcher.negative_keywords) == {"fast", "processed", "imported", "synthetic"}
+    for positive, negative in itertools.product(matcher.positive_keywords, matcher.negative_keywords):
+        assert matcher.classify(f"x{positive}x", [negative]) == (True, True)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the table-driven quiz scoring engine
+The compiled rule table must reproduce the original hard-coded quiz rules,
+and cohort scoring must equal scoring each respondent on their own.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark import generate_quiz_cohort
+from ecoscore import (PLANETARY_BOUNDARIES, QuizRuleTable, calculate_ecoscore_from_quiz_responses,
+                      calculate_ecoscores_from_quiz_cohort, score_quiz_cohort)
+from test_batch_scoring import reference_grade
+
+def reference_quiz_scores(answers):
+    """Boundary scores from the hard-coded rules quiz scoring used before the rule table"""
+    scores = {boundary: 50.0 for boundary in PLANETARY_BOUNDARIES}
+    food = answers.get("food_today")
+    if food == "plant-based":
+        scores["climate"] = max(15, scores["climate"] - 30)
+        scores["biosphere"] = max(20, scores["biosphere"] - 25)
+        scores["biogeochemical"] = max(25, scores["biogeochemical"] - 20)
+    elif food == "mixed":
+        scores["climate"] = max(25, scores["climate"] - 15)
+        scores["biosphere"] = max(30, scores["biosphere"] - 10)
+    elif food == "meat-heavy":
+        scores["climate"] = min(85, scores["climate"] + 25)
+        scores["biosphere"] = min(80, scores["biosphere"] + 20)
+        scores["biogeochemical"] = min(85, scores["biogeochemical"] + 25)
+    elif food == "packaged":
+        scores["climate"] = min(75, scores["climate"] + 15)
+        scores["aerosols"] = min(75, scores["aerosols"] + 20)
+
+    transport = answers.get("transport_today")
+    if transport in ["walk", "bike"]:
+        scores["climate"] = max(10, scores["climate"] - 35)
+        scores["aerosols"] = max(15, scores["aerosols"] - 30)
+    elif transport == "public":
+        scores["climate"] = max(25, scores["climate"] - 15)
+        scores["aerosols"] = max(30, scores["aerosols"] - 15)
+    elif transport == "electric":
+        scores["climate"] = max(30, scores["climate"] - 10)
+    elif transport == "car":
+        scores["climate"] = min(85, scores["climate"] + 30)
+        scores["aerosols"] = min(80, scores["aerosols"] + 25)
+
+    distance = answers.get("distance_traveled")
+    if distance == "5_20km":
+        scores["climate"] = min(80, scores["climate"] + 10)
+    elif distance == "20_50km":
+        scores["climate"] = min(85, scores["climate"] + 20)
+    elif distance == "over_50km":
+        scores["climate"] = min(90, scores["climate"] + 30)
+
+    if "water_usage" in answers:
+        try:
+            water_rating = int(answers["water_usage"])
+            if water_rating <= 2:
+                scores["freshwater"] = max(20, scores["freshwater"] - 25)
+            elif water_rating == 3:
+                scores["freshwater"] = max(35, scores["freshwater"] - 10)
+            elif water_rating >= 4:
+                scores["freshwater"] = min(75, scores["freshwater"] + 20)
+        except (ValueError, TypeError):
+            pass
+
+    waste_actions = answers.get("waste_reduction")
+    if isinstance(waste_actions, list):
+        reduction_factor = len(waste_actions) * 5
+        scores["aerosols"] = max(20, scores["aerosols"] - reduction_factor)
+        scores["biogeochemical"] = max(25, scores["biogeochemical"] - reduction_factor)
+    return scores
+
+EDGE_CASES = [
+    [],
+    [{"question_id": "water_usage", "answer": "not a number"}],
+    [{"question_id": "water_usage", "answer": None}],
+    [{"question_id": "water_usage", "answer": 0}, {"question_id": "distance_traveled", "answer": "under_5km"}],
+    [{"question_id": "waste_reduction", "answer": "recycling"}],
+    [{"question_id": "waste_reduction", "answer": ["a"] * 12}],
+    [{"question_id": "food_today", "answer": ["plant-based"]}, {"question_id": "transport_today", "answer": "walk"}],
+    [{"question_id": "unknown", "answer": "x"}, {"question_id": "transport_today", "answer": "bike"}],
+]
+
+def cohort():
+    return generate_quiz_cohort(300, seed=11) + EDGE_CASES
+
+def as_objects(responses):
+    return [SimpleNamespace(**response) for response in responses]
+
+def test_single_respondent_matches_hard_coded_rules():
+    for responses in cohort():
+        expected = reference_quiz_scores({response["question_id"]: response["answer"] for response in responses})
+        composite_score = sum(expected[key] * config.weight for key, config in PLANETARY_BOUNDARIES.items())
+        for form in (responses, as_objects(responses)):
+            result = calculate_ecoscore_from_quiz_responses(form)
+            assert result["per_boundary_averages"] == pytest.approx(expected)
+            assert result["composite"] == round(composite_score, 1)
+            assert result["grade"] == reference_grade(composite_score)
+
+def test_cohort_matches_single_respondents():
+    respondents = cohort()
+    scores = score_quiz_cohort(respondents)
+    results = calculate_ecoscores_from_quiz_cohort(respondents)
+    for row, (responses, result) in enumerate(zip(respondents, results)):
+        single = calculate_ecoscore_from_quiz_responses(responses)
+        assert scores.per_boundary_scores(row) == single["per_boundary_averages"]
+        assert result["per_boundary_averages"] == single["per_boundary_averages"]
+        assert (result["composite"], result["grade"]) == (single["composite"], single["grade"])
+        assert result["recommendations"] == single["recommendations"]
+
+def test_custom_rule_table():
+    rules = QuizRuleTable({
+        "base_score": 40.0,
+        "questions": [
+            {"question_id": "meals", "kind": "choice",
+             "answers": {"vegan": {"climate": {"delta": -50, "floor": 5}}}},
+            {"question_id": "showers", "kind": "rating",
+             "ranges": [{"max": 2, "effects": {"freshwater": {"delta": -10, "floor": 0}}}]},
+        ]
+    })
+    result = calculate_ecoscore_from_quiz_responses(
+        [{"question_id": "meals", "answer": "vegan"}, {"question_id": "showers", "answer": "1"}], rules=rules
+    )
+    assert result["per_boundary_averages"]["climate"] == 5.0
+    assert result["per_boundary_averages"]["freshwater"] == 30.0
+    assert result["per_boundary_averages"]["aerosols"] == 40.0
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled recommendation templates (RecommendationIndex)
+generate_recommendations must pick what the original per-call selection
+(substring filters over template actions) picked, for every boundary
+ordering and mix of item types.
+"""
+
+import itertools
+import json
+
+import pytest
+
+from ecoscore import (
+    PLANETARY_BOUNDARIES, RECOMMENDATION_TEMPLATES_FILE, RecommendationIndex, generate_recommendations
+)
+
+with open(RECOMMENDATION_TEMPLATES_FILE, 'r', encoding='utf-8') as f:
+    SPEC = json.load(f)
+
+# Templates as the baseline held them, without the context annotations
+TEMPLATES = {
+    boundary_key: [{key: value for key, value in template.items() if key != "contexts"} for template in templates]
+    for boundary_key, templates in SPEC["templates"].items()
+}
+
+def reference_select(templates, items):
+    """The baseline select_contextual_recommendation"""
+    item_types = [item.get('type', '').lower() for item in items]
+    if 'food' in item_types or 'meal' in item_types:
+        matches = [r for r in templates if 'meal' in r['action'] or 'food' in r['action'] or 'meat' in r['action']]
+        if matches:
+            return matches[0]
+    if 'clothing' in item_types or 'outfit' in item_types:
+        matches = [r for r in templates if 'clothing' in r['action'] or 'second-hand' in r['action']]
+        if matches:
+            return matches[0]
+    if 'transport' in item_types or 'mobility' in item_types:
+        matches = [r for r in templates if 'transport' in r['action'] or 'bike' in r['action']]
+        if matches:
+            return matches[0]
+    return templates[0]
+
+def reference_recommendations(boundary_scores, items):
+    """The baseline generate_recommendations"""
+    recommendations = []
+    for boundary_key, score in sorted(boundary_scores.items(), key=lambda x: x[1], reverse=True)[:3]:
+        if score > 40:
+            templates = TEMPLATES.get(boundary_key, [])
+            if templates:
+                selected = reference_select(templates, items)
+                recommendations.append({
+                    "action": selected["action"],
+                    "impact": selected["impact"],
+                    "boundary": PLANETARY_BOUNDARIES[boundary_key].name,
+                    "current_score": round(score, 1),
+                    "difficulty": selected["difficulty"],
+                    "category": boundary_key
+                })
+    return recommendations[:5]
+
+ITEM_TYPES = ["food", "Meal", "clothing", "outfit", "transport", "mobility", "travel", "habit"]
+SCORE_PATTERNS = [(90, 70, 45, 30, 10), (55, 41, 40, 39.95, 20), (60, 60, 60, 60, 60), (30, 20, 10, 5, 0)]
+
+def item_mixes():
+    for size in range(4):
+        for types in itertools.combinations(ITEM_TYPES, size):
+            yield [{"type": item_type, "category": "x"} for item_type in types]
+
+def test_every_boundary_has_templates():
+    assert set(TEMPLATES) == set(PLANETARY_BOUNDARIES)
+    assert all(TEMPLATES.values())
+
+@pytest.mark.parametrize("pattern", SCORE_PATTERNS)
+def test_selection_matches_baseline(pattern):
+    index = RecommendationIndex(SPEC)
+    mixes = list(item_mixes())
+    for ordering in itertools.permutations(PLANETARY_BOUNDARIES):
+        boundary_scores = dict(zip(ordering, pattern))
+        for items in mixes:
+            expected = reference_recommendations(boundary_scores, items)
+            assert generate_recommendations(boundary_scores, items, index=index) == expected, (ordering, items)
+            contexts = index.classify(items)
+            assert generate_recommendations(boundary_scores, [], index=index, contexts=contexts) == expected
+
+def test_classify_follows_context_priority():
+    index = RecommendationIndex(SPEC)
+    assert index.classify([{"type": "Mobility"}, {"type": "outfit"}, {"type": "meal"}]) == \
+        ("food", "clothing", "transport")
+    assert index.classify([{"type": "habit"}, {}]) == ()
+
+def test_boundaries_without_templates_are_skipped():
+    index = RecommendationIndex({"context_classes": SPEC["context_classes"],
+                                 "templates": {"climate": SPEC["templates"]["climate"]}})
+    recommendations = generate_recommendations({"climate": 80, "freshwater": 90}, [{"type": "food"}], index=index)
+    assert [recommendation["category"] for recommendation in recommendations] == ["climate"]
+    assert recommendations[0]["action"] == reference_select(TEMPLATES["climate"], [{"type": "food"}])["action"]
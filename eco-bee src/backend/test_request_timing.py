@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request stage timing (TimingMiddleware, TimedRoute, span)
+A small app with its own RequestTiming checks the header and aggregates
+exactly; the EcoBee app is checked through its real routes.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import app
+from request_timing import REQUEST_TIMING, RequestTiming, TimedRoute, TimingMiddleware, span, timed
+
+def parse_server_timing(header):
+    """Stage name -> duration in ms"""
+    stages = {}
+    for entry in header.split(", "):
+        name, duration = entry.split(";dur=")
+        stages[name] = float(duration)
+    return stages
+
+@timed("lookup")
+def lookup():
+    return 1
+
+def demo_app(timing):
+    demo = FastAPI()
+    demo.router.route_class = TimedRoute
+    demo.add_middleware(TimingMiddleware, timing=timing)
+
+    @demo.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        with span("load"):
+            value = lookup()
+        with span("load"):
+            value += lookup()
+        return {"item_id": item_id, "value": value}
+
+    return demo
+
+def test_header_lists_handler_and_span_stages():
+    timing = RequestTiming()
+    response = TestClient(demo_app(timing)).get("/items/a")
+    assert response.status_code == 200
+    stages = parse_server_timing(response.headers["server-timing"])
+    assert list(stages) == ["lookup", "load", "handler", "total"]
+    assert all(duration >= 0 for duration in stages.values())
+    # Repeated stages are summed; the handler encloses its spans and the total encloses the handler
+    assert stages["load"] <= stages["handler"] <= stages["total"]
+
+def test_timings_are_aggregated_by_route_template():
+    timing = RequestTiming()
+    client = TestClient(demo_app(timing))
+    for item_id in ("a", "b", "c"):
+        client.get(f"/items/{item_id}")
+    assert client.get("/missing").status_code == 404
+
+    routes = timing.snapshot()["routes"]
+    stages = routes["GET /items/{item_id}"]
+    assert stages["handler"]["count"] == stages["total"]["count"] == 3
+    assert stages["load"]["count"] == 6
+    assert stages["total"]["max_ms"] <= stages["total"]["total_ms"]
+    assert routes["GET unmatched"]["total"]["count"] == 1
+
+    timing.reset()
+    assert timing.snapshot()["routes"] == {}
+
+def test_disabled_timing_sends_no_header():
+    timing = RequestTiming(enabled=False)
+    response = TestClient(demo_app(timing)).get("/items/a")
+    assert response.json() == {"item_id": "a", "value": 2}
+    assert "server-timing" not in response.headers
+    assert timing.snapshot()["routes"] == {}
+
+def test_app_reports_intake_stages_and_timings():
+    client = TestClient(app)
+    assert client.delete("/api/timings").json() == {"status": "reset"}
+    intake = {"quiz_responses": [{"question_id": "food_today", "question_text": "What did you eat today?",
+                                  "answer": "plant-based", "category": "food"}],
+              "items": [{"type": "food", "category": "vegan", "materials": []}]}
+    response = client.post("/api/intake", json=intake)
+    assert response.status_code == 200
+    stages = parse_server_timing(response.headers["server-timing"])
+    assert {"read_body", "json_decode", "validate", "score", "scoring_result", "handler", "total"} <= set(stages)
+
+    snapshot = client.get("/api/timings").json()
+    assert snapshot["enabled"] is True
+    assert snapshot["routes"]["POST /api/intake"]["score"]["count"] == 1
+    assert snapshot["routes"]["POST /api/intake"]["total"]["count"] == 1
+
+def test_app_timing_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(REQUEST_TIMING, "enabled", False)
+    response = TestClient(app).get("/api/boundaries")
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+def test_environment_switch_disables_timing():
+    script = (
+        "from fastapi.testclient import TestClient\n"
+        "from app import app\n"
+        "response = TestClient(app).get('/api/boundaries')\n"
+        "assert response.status_code == 200\n"
+        "print('HEADER', 'server-timing' in response.headers)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).parent, capture_output=True, text=True,
+        env=dict(os.environ, ECOBEE_TIMING="0"), timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert "HEADER False" in result.stdout
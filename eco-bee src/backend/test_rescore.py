@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk re-scoring of intake archives (rescore.score_chunk)
+"""
+
+import json
+
+from ecoscore import calculate_ecoscore, get_scoring_model
+from rescore import plan_chunks, score_chunk
+
+def write_archive(tmp_path, lines):
+    path = tmp_path / "intake.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_malformed_records_are_counted_not_fatal(tmp_path, capsys):
+    basket = [{"type": "food", "category": "plant-based", "materials": ["local"]}]
+    lines = [
+        json.dumps({"session_id": "a", "items": basket}),
+        '"foo"',
+        "[1]",
+        "{broken",
+        json.dumps({"session_id": "b", "items": [{"type": "food", "materials": "cotton"}]}),
+        json.dumps({"session_id": "c", "type": "food", "materials": None}),
+        json.dumps({"session_id": "d", "items": [{"type": "food", "category": "plant-based", "materials": None}]}),
+        json.dumps({"session_id": "e", "items": [], "quiz_responses": ["x"]}),
+        json.dumps({"session_id": "f", "items": "abc"}),
+        json.dumps({"session_id": "g", "quiz_responses": [{"question_id": "food_today", "answer": "plant-based"}]}),
+    ]
+    chunks = list(plan_chunks([write_archive(tmp_path, lines)], chunk_size=100))
+    assert len(chunks) == 1
+    result = score_chunk(chunks[0], get_scoring_model())
+
+    assert result["errors"] == 7
+    columns = result["columns"]
+    assert columns["session_id"].tolist() == ["a", "d", "g"]
+    assert columns["line"].tolist() == [1, 7, 10]
+    assert columns["composite"][0] == calculate_ecoscore(basket)["composite"]
+    assert capsys.readouterr().err.count("Skipping invalid record") == 7
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for ETag/304 revalidation and the in-process response cache
+"""
+
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import response_cache
+from app import app
+from ecoscore import PLANETARY_BOUNDARIES
+from recommender import recommender
+from response_cache import ResponseCache, etag_matches, strong_etag
+
+def test_etag_matching():
+    etag = strong_etag(b'{"a": 1}')
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != strong_etag(b'{"a": 2}')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+class FakeRequest:
+    def __init__(self, if_none_match=None):
+        self.headers = {"if-none-match": if_none_match} if if_none_match else {}
+
+def test_cache_reuses_bodies_and_evicts_least_recent():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    builds = []
+    def build(value):
+        def run():
+            builds.append(value)
+            return {"value": value}
+        return run
+
+    first = cache.respond(FakeRequest(), "demo", 1, ("a",), build("a"))
+    assert cache.respond(FakeRequest(), "demo", 1, ("a",), build("a")).body == first.body
+    cache.respond(FakeRequest(), "demo", 1, ("b",), build("b"))
+    cache.respond(FakeRequest(), "demo", 1, ("a",), build("a"))
+    cache.respond(FakeRequest(), "demo", 1, ("c",), build("c"))  # evicts b, the least recently used
+    cache.respond(FakeRequest(), "demo", 1, ("b",), build("b"))
+    assert builds == ["a", "b", "c", "b"]
+    assert cache.stats()["evictions"] == 2
+
+    # A new data version is a different entry
+    cache.respond(FakeRequest(), "demo", 2, ("b",), build("b2"))
+    assert builds[-1] == "b2"
+
+def test_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(maxsize=8, ttl=10)
+    builds = []
+    def build():
+        builds.append(now[0])
+        return {"ok": True}
+    cache.respond(FakeRequest(), "demo", 1, (), build)
+    now[0] += 5
+    cache.respond(FakeRequest(), "demo", 1, (), build)
+    now[0] += 6
+    cache.respond(FakeRequest(), "demo", 1, (), build)
+    assert len(builds) == 2
+
+def test_build_errors_are_not_cached():
+    cache = ResponseCache()
+    def failing():
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        cache.respond(FakeRequest(), "demo", 1, (), failing)
+    assert cache.stats()["size"] == 0
+    assert cache.respond(FakeRequest(), "demo", 1, (), lambda: {"ok": True}).status_code == 200
+
+def test_endpoint_revalidation_returns_304():
+    client = TestClient(app)
+    response = client.get("/api/boundaries")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "public, max-age=300"
+
+    revalidated = client.get("/api/boundaries", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert client.get("/api/boundaries", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+def test_boundary_changes_invalidate_etag():
+    client = TestClient(app)
+    etag = client.get("/api/boundaries").headers["etag"]
+    original = PLANETARY_BOUNDARIES["climate"]
+    try:
+        PLANETARY_BOUNDARIES["climate"] = replace(original, weight=0.5)
+        response = client.get("/api/boundaries", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["boundaries"]["climate"]["weight"] == 0.5
+    finally:
+        PLANETARY_BOUNDARIES["climate"] = original
+    assert client.get("/api/boundaries", headers={"If-None-Match": etag}).status_code == 304
+
+def test_recommendations_cache_keys_on_parsed_values():
+    client = TestClient(app)
+    first = client.get("/api/recommendations?climate=80&freshwater=20")
+    same = client.get("/api/recommendations?freshwater=20.0&climate=80.0")
+    assert first.status_code == same.status_code == 200
+    assert first.headers["etag"] == same.headers["etag"]
+    assert client.get("/api/recommendations?climate=81&freshwater=20").headers["etag"] != first.headers["etag"]
+
+def test_data_updates_rebuild_bodies_with_content_etags():
+    client = TestClient(app)
+    action_id = next(iter(recommender.actions))
+    action_etag = client.get(f"/api/actions/{action_id}").headers["etag"]
+    resources_etag = client.get("/api/resources").headers["etag"]
+    assert client.get("/api/actions/no-such-action").status_code == 404
+
+    # A new version forces a rebuild; unchanged content keeps its ETag, so clients still get 304
+    misses = response_cache.RESPONSE_CACHE.misses
+    recommender.update_data(actions=dict(recommender.actions))
+    assert client.get(f"/api/actions/{action_id}", headers={"If-None-Match": action_etag}).status_code == 304
+    assert client.get("/api/resources", headers={"If-None-Match": resources_etag}).status_code == 304
+    assert response_cache.RESPONSE_CACHE.misses == misses + 2
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-scenario weighting (score_weight_scenarios, /api/score/scenarios)
+Each scheme must give the composite and grade of a model built with
+those weights.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from ecoscore import build_scoring_model, calculate_ecoscore, get_scoring_model, score_weight_scenarios
+from test_what_if import BASKET
+
+SCHEMES = [
+    {"climate": 1.0},
+    {"climate": 0.0, "biosphere": 0.0, "biogeochemical": 0.0, "freshwater": 1.0, "aerosols": 0.0},
+    {"climate": 0.4, "biosphere": 0.1, "biogeochemical": 0.1, "freshwater": 0.2, "aerosols": 0.2},
+]
+WEIGHT_MATRIX = [[0.2, 0.2, 0.2, 0.2, 0.2], [0.0, 0.0, 0.0, 0.0, 0.0]]
+
+def expected_scores(scheme):
+    result = calculate_ecoscore(BASKET, model=build_scoring_model(weights=scheme))
+    return result["composite"], result["grade"]
+
+def test_schemes_match_reweighted_models():
+    evaluation = score_weight_scenarios(BASKET, SCHEMES)
+    for scheme, composite_score, grade in zip(SCHEMES, evaluation["composites"].tolist(), evaluation["grades"]):
+        assert (round(composite_score, 1), grade) == expected_scores(scheme)
+    baseline = calculate_ecoscore(BASKET)
+    assert evaluation["baseline"] == {"composite": baseline["composite"], "grade": baseline["grade"]}
+
+def test_all_zero_weights_score_neutral():
+    evaluation = score_weight_scenarios(BASKET, WEIGHT_MATRIX)
+    assert evaluation["composites"].tolist()[1] == 50.0
+
+def test_scenarios_endpoint():
+    client = TestClient(app)
+    response = client.post("/api/score/scenarios", json={
+        "items": BASKET,
+        "schemes": [{"name": "climate_only", "weights": SCHEMES[0]}, {"weights": SCHEMES[2]}],
+        "weight_matrix": WEIGHT_MATRIX[:1]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [scenario["name"] for scenario in body["scenarios"]] == ["climate_only", "scheme_1", "matrix_0"]
+
+    equal_weights = dict(zip(get_scoring_model().boundary_keys, WEIGHT_MATRIX[0]))
+    for scenario, scheme in zip(body["scenarios"], [SCHEMES[0], SCHEMES[2], equal_weights]):
+        assert (scenario["composite"], scenario["grade"]) == expected_scores(scheme)
+    assert body["summary"]["schemes"] == 3
+    assert body["summary"]["composite_min"] == min(scenario["composite"] for scenario in body["scenarios"])
+    assert body["per_boundary_averages"] == pytest.approx(calculate_ecoscore(BASKET)["per_boundary_averages"])
+
+def test_scenarios_endpoint_rejects_bad_requests():
+    client = TestClient(app)
+    assert client.post("/api/score/scenarios", json={"items": BASKET}).status_code == 400
+    assert client.post("/api/score/scenarios", json={"items": [], "schemes": [{"weights": SCHEMES[0]}]}).status_code == 400
+    assert client.post("/api/score/scenarios", json={"items": BASKET, "weight_matrix": [[1.0, 2.0]]}).status_code == 400
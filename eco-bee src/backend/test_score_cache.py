@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-item score cache (ScoreCache, SCORE_CACHE)
+Counters, the LRU bound, and invalidation when the factor index or the
+boundary normalization behind the active model changes.
+"""
+
+import copy
+from dataclasses import replace
+
+import numpy as np
+
+import ecoscore
+from ecoscore import (
+    FACTOR_TABLES, PLANETARY_BOUNDARIES, SCORE_CACHE, CachedScore, FactorIndex, ScoreCache,
+    activate_factor_index, build_scoring_model, get_scoring_model, item_signature, score_item
+)
+
+ITEM = {"type": "food", "category": "plant-based", "materials": []}
+
+def entry(value):
+    return CachedScore(factor_key="food", raw_row=np.array([value]), normalized_row=np.array([value]))
+
+def test_counters_and_lru_bound():
+    cache = ScoreCache(maxsize=2)
+    generation = cache.sync(get_scoring_model())
+    assert cache.get(("a",), generation) is None
+    cache.put(("a",), entry(1), generation)
+    cache.put(("b",), entry(2), generation)
+    assert cache.get(("a",), generation).raw_row[0] == 1
+    cache.put(("c",), entry(3), generation)  # evicts b, the least recently used
+
+    assert cache.get(("b",), generation) is None
+    assert cache.get(("c",), generation).raw_row[0] == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 2, "evictions": 1, "hit_ratio": 0.5}
+
+def test_disabled_cache_stores_nothing():
+    cache = ScoreCache(maxsize=0)
+    generation = cache.sync(get_scoring_model())
+    cache.put(("a",), entry(1), generation)
+    assert cache.get(("a",), generation) is None
+    assert cache.stats()["size"] == 0
+
+def test_stale_generations_miss_and_are_dropped():
+    cache = ScoreCache()
+    old = cache.sync(get_scoring_model())
+    cache.put(("a",), entry(1), old)
+    new = cache.sync(build_scoring_model(factor_index=FactorIndex(FACTOR_TABLES)))
+    assert cache.stats()["size"] == 0
+
+    # A result computed under the replaced model must not land in the new generation
+    cache.put(("a",), entry(1), old)
+    assert cache.stats()["size"] == 0
+    assert cache.get(("a",), old) is None
+    cache.put(("a",), entry(2), new)
+    assert cache.get(("a",), new).raw_row[0] == 2
+    assert cache.get(("a",), old) is None
+
+def test_weight_only_models_share_entries():
+    cache = ScoreCache()
+    generation = cache.sync(get_scoring_model())
+    cache.put(("a",), entry(1), generation)
+    reweighted = build_scoring_model(weights={"climate": 0.9})
+    assert cache.get(("a",), cache.sync(reweighted)).raw_row[0] == 1
+
+def test_activating_a_factor_index_invalidates():
+    original = ecoscore.FACTOR_INDEX
+    before = score_item(ITEM)["climate"]
+    assert SCORE_CACHE.get(item_signature(ITEM), SCORE_CACHE.sync(get_scoring_model())) is not None
+
+    tables = copy.deepcopy(FACTOR_TABLES)
+    tables["food"]["plant-based"]["climate"] = 90
+    try:
+        activate_factor_index(FactorIndex(tables))
+        assert SCORE_CACHE.get(item_signature(ITEM), SCORE_CACHE.sync(get_scoring_model())) is None
+        assert score_item(ITEM)["climate"] > before
+    finally:
+        activate_factor_index(original)
+    assert score_item(ITEM)["climate"] == before
+
+def test_boundary_changes_invalidate():
+    before = score_item(ITEM)["climate"]
+    original = PLANETARY_BOUNDARIES["climate"]
+    try:
+        PLANETARY_BOUNDARIES["climate"] = replace(original, current_global_status=original.safe_operating_space * 3)
+        assert score_item(ITEM)["climate"] != before
+        assert SCORE_CACHE.stats()["size"] == 1
+    finally:
+        PLANETARY_BOUNDARIES["climate"] = original
+    assert score_item(ITEM)["climate"] == before
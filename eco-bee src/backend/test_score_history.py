@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for per-user score history and its rolling aggregates
+Window means and slopes are checked against a brute-force recomputation
+over the records each window covers. Every test writes to its own log
+under tmp_path, never to the real score_history.jsonl.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from app import app
+from product_database import product_db
+from score_history import ScoreHistory
+
+BOUNDARIES = ["climate", "freshwater"]
+START = datetime(2026, 1, 1, 9, 0)
+
+def records(count=60, seed=7):
+    """(timestamp, composite, boundary scores) at irregular intervals, some boundaries missing"""
+    rng = np.random.default_rng(seed)
+    timestamp = START
+    rows = []
+    for _ in range(count):
+        timestamp += timedelta(hours=float(rng.uniform(1, 60)))
+        boundaries = {"climate": round(float(rng.uniform(0, 100)), 2)}
+        if rng.random() < 0.7:
+            boundaries["freshwater"] = round(float(rng.uniform(0, 100)), 2)
+        rows.append((timestamp, round(float(rng.uniform(0, 100)), 2), boundaries))
+    return rows
+
+def brute_force_window(rows, days, now):
+    """Means and least-squares slopes (per day since the first record) of the records inside a window"""
+    origin = rows[0][0]
+    inside = [row for row in rows if row[0] >= now - timedelta(days=days)]
+    means, slopes = {}, {}
+    for name in ["composite"] + BOUNDARIES:
+        points = [((timestamp - origin).total_seconds() / 86400.0, composite if name == "composite" else scores[name])
+                  for timestamp, composite, scores in inside if name == "composite" or name in scores]
+        if not points:
+            means[name] = slopes[name] = None
+            continue
+        t, y = np.array(points).T
+        means[name] = round(float(y.mean()), 2)
+        slopes[name] = round(float(np.polyfit(t, y, 1)[0]), 3) if len(points) > 1 else None
+    return len(inside), means, slopes
+
+def filled(path, rows, user_id="u1"):
+    history = ScoreHistory(path, boundary_keys=BOUNDARIES)
+    for timestamp, composite, scores in rows:
+        history.record_score(user_id, composite, scores, timestamp=timestamp)
+    return history
+
+def assert_windows_match(history, rows, now):
+    aggregates = history.aggregates("u1", now=now)
+    for days in history.window_days:
+        window = aggregates["windows"][f"{days}d"]
+        count, means, slopes = brute_force_window(rows, days, now)
+        assert window["count"] == count
+        assert window["means"] == pytest.approx(means, abs=0.011)
+        for name, slope in slopes.items():
+            if slope is None:
+                assert window["slopes_per_day"][name] is None
+            else:
+                assert window["slopes_per_day"][name] == pytest.approx(slope, abs=0.002)
+
+def test_windows_match_brute_force(tmp_path):
+    rows = records()
+    history = ScoreHistory(tmp_path / "history.jsonl", boundary_keys=BOUNDARIES)
+    for position, (timestamp, composite, scores) in enumerate(rows):
+        history.record_score("u1", composite, scores, timestamp=timestamp)
+        if position % 10 == 9:
+            assert_windows_match(history, rows[:position + 1], timestamp)
+
+def test_windows_evict_aged_records(tmp_path):
+    rows = records()
+    history = filled(tmp_path / "history.jsonl", rows)
+    latest = rows[-1][0]
+    for offset in (1, 8, 31, 60, 91):
+        assert_windows_match(history, rows, latest + timedelta(days=offset))
+
+    windows = history.aggregates("u1", now=latest + timedelta(days=91))["windows"]
+    assert all(window["count"] == 0 for window in windows.values())
+    assert windows["90d"]["means"]["composite"] is None
+    # Windows never move back: an earlier `now` reads as the latest one
+    assert history.aggregates("u1", now=latest)["windows"]["7d"]["count"] == 0
+
+def test_streaks(tmp_path):
+    history = ScoreHistory(tmp_path / "history.jsonl", boundary_keys=BOUNDARIES)
+    days = [0, 0, 1, 2, 5, 6, 7, 8, 10]
+    for day in days:
+        history.record_score("u1", 50, {}, timestamp=START + timedelta(days=day, hours=len(days)))
+    last = START + timedelta(days=days[-1])
+
+    streak = history.aggregates("u1", now=last)["streak"]
+    assert (streak["current_days"], streak["longest_days"]) == (1, 4)
+    assert streak["last_active_day"] == last.date().isoformat()
+    assert history.aggregates("u1", now=last + timedelta(days=1))["streak"]["current_days"] == 1
+    assert history.aggregates("u1", now=last + timedelta(days=2))["streak"]["current_days"] == 0
+
+def test_load_history_replays_the_log(tmp_path):
+    path = tmp_path / "history.jsonl"
+    rows = records()
+    history = filled(path, rows)
+    history.record_score("u2", 40, {"climate": 10}, timestamp=START)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("{not json\n")
+    history.record_score("u2", 45, {"climate": 20}, timestamp=START + timedelta(days=1))
+
+    replayed = ScoreHistory(path, boundary_keys=BOUNDARIES)
+    now = rows[-1][0] + timedelta(days=3)
+    assert replayed.aggregates("u1", now=now) == history.aggregates("u1", now=now)
+    assert replayed.stats() == history.stats() == {"users": 2, "records": len(rows) + 2, "windows_days": [7, 30, 90]}
+    assert replayed.history("u2") == history.history("u2")
+    assert [record["composite_score"] for record in replayed.history("u2")] == [40, 45]
+
+def test_history_reads_a_users_records(tmp_path):
+    rows = records(20)
+    history = filled(tmp_path / "history.jsonl", rows)
+    history.record_score("u2", 10, {}, timestamp=START)
+
+    stored = history.history("u1")
+    assert [record["timestamp"] for record in stored] == [row[0].isoformat() for row in rows]
+    assert all(record["user_id"] == "u1" for record in stored)
+    assert history.history("u1", limit=3) == stored[-3:]
+    assert history.history("u1", since=rows[5][0]) == stored[5:]
+    assert history.history("u1", since=rows[5][0], limit=2) == stored[-2:]
+    assert history.history("nobody") == []
+
+def test_out_of_order_records_are_rejected_before_writing(tmp_path):
+    path = tmp_path / "history.jsonl"
+    history = filled(path, records(3))
+    size = path.stat().st_size
+    with pytest.raises(ValueError):
+        history.record_score("u1", 50, {}, timestamp=START)
+    assert path.stat().st_size == size
+    assert history.stats()["records"] == 3
+
+def test_failed_append_leaves_aggregates_unchanged(tmp_path):
+    history = ScoreHistory(tmp_path / "missing" / "history.jsonl", boundary_keys=BOUNDARIES)
+    with pytest.raises(OSError):
+        history.record_score("u1", 50, {"climate": 10}, timestamp=START)
+    assert history.aggregates("u1") is None
+    assert history.stats()["records"] == 0
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    history = ScoreHistory(tmp_path / "history.jsonl")
+    monkeypatch.setattr(app_module, "score_history", history)
+    monkeypatch.setattr(product_db, "leaderboard_entries", list(product_db.leaderboard_entries))
+    monkeypatch.setattr(product_db, "save_leaderboard", lambda: None)
+    return history
+
+def test_submit_score_records_history(isolated):
+    client = TestClient(app)
+    response = client.post("/api/submit-score", json={
+        "user_id": "history-test", "composite_score": "42.5", "boundary_scores": {"climate": 30, "freshwater": None}
+    })
+    assert response.status_code == 200
+    [record] = client.get("/api/history/history-test").json()["records"]
+    assert record["composite_score"] == 42.5
+    assert record["boundary_scores"] == {"climate": 30.0}
+    assert record["source"] == "leaderboard"
+    progress = client.get("/api/history/history-test/progress").json()
+    assert progress["windows"]["7d"]["means"]["composite"] == 42.5
+
+@pytest.mark.parametrize("payload", [
+    {"user_id": "history-test", "composite_score": {"value": 1}},
+    {"user_id": "history-test", "composite_score": "abc"},
+    {"user_id": "history-test", "composite_score": 40, "boundary_scores": [10, 20]},
+    {"user_id": "history-test", "composite_score": 40, "boundary_scores": {"climate": "high"}},
+    {"user_id": "history-test"},
+])
+def test_submit_score_rejects_malformed_scores_before_storing(isolated, payload):
+    entries = len(product_db.leaderboard_entries)
+    response = TestClient(app).post("/api/submit-score", json=payload)
+    assert response.status_code == 400
+    assert len(product_db.leaderboard_entries) == entries
+    assert isolated.stats()["records"] == 0
+
+def test_intake_records_history(isolated):
+    client = TestClient(app)
+    intake = {
+        "user_id": "history-test",
+        "quiz_responses": [{"question_id": "food_today", "question_text": "What did you eat today?",
+                            "answer": "plant-based", "category": "food"}],
+        "items": [{"type": "food", "category": "vegan", "materials": ["local"]}],
+    }
+    result = client.post("/api/intake", json=intake).json()["scoring_result"]
+    assert client.post("/api/intake", json={key: value for key, value in intake.items() if key != "user_id"}).status_code == 200
+
+    [record] = isolated.history("history-test")
+    assert record["source"] == "intake"
+    assert record["composite_score"] == result["composite"]
+    assert record["grade"] == result["grade"]
+    assert record["boundary_scores"] == pytest.approx(result["per_boundary_averages"])
+    assert json.loads((isolated.path).read_text().splitlines()[0])["user_id"] == "history-test"
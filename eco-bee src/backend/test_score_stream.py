@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming item scoring (score_stream, read_jsonl_items)
+"""
+
+import io
+
+import pytest
+
+from ecoscore import calculate_ecoscore
+from score_stream import ScoreAggregate, read_jsonl_items, score_stream
+
+VALID = [
+    {"type": "food", "category": "plant-based", "materials": ["local"]},
+    {"type": "transport", "category": "car"},
+    {"type": "clothing", "category": "cotton", "materials": []},
+]
+
+def test_stream_matches_basket_scoring():
+    aggregate = ScoreAggregate()
+    records = list(score_stream(iter(VALID * 5), chunk_size=4, aggregate=aggregate))
+    expected = calculate_ecoscore(VALID * 5)
+    assert len(records) == 15
+    assert aggregate.per_boundary_averages() == pytest.approx(expected["per_boundary_averages"])
+    assert aggregate.result()["composite"] == expected["composite"]
+
+def test_unscorable_items_are_skipped_and_reported(capsys):
+    lines = [
+        '{"type": "food", "category": "plant-based", "materials": ["local"]}',
+        '"foo"',
+        '[1, 2]',
+        '{"type": "food", "materials": null}',
+        '{"type": "food", "materials": "cotton"}',
+        '{"type": 5}',
+        'not json',
+        '',
+        '{"type": "transport", "category": "car"}',
+    ]
+    # Parsed lines go through the same validation as any other item source
+    aggregate = ScoreAggregate()
+    records = list(score_stream(read_jsonl_items(io.StringIO("\n".join(lines))), aggregate=aggregate))
+    assert [record["category"] for record in records] == ["plant-based", "car"]
+    assert len(records) == aggregate.item_count == 2
+    reported = capsys.readouterr().err.splitlines()
+    assert [line.split(":")[0] for line in reported] == [
+        "Skipping invalid item 2", "Skipping invalid item 3", "Skipping invalid item 4",
+        "Skipping invalid item 5", "Skipping invalid item 6", "Skipping invalid JSON on line 7",
+    ]
+    assert len(list(read_jsonl_items(io.StringIO("\n".join(lines))))) == 7
+
+    aggregate = ScoreAggregate()
+    records = list(score_stream([VALID[0], None, {"materials": None}, VALID[1]], aggregate=aggregate))
+    assert len(records) == aggregate.item_count == 2
+    assert "Skipping invalid item 2" in capsys.readouterr().err
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazy scored item view (ScoredItem)
+dict(scored), scored_item_json and the API models must give exactly the
+per-item dict score_item used to build: the item's fields, one normalized
+score per boundary and ecoscore_details.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ScoringResult, app
+from ecoscore import (FACTOR_TABLES, PLANETARY_BOUNDARIES, TYPE_MAPPING, ScoredItem, calculate_ecoscore,
+                      score_item, score_items_matrix, scored_item_json)
+from test_batch_scoring import MIXED_BASKET, NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS, reference_normalize
+from test_factor_index import reference_match
+
+EXTRA_FIELDS = [
+    {"type": "food", "category": "plant-based", "materials": ["local"], "barcode": "0123", "name": "Salad"},
+    # Fields named like a boundary or the details are overwritten, as before
+    {"type": "clothing", "category": "jeans", "climate": "user value", "ecoscore_details": "stale"},
+    {"type": "Transport", "category": "Car"},
+]
+
+def reference_item(item):
+    """The dict the original score_item returned"""
+    item_type = item.get('type', '').lower()
+    category = item.get('category', '').lower()
+    materials = item.get('materials', [])
+    factor_key = TYPE_MAPPING.get(item_type, 'lifestyle')
+    base_scores = reference_match(FACTOR_TABLES.get(factor_key, FACTOR_TABLES['lifestyle']), category, materials)
+    base_scores.pop('description', None)
+
+    lowered = [material.lower() for material in materials]
+    def mentions(keywords):
+        return any(keyword in category or any(keyword in material for material in lowered) for keyword in keywords)
+    if mentions(POSITIVE_KEYWORDS):
+        base_scores = {boundary: max(5, value * 0.8) for boundary, value in base_scores.items()}
+    if mentions(NEGATIVE_KEYWORDS):
+        base_scores = {boundary: min(95, value * 1.2) for boundary, value in base_scores.items()}
+
+    normalized_scores = {boundary: reference_normalize(base_scores.get(boundary, 50), boundary)
+                         for boundary in PLANETARY_BOUNDARIES}
+    result = item.copy()
+    result.update(normalized_scores)
+    result['ecoscore_details'] = {
+        'factor_table_used': factor_key,
+        'category_matched': category,
+        'raw_scores': base_scores,
+        'normalized_scores': normalized_scores,
+        'description': f"{item_type} item"
+    }
+    return result
+
+def assert_same(actual, expected):
+    """Equal structure and keys, floats equal up to rounding"""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict)
+        assert list(actual) == list(expected)
+        for key in expected:
+            assert_same(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for actual_value, expected_value in zip(actual, expected):
+            assert_same(actual_value, expected_value)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected)
+    else:
+        assert actual == expected
+
+def baskets():
+    yield MIXED_BASKET
+    yield EXTRA_FIELDS
+
+def test_dict_matches_original_item_dict():
+    for items in baskets():
+        for item in items:
+            scored = score_item(item)
+            assert isinstance(scored, ScoredItem)
+            expected = reference_item(item)
+            assert_same(dict(scored), expected)
+            assert_same(scored.to_dict(), expected)
+            assert len(scored) == len(expected)
+            assert list(scored) == list(expected)
+            for key in expected:
+                assert key in scored
+                assert_same(scored[key], expected[key])
+                assert_same(scored.get(key), expected[key])
+            assert scored.get("missing", "default") == "default"
+
+def test_batch_rows_match_original_item_dicts():
+    for items in baskets():
+        for scored, item in zip(score_items_matrix(items).scored_items(items), items):
+            assert_same(dict(scored), reference_item(item))
+
+def test_json_serialisation_is_unchanged():
+    for items in baskets():
+        result = calculate_ecoscore(items)
+        encoded = json.loads(json.dumps(result["items"], default=scored_item_json))
+        assert_same(encoded, json.loads(json.dumps([reference_item(item) for item in items])))
+
+def test_scoring_result_model_is_unchanged():
+    result = calculate_ecoscore(MIXED_BASKET)
+    fields = {key: result[key] for key in ScoringResult.model_fields}
+    model = ScoringResult(**fields)
+    expected = ScoringResult(**dict(fields, items=[reference_item(item) for item in MIXED_BASKET]))
+    assert_same(json.loads(model.model_dump_json()), json.loads(expected.model_dump_json()))
+
+def test_score_endpoint_items_are_unchanged():
+    response = TestClient(app).post("/api/score", json={"items": EXTRA_FIELDS})
+    assert response.status_code == 200
+    assert_same(response.json()["items"], json.loads(json.dumps([reference_item(item) for item in EXTRA_FIELDS])))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled ScoringModel
+Its slopes, caps and weights must reproduce the per-call boundary math of
+normalize_boundary_score, and a model must not change once built.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from ecoscore import (PLANETARY_BOUNDARIES, build_scoring_model, calculate_ecoscore, get_scoring_model,
+                      install_scoring_model, normalize_boundary_score)
+from test_batch_scoring import MIXED_BASKET, reference_grade, reference_normalize
+
+RAW_SCORES = [-20.0, 0.0, 0.5, 5.0, 33.3, 50.0, 64.9, 75.0, 99.9, 100.0, 120.0, 250.0]
+
+def test_normalize_matches_boundary_math():
+    model = get_scoring_model()
+    for boundary in model.boundary_keys:
+        for raw_score in RAW_SCORES:
+            expected = reference_normalize(raw_score, boundary)
+            assert model.normalize_value(raw_score, boundary) == pytest.approx(expected)
+            assert normalize_boundary_score(raw_score, boundary) == pytest.approx(expected)
+
+    raw = np.array([[raw_score] * len(model.boundary_keys) for raw_score in RAW_SCORES + [np.nan]])
+    normalized = model.normalize(raw)
+    for row, raw_score in enumerate(RAW_SCORES + [50.0]):
+        expected = [reference_normalize(raw_score, boundary) for boundary in model.boundary_keys]
+        assert normalized[row].tolist() == pytest.approx(expected)
+
+def test_boundary_within_safe_space_is_capped_at_50():
+    boundaries = dict(PLANETARY_BOUNDARIES)
+    boundaries["freshwater"] = replace(boundaries["freshwater"], current_global_status=100.0)
+    model = build_scoring_model(boundaries=boundaries)
+    assert model.normalize_value(100.0, "freshwater") == 50.0
+    assert model.normalize_value(40.0, "freshwater") == 20.0
+
+def test_grades_and_composites_match():
+    model = get_scoring_model()
+    scores = np.linspace(0, 100, 201)
+    assert model.grades(scores) == [reference_grade(score) for score in scores]
+    assert [model.grade(score) for score in scores] == [reference_grade(score) for score in scores]
+
+    averages = np.random.default_rng(5).uniform(0, 100, (50, len(model.boundary_keys)))
+    for row, composite_score in zip(averages, model.composites(averages)):
+        assert composite_score == model.composite(dict(zip(model.boundary_keys, row.tolist())))
+
+def test_model_is_a_snapshot():
+    model = build_scoring_model()
+    with pytest.raises(ValueError):
+        model.weights[0] = 1.0
+    assert build_scoring_model().version > model.version
+
+    original = PLANETARY_BOUNDARIES["climate"]
+    try:
+        PLANETARY_BOUNDARIES["climate"] = replace(original, weight=0.9)
+        assert model.weight("climate") == original.weight
+        assert get_scoring_model().weight("climate") == 0.9
+    finally:
+        PLANETARY_BOUNDARIES["climate"] = original
+    assert get_scoring_model().weight("climate") == original.weight
+
+def test_installed_model_overrides_default():
+    weighted = build_scoring_model(weights={"climate": 1.0, "biosphere": 0.0, "biogeochemical": 0.0,
+                                            "freshwater": 0.0, "aerosols": 0.0})
+    previous = install_scoring_model(weighted)
+    try:
+        result = calculate_ecoscore(MIXED_BASKET)
+        assert result["composite"] == round(result["per_boundary_averages"]["climate"], 1)
+        assert result["methodology"]["model_version"] == weighted.version
+    finally:
+        install_scoring_model(previous)
+    assert calculate_ecoscore(MIXED_BASKET)["methodology"]["model_version"] != weighted.version
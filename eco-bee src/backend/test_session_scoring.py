@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental per-session scoring (SessionScore, SessionScoreStore)
+After any sequence of edits a session must report what calculate_ecoscore
+gives for the same item list.
+"""
+
+import pytest
+
+import session_scoring
+from ecoscore import calculate_ecoscore
+from session_scoring import SessionScore, SessionScoreStore
+from test_batch_scoring import MIXED_BASKET
+
+def assert_matches_full_rescore(session, items):
+    result = session.result()
+    expected = calculate_ecoscore(items)
+    assert result["per_boundary_averages"] == pytest.approx(expected["per_boundary_averages"])
+    assert result["composite"] == expected["composite"]
+    assert result["grade"] == expected["grade"]
+    # Running sums may differ from a fresh mean in the last bits of unrounded fields
+    assert result["boundary_details"].keys() == expected["boundary_details"].keys()
+    for boundary, details in expected["boundary_details"].items():
+        assert result["boundary_details"][boundary] == pytest.approx(details)
+    assert result["recommendations"] == expected["recommendations"]
+    assert [{key: value for key, value in item.items() if key != "item_id"} for item in result["items"]] == \
+        expected["items"]
+
+def test_edit_sequence_matches_full_rescore():
+    session = SessionScore("parity")
+    basket = {}
+    for item in MIXED_BASKET[:5]:
+        basket[session.add_item(item)] = item
+        assert_matches_full_rescore(session, list(basket.values()))
+
+    first, second = list(basket)[:2]
+    assert session.remove_item(first)
+    del basket[first]
+    assert not session.remove_item(first)
+    assert_matches_full_rescore(session, list(basket.values()))
+
+    # Updated items move to the end of the basket
+    replacement = {"type": "food", "category": "meat-heavy", "materials": ["beef", "imported"]}
+    session.update_item(second, replacement)
+    del basket[second]
+    basket[second] = replacement
+    assert_matches_full_rescore(session, list(basket.values()))
+
+    resent = [MIXED_BASKET[7], replacement, MIXED_BASKET[3], dict(MIXED_BASKET[5], barcode="123"), MIXED_BASKET[3]]
+    session.sync_items(resent)
+    assert session.item_count() == len(resent)
+    assert_matches_full_rescore(session, resent)
+
+    session.sync_items([])
+    assert session.item_count() == 0
+    assert session.result()["composite"] == calculate_ecoscore([])["composite"]
+
+def test_recommendations_rebuild_only_when_top_boundaries_change(monkeypatch):
+    calls = []
+    original = session_scoring.generate_recommendations
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return original(*args, **kwargs)
+    monkeypatch.setattr(session_scoring, "generate_recommendations", counting)
+
+    heavy = {"type": "food", "category": "meat-heavy", "materials": []}
+    session = SessionScore("recommendations")
+    session.add_item(heavy)
+    session.result()
+    assert len(calls) == 1
+
+    # Same item again: averages and top-3 ordering unchanged
+    session.add_item(dict(heavy))
+    recommendations = session.result()["recommendations"]
+    assert len(calls) == 1
+    assert recommendations == calculate_ecoscore([heavy, heavy])["recommendations"]
+
+    # A transport item brings a new context class and reorders the boundaries
+    session.add_item({"type": "transport", "category": "plane", "materials": []})
+    session.result()
+    assert len(calls) == 2
+
+def test_store_expires_idle_sessions(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_scoring.time, "time", lambda: now[0])
+    store = SessionScoreStore(max_sessions=10, ttl_seconds=60)
+    first = store.get("a")
+    assert store.get("a") is first
+    store.get("b")
+    now[0] += 45
+    store.get("b")
+    now[0] += 30  # a idle for 75s, b for 30s
+    assert store.get("a", create=False) is None
+    assert store.get("b", create=False) is not None
+    assert store.stats()["sessions"] == 1
+
+def test_store_evicts_least_recently_used():
+    store = SessionScoreStore(max_sessions=2)
+    first = store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")  # evicts b
+    assert store.get("b", create=False) is None
+    assert store.get("a") is first
+    assert store.stats()["sessions"] == 2
+    assert store.drop("a")
+    assert not store.drop("a")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the Monte Carlo uncertainty bands (score_uncertainty)
+Checks the folded sampling path against plain scoring and against the same
+draws pushed step by step through the modifiers and ScoringModel.normalize.
+"""
+
+import numpy as np
+
+from ecoscore import (FactorUncertainty, TYPE_MAPPING, UNCERTAINTY_PERCENTILES, build_scoring_model,
+                      calculate_ecoscore, get_scoring_model, item_signature, score_uncertainty)
+from factor_binary import open_binary_factor_index, write_factor_tables_binary
+
+BASKET = [
+    {"type": "food", "category": "meat-heavy", "materials": ["beef"]},
+    {"type": "food", "category": "plant-based", "materials": ["local", "organic"]},
+    {"type": "transport", "category": "plane", "materials": []},
+    {"type": "clothing", "category": "cotton", "materials": ["fast fashion"]},
+    {"type": "food", "category": "meat-heavy", "materials": ["beef"]},
+    {"type": "lifestyle", "category": "no-such-category", "materials": []},
+]
+
+def propagate_directly(items, samples, seed, model, uncertainty):
+    """Reference bands: the same draws through modifiers, normalize and averaging, one step at a time"""
+    signatures = []
+    counts = {}
+    for item in items:
+        signature = item_signature(item)
+        if signature not in counts:
+            signatures.append((signature, item))
+        counts[signature] = counts.get(signature, 0) + 1
+
+    base_rows, spread_rows, flags = [], [], []
+    for signature, item in signatures:
+        factor_key = TYPE_MAPPING.get(signature[0], 'lifestyle')
+        table = model.factor_index.table_for(factor_key)
+        position = table.match_position(signature[1], item.get('materials', []))
+        base_rows.append(np.asarray(table.matrix[position], dtype=np.float64))
+        spread_rows.append(uncertainty.spreads(factor_key, table)[position])
+        flags.append(model.modifiers.classify(signature[1], list(signature[2])))
+    base = np.array(base_rows)
+    spread = np.array(spread_rows)
+
+    rng = np.random.default_rng(seed)
+    offsets = rng.random((samples,) + base.shape)
+    offsets += rng.random(offsets.shape)
+    offsets -= 1.0
+
+    averages = np.zeros((samples, len(model.boundary_keys)))
+    for row, (signature, _) in enumerate(signatures):
+        values = base[row] * (1 + spread[row] * offsets[:, row, :])
+        positive, negative = flags[row]
+        if positive:
+            values = np.where(np.isnan(values), values, np.maximum(5, values * 0.8))
+        if negative:
+            values = np.where(np.isnan(values), values, np.minimum(95, values * 1.2))
+        averages += model.normalize(values) * counts[signature] / len(items)
+
+    composites = model.composites(averages)
+    return np.percentile(np.column_stack((averages, composites)), UNCERTAINTY_PERCENTILES, axis=0).T
+
+def assert_matches_reference(items, samples, seed, model, uncertainty):
+    result = score_uncertainty(items, samples=samples, seed=seed, model=model, uncertainty=uncertainty)
+    expected = propagate_directly(items, samples, seed, model, uncertainty).round(1)
+    labels = [f"p{percentile}" for percentile in UNCERTAINTY_PERCENTILES]
+    for boundary, band in zip(model.boundary_keys, expected[:-1]):
+        assert [result["per_boundary"][boundary][label] for label in labels] == band.tolist(), boundary
+    assert [result["composite"][label] for label in labels] == expected[-1].tolist()
+
+def test_zero_spread_matches_point_score():
+    no_spread = FactorUncertainty({"default": 0.0, "fallback": 0.0})
+    result = score_uncertainty(BASKET, samples=50, seed=7, uncertainty=no_spread)
+    point = calculate_ecoscore(BASKET)
+
+    for boundary, average in point["per_boundary_averages"].items():
+        assert set(result["per_boundary"][boundary].values()) == {round(average, 1)}
+    assert set(result["composite"].values()) == {round(point["composite"], 1)}
+    assert set(result["grades"].values()) == {point["grade"]}
+
+def test_matches_direct_propagation():
+    for spread in (0.1, 0.3, 0.5, 0.9):
+        uncertainty = FactorUncertainty({"default": spread, "fallback": spread})
+        assert_matches_reference(BASKET, 2000, 11, get_scoring_model(), uncertainty)
+
+def test_values_above_100_are_not_clamped_before_normalization():
+    # Plane factors sit near 100, so wide ranges push raw values past it;
+    # only the boundary caps may limit the normalized result
+    uncertainty = FactorUncertainty({"default": 0.5, "fallback": 0.5})
+    plane = [{"type": "transport", "category": "plane", "materials": []}]
+    assert_matches_reference(plane, 20000, 1, get_scoring_model(), uncertainty)
+
+    result = score_uncertainty(plane, samples=20000, seed=1, uncertainty=uncertainty)
+    assert result["per_boundary"]["climate"]["p95"] == 73.4
+    assert result["per_boundary"]["aerosols"]["p95"] == 66.0
+
+def test_binary_factor_index(tmp_path):
+    path = tmp_path / "factors.bin"
+    write_factor_tables_binary(get_scoring_model().source_index.tables, str(path))
+    binary_model = build_scoring_model(factor_index=open_binary_factor_index(str(path)))
+    uncertainty = FactorUncertainty({"default": 0.3, "fallback": 0.4,
+                                     "tables": {"food": {"categories": {"meat-heavy": 0.6}}}})
+
+    assert (score_uncertainty(BASKET, samples=500, seed=3, model=binary_model, uncertainty=uncertainty)
+            == score_uncertainty(BASKET, samples=500, seed=3, uncertainty=uncertainty))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared upstream HTTP client (UpstreamClient)
+Requests never leave the process: every client gets an httpx.MockTransport.
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+
+from upstream_http import UpstreamClient
+
+def echo_transport(record=None):
+    def handler(request):
+        if record is not None:
+            record.append((request.url.host, threading.current_thread().name))
+        return httpx.Response(200, json={"host": request.url.host, "path": request.url.path})
+    return httpx.MockTransport(handler)
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_concurrency_is_bounded_per_host():
+    in_flight = {}
+    peak = {}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200)
+
+    client = UpstreamClient(max_per_host=2, transport=httpx.MockTransport(handler))
+
+    async def burst():
+        calls = [client.get("test", f"https://slow.example/{n}") for n in range(6)]
+        calls += [client.get("test", f"https://other.example/{n}") for n in range(3)]
+        waiting = asyncio.gather(*calls)
+        await asyncio.sleep(0.01)
+        busy = client.stats()["in_flight_by_host"]
+        responses = await waiting
+        await client.aclose()
+        return busy, responses
+
+    busy, responses = asyncio.run(burst())
+    assert [response.status_code for response in responses] == [200] * 9
+    assert peak == {"slow.example": 2, "other.example": 2}
+    assert busy == {"slow.example": 2, "other.example": 2}
+
+def test_client_is_reused_within_a_loop():
+    client = UpstreamClient(transport=echo_transport())
+
+    async def twice():
+        first = await client.get("test", "https://api.example/a")
+        pool = client._client
+        second = await client.post("test", "https://api.example/b", json={})
+        same = client._client is pool
+        await client.aclose()
+        return first.json(), second.json(), same, pool
+
+    first, second, same, pool = asyncio.run(twice())
+    assert first == {"host": "api.example", "path": "/a"}
+    assert second["path"] == "/b"
+    assert same
+    assert pool.is_closed
+    assert not client.stats()["open"]
+
+def test_run_sync_reuses_one_background_loop():
+    calls = []
+    client = UpstreamClient(transport=echo_transport(calls))
+    first = client.run_sync(client.get("test", "https://api.example/a"))
+    pool = client._client
+    second = client.run_sync(client.get("test", "https://api.example/b"))
+
+    assert (first.json()["path"], second.json()["path"]) == ("/a", "/b")
+    assert client._client is pool
+    assert [thread for _, thread in calls] == ["upstream-http", "upstream-http"]
+
+def test_pool_is_retired_when_the_loop_changes():
+    client = UpstreamClient(transport=echo_transport())
+    client.run_sync(client.get("test", "https://api.example/a"))
+    background_pool = client._client
+
+    # Another loop gets its own pool; the old one is closed on its still-running loop
+    async def elsewhere():
+        response = await client.get("test", "https://api.example/b")
+        return response, client._client
+
+    response, pool = asyncio.run(elsewhere())
+    assert response.status_code == 200
+    assert pool is not background_pool
+    assert wait_until(lambda: background_pool.is_closed)
+
+def test_pool_of_a_stopped_loop_is_dropped(capsys):
+    client = UpstreamClient(transport=echo_transport())
+    asyncio.run(client.get("test", "https://api.example/a"))
+    stale = client._client
+    asyncio.run(client.get("test", "https://api.example/b"))
+    assert client._client is not stale
+    assert "use run_sync()" in capsys.readouterr().out
+
+def test_aclose_from_another_loop_closes_on_the_owning_loop():
+    client = UpstreamClient(transport=echo_transport())
+    client.run_sync(client.get("test", "https://api.example/a"))
+    pool = client._client
+
+    asyncio.run(client.aclose())
+    assert not client.stats()["open"]
+    assert wait_until(lambda: pool.is_closed)
+
+    # Closing twice is harmless and the client can be used again
+    asyncio.run(client.aclose())
+    assert client.run_sync(client.get("test", "https://api.example/b")).status_code == 200
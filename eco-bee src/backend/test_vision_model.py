@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for background Pixtral loading and the vision endpoints' readiness gating
+The real model is never loaded: loaders get a stand-in _load that finishes
+when the test releases it.
+"""
+
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app as app_module
+import vision_model
+from app import app
+from vision_model import PixtralLoader
+
+class FakeModel:
+    def generate(self, **kwargs):
+        return [[1]]
+
+class FakeProcessor:
+    def __call__(self, **kwargs):
+        return {}
+
+    def decode(self, *args, **kwargs):
+        return "a plant-based vegetable meal"
+
+def gated_loader(fail=False):
+    """A pending loader whose load finishes (or fails) once `release` is set"""
+    loader = PixtralLoader("test/pixtral")
+    loader.state = vision_model.PENDING
+    release = threading.Event()
+
+    def load():
+        loader._advance("model")
+        release.wait(10)
+        if fail:
+            loader.error = "out of memory"
+            loader.state = vision_model.FAILED
+        else:
+            loader._model, loader._processor = FakeModel(), FakeProcessor()
+            loader.progress = 1.0
+            loader.state = vision_model.READY
+        loader.finished_at = time.time()
+        loader._ready.set()
+
+    loader._load = load
+    return loader, release
+
+def wait_until_finished(loader):
+    assert loader._ready.wait(5)
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def classify(client):
+    return client.post("/api/classify-image", files={"image": ("meal.png", png_bytes())}, data={"item_type": "food"})
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, "PIXTRAL_WAIT_SECONDS", 0.05)
+    return TestClient(app)
+
+def test_warming_model_answers_503_then_serves(client, monkeypatch):
+    loader, release = gated_loader()
+    monkeypatch.setattr(app_module, "PIXTRAL", loader)
+    assert loader.start()
+    assert not loader.start()
+
+    response = classify(client)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
+    detail = response.json()["detail"]
+    assert detail["status"] == "warming"
+    assert detail["vision_model"]["state"] == vision_model.LOADING
+    assert detail["vision_model"]["stage"] == "model"
+
+    health = client.get("/api/health").json()
+    assert health["components"]["vision_model"]["state"] == vision_model.LOADING
+
+    release.set()
+    wait_until_finished(loader)
+    response = classify(client)
+    assert response.status_code == 200
+    assert response.json()["source"] == "pixtral"
+    assert client.get("/api/health").json()["components"]["vision_model"]["state"] == vision_model.READY
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_unavailable_or_disabled_model_falls_back(client, monkeypatch, enabled):
+    loader = PixtralLoader("test/pixtral", enabled=enabled)
+    if enabled:
+        loader.state = vision_model.UNAVAILABLE
+    monkeypatch.setattr(app_module, "PIXTRAL", loader)
+    assert not loader.start()
+    assert not loader.warming
+
+    response = classify(client)
+    assert response.status_code == 200
+    assert response.json()["source"] == "fallback"
+
+def test_failed_load_falls_back(client, monkeypatch):
+    loader, release = gated_loader(fail=True)
+    monkeypatch.setattr(app_module, "PIXTRAL", loader)
+    loader.start()
+    release.set()
+    wait_until_finished(loader)
+
+    assert loader.status()["error"] == "out of memory"
+    response = classify(client)
+    assert response.status_code == 200
+    assert response.json()["source"] == "fallback"
+
+def test_wait_ready_is_bounded():
+    loader, release = gated_loader()
+    loader.start()
+    started = time.monotonic()
+    assert asyncio.run(loader.wait_ready(0.05)) is False
+    assert time.monotonic() - started < 1
+
+    threading.Timer(0.05, release.set).start()
+    assert asyncio.run(loader.wait_ready(5)) is True
+    assert loader.get() is not None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for batched counterfactual scoring (score_what_if, /api/score/what-if)
+Every candidate swap must score exactly like the swapped basket scored
+from scratch.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from ecoscore import calculate_ecoscore, score_what_if
+
+BASKET = [
+    {"type": "food", "category": "meat-heavy", "materials": ["beef"]},
+    {"type": "transport", "category": "car", "materials": []},
+    {"type": "clothing", "category": "fast fashion", "materials": ["polyester"]},
+]
+
+SUBSTITUTIONS = {
+    0: [{"type": "food", "category": "plant-based", "materials": ["local"]},
+        {"type": "food", "category": "mixed", "materials": []}],
+    1: [{"type": "transport", "category": "bike", "materials": []},
+        {"type": "transport", "category": "plane", "materials": []}],
+}
+
+def swapped(index, alternative):
+    basket = list(BASKET)
+    basket[index] = alternative
+    return basket
+
+def test_swaps_match_rescoring_the_basket():
+    result = score_what_if(BASKET, SUBSTITUTIONS)
+    baseline = calculate_ecoscore(BASKET)
+    assert result["baseline"]["per_boundary_averages"] == pytest.approx(baseline["per_boundary_averages"])
+    assert result["baseline"]["composite"] == baseline["composite"]
+
+    assert len(result["substitutions"]) == 4
+    for swap in result["substitutions"]:
+        expected = calculate_ecoscore(swapped(swap["item_index"], swap["substitute"]))
+        assert swap["per_boundary_averages"] == pytest.approx(expected["per_boundary_averages"])
+        assert (swap["composite"], swap["grade"]) == (expected["composite"], expected["grade"])
+
+    for index, position in result["best_substitutions"].items():
+        candidates = [swap for swap in result["substitutions"] if swap["item_index"] == index]
+        assert result["substitutions"][position]["composite"] == min(swap["composite"] for swap in candidates)
+
+def test_rejects_bad_requests():
+    with pytest.raises(ValueError):
+        score_what_if([], {})
+    with pytest.raises(ValueError):
+        score_what_if(BASKET, {3: SUBSTITUTIONS[0]})
+
+def test_what_if_endpoint():
+    client = TestClient(app)
+    payload = {
+        "items": BASKET,
+        "substitutions": [{"item_index": index, "alternatives": alternatives}
+                          for index, alternatives in SUBSTITUTIONS.items()]
+    }
+    response = client.post("/api/score/what-if", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    for swap in body["substitutions"]:
+        expected = calculate_ecoscore(swapped(swap["item_index"], swap["substitute"]))
+        assert swap["composite"] == expected["composite"]
+    assert set(body["best_substitutions"]) == {"0", "1"}
+
+    payload["substitutions"][0]["item_index"] = 7
+    assert client.post("/api/score/what-if", json=payload).status_code == 400
@@ -0,0 +1,161 @@
+"""
+Shared async HTTP client for upstream APIs (Mistral, Open Food Facts, UPCitemdb)
+One pooled httpx.AsyncClient keeps connections alive across requests and
+speaks HTTP/2 when the h2 package is installed. Concurrent requests are
+capped per host so a burst against one slow API cannot take every pooled
+connection. Every call is awaited, so handlers never block the event loop
+while an upstream is thinking, and is recorded by metrics.track_upstream.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+from metrics import track_upstream
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Pool sizing, overridable from the environment
+MAX_CONNECTIONS = int(os.getenv("ECOBEE_UPSTREAM_MAX_CONNECTIONS", "200"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ECOBEE_UPSTREAM_MAX_KEEPALIVE", "50"))
+MAX_PER_HOST = int(os.getenv("ECOBEE_UPSTREAM_MAX_PER_HOST", "64"))
+KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 30.0
+
+class UpstreamClient:
+    """
+    Pooled async HTTP client with per-host concurrency limits
+
+    The underlying httpx.AsyncClient and the per-host semaphores belong to
+    the event loop that first used them; when called from another loop a
+    new pool is created for it and the previous one is closed on its own
+    loop. Synchronous callers (simple_server, scripts) should go through
+    run_sync(), which keeps one long-lived loop so the pool is reused
+    instead of rebuilt by every asyncio.run().
+
+    `transport` replaces httpx's network transport (e.g. httpx.MockTransport
+    in tests); per-host limits and metrics still apply.
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS,
+                 max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+                 max_per_host: int = MAX_PER_HOST, http2: bool = HTTP2_AVAILABLE,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_per_host = max_per_host
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.transport = transport
+        self._client = None
+        self._loop = None
+        self._host_limits = {}
+        self._runner = None
+        self._runner_lock = threading.Lock()
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                self._retire(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=KEEPALIVE_EXPIRY
+                ),
+                timeout=DEFAULT_TIMEOUT,
+                transport=self.transport
+            )
+            self._loop = loop
+            self._host_limits = {}
+        return self._client
+
+    @staticmethod
+    def _retire(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        """Close a pool left behind by another event loop, on that loop"""
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            # Its connections' transports died with the loop; nothing can await them any more
+            print("Upstream HTTP pool dropped after its event loop stopped; use run_sync() from synchronous code")
+
+    def run_sync(self, coro):
+        """
+        Run a coroutine on the client's background event loop and wait for its result
+
+        For synchronous callers only; never call it from a coroutine.
+        """
+        with self._runner_lock:
+            if self._runner is None:
+                self._runner = asyncio.new_event_loop()
+                threading.Thread(target=self._runner.run_forever, name="upstream-http", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._runner).result()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return limit
+
+    async def request(self, upstream: str, method: str, url: str,
+                      timeout: float = DEFAULT_TIMEOUT, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared pool
+
+        Args:
+            upstream: Metrics label for the API being called (e.g. "mistral")
+            method: HTTP method
+            url: Absolute URL
+            timeout: Seconds allowed for each of connect, read and write
+            **kwargs: Passed on to httpx (headers, params, json, ...)
+
+        Returns:
+            The response, with its body read; raises httpx.HTTPError subclasses on network failures
+        """
+        client = self._client_for_loop()
+        async with self._host_limit(url):
+            with track_upstream(upstream) as call:
+                response = await client.request(method, url, timeout=timeout, **kwargs)
+                call.status = response.status_code
+        return response
+
+    async def get(self, upstream: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(upstream, "GET", url, **kwargs)
+
+    async def post(self, upstream: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(upstream, "POST", url, **kwargs)
+
+    async def aclose(self):
+        """Close pooled connections (call on shutdown)"""
+        client, loop = self._client, self._loop
+        self._client, self._loop = None, None
+        self._host_limits = {}
+        if client is None:
+            return
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+        else:
+            self._retire(client, loop)
+
+    def stats(self) -> Dict:
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "max_per_host": self.max_per_host,
+            "open": self._client is not None,
+            "in_flight_by_host": {
+                host: self.max_per_host - limit._value
+                for host, limit in self._host_limits.items()
+            }
+        }
+
+# Global client shared by every upstream caller
+UPSTREAM_HTTP = UpstreamClient()
@@ -0,0 +1,131 @@
+"""
+Background loading of the local Pixtral vision model
+torch and transformers are only imported, and the weights only loaded, in a
+background thread started once the server is up, so a worker answers
+non-vision requests immediately. Vision endpoints check readiness with a
+bounded wait and tell clients the model is still warming up otherwise;
+/api/health reports the load state and progress.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Load states
+DISABLED = "disabled"        # ENABLE_PIXTRAL=0
+UNAVAILABLE = "unavailable"  # torch or transformers not installed
+PENDING = "pending"          # enabled, loading not started yet
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Loading stages with the share of total progress reached once each is done
+LOAD_STAGES = (("import", 0.1), ("processor", 0.2), ("model", 1.0))
+
+class PixtralLoader:
+    """
+    Loads the Pixtral processor and model once, in a daemon thread
+
+    get() never blocks: it returns (model, processor) when ready and None
+    otherwise. wait_ready() waits a bounded time without blocking the event loop.
+    """
+
+    def __init__(self, model_name: str, enabled: bool = True):
+        self.model_name = model_name
+        if not enabled:
+            self.state = DISABLED
+        elif importlib.util.find_spec("torch") is None or importlib.util.find_spec("transformers") is None:
+            self.state = UNAVAILABLE
+        else:
+            self.state = PENDING
+        self.stage = None
+        self.progress = 0.0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._model = None
+        self._processor = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def warming(self) -> bool:
+        """True while the model is expected to become usable"""
+        return self.state in (PENDING, LOADING)
+
+    def start(self) -> bool:
+        """Start loading in the background; no-op unless still pending"""
+        with self._lock:
+            if self.state != PENDING:
+                return False
+            self.state = LOADING
+            self.started_at = time.time()
+        threading.Thread(target=self._load, name="pixtral-loader", daemon=True).start()
+        return True
+
+    def _advance(self, stage: str):
+        self.stage = stage
+        for name, progress in LOAD_STAGES:
+            if name == stage:
+                break
+            self.progress = progress
+
+    def _load(self):
+        print(f"Loading Pixtral model in the background: {self.model_name}")
+        try:
+            self._advance("import")
+            from transformers import AutoProcessor, AutoModelForVision2Text
+
+            self._advance("processor")
+            processor = AutoProcessor.from_pretrained(self.model_name)
+
+            self._advance("model")
+            model = AutoModelForVision2Text.from_pretrained(self.model_name)
+
+            self._processor, self._model = processor, model
+            self.progress = 1.0
+            self.state = READY
+            print(f"✅ Pixtral model loaded in {time.time() - self.started_at:.1f}s")
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+            print(f"Failed to load Pixtral model: {e}")
+        finally:
+            self.finished_at = time.time()
+            self._ready.set()
+
+    def get(self) -> Optional[Tuple]:
+        """(model, processor) if loaded, otherwise None"""
+        if self.state != READY:
+            return None
+        return self._model, self._processor
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for loading to finish; True if the model is ready"""
+        deadline = time.monotonic() + timeout
+        while self.warming and time.monotonic() < deadline:
+            await asyncio.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+        return self.state == READY
+
+    def status(self) -> Dict:
+        end = self.finished_at or time.time()
+        return {
+            "state": self.state,
+            "model": self.model_name,
+            "stage": self.stage,
+            "progress": round(self.progress, 2),
+            "elapsed_seconds": round(end - self.started_at, 1) if self.started_at else None,
+            "error": self.error
+        }
+
+# Local vision model, loaded after startup (ENABLE_PIXTRAL=0 turns it off)
+PIXTRAL = PixtralLoader(
+    os.getenv("PIXTRAL_MODEL_NAME", "mistralai/Pixtral-8B-v0.1"),
+    enabled=os.getenv("ENABLE_PIXTRAL", "1") == "1"
+)
+
+# Seconds a vision request waits for a model that is still loading before getting a "warming" reply
+PIXTRAL_WAIT_SECONDS = float(os.getenv("PIXTRAL_WAIT_SECONDS", "2"))